@@ -0,0 +1,255 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Aggregate statistics about translators and clients, kept up to date by
+the data_manager save functions.
+"""
+
+import bisect
+import threading
+from collections import Counter
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from cities import record_city_name
+from message_ids import (
+    ADMIN_SUMMARY, ADMIN_SUMMARY_CLIENT_CITIES, ADMIN_SUMMARY_LEVELS, ADMIN_SUMMARY_MORE, ADMIN_SUMMARY_PRICES,
+    ADMIN_SUMMARY_SUSPICIOUS, ADMIN_SUMMARY_SUSPICIOUS_LINE, ADMIN_SUMMARY_TRANSLATOR_CITIES
+)
+from storage import parse_price
+
+# Verification texts that suggest a translator registered as a client
+SUSPICIOUS_SERVICE_PATTERNS = [
+    'translator', 'interpret', 'übersetz', 'dolmetsch',
+    'language service', 'sprach', 'translation'
+]
+
+
+def is_suspicious_service(service_needed: str) -> bool:
+    """Check a client's verification text against the suspicious patterns."""
+    service_needed = service_needed.lower()
+    return any(pattern in service_needed for pattern in SUSPICIOUS_SERVICE_PATTERNS)
+
+
+class AdminStats:
+    """
+    Counters for the admin summary, /api/stats and the dashboard.
+
+    Every save adjusts the counters for the old and the new version of the
+    record, so an update costs O(1) regardless of the number of users. What
+    was counted for each user is remembered, so a save needs only the new
+    version, e.g. one read back from another process's write. The
+    Markdown summary is rebuilt only after something changed, and its size
+    depends on the number of cities and levels, not on the number of users.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self) -> None:
+        self.translator_count = 0
+        self.client_count = 0
+        self.translator_cities = Counter()
+        self.translator_levels = Counter()
+        self.client_cities = Counter()
+        self.verified_clients = 0
+        self.unverified_clients = 0
+        self.price_count = 0
+        self.price_sum = 0.0
+        self._price_histogram = Counter()
+        self._distinct_prices: List[float] = []  # Sorted, for min/max after removals
+        self.suspicious_clients: Dict[int, Dict[str, Any]] = {}  # In registration order
+        # What each user's record was counted as: (city, level, price) and (city, verified)
+        self._translators: Dict[int, Tuple] = {}
+        self._clients: Dict[int, Tuple] = {}
+        self.version = 0
+        self._summaries: Dict[str, str] = {}  # Locale -> summary of the current version
+        self._summary_version = -1
+
+    # Updates
+    def _count_price(self, price: Optional[float], delta: int) -> None:
+        if price is None:
+            return
+        self.price_count += delta
+        self.price_sum += delta * price
+        self._price_histogram[price] += delta
+        if delta > 0 and self._price_histogram[price] == 1:
+            bisect.insort(self._distinct_prices, price)
+        elif delta < 0 and self._price_histogram[price] == 0:
+            del self._price_histogram[price]
+            del self._distinct_prices[bisect.bisect_left(self._distinct_prices, price)]
+
+    @staticmethod
+    def _count(counter: Counter, key: Any, delta: int) -> None:
+        counter[key] += delta
+        if counter[key] <= 0:
+            del counter[key]
+
+    def _add_translator(self, user_id: int, data: Dict[str, Any]) -> None:
+        city = record_city_name(data)
+        level = data.get('language_level', 'Unknown')
+        price = parse_price(data.get('price', '0'))
+        self._translators[user_id] = (city, level, price)
+        self.translator_count += 1
+        self.translator_cities[city] += 1
+        self.translator_levels[level] += 1
+        self._count_price(price, 1)
+
+    def _remove_translator(self, user_id: int) -> None:
+        counted = self._translators.pop(user_id, None)
+        if counted is None:
+            return
+        city, level, price = counted
+        self.translator_count -= 1
+        self._count(self.translator_cities, city, -1)
+        self._count(self.translator_levels, level, -1)
+        self._count_price(price, -1)
+
+    def _add_client(self, user_id: int, data: Dict[str, Any]) -> None:
+        city = record_city_name(data)
+        verified = bool(data.get('registration_complete', False))
+        self._clients[user_id] = (city, verified)
+        self.client_count += 1
+        self.client_cities[city] += 1
+        if verified:
+            self.verified_clients += 1
+        else:
+            self.unverified_clients += 1
+
+        service_needed = data.get('service_needed', '')
+        if service_needed and is_suspicious_service(service_needed):
+            self.suspicious_clients[user_id] = {
+                'user_id': user_id,
+                'city': data.get('city', 'Unknown'),
+                'verification_text': service_needed
+            }
+
+    def _remove_client(self, user_id: int) -> None:
+        counted = self._clients.pop(user_id, None)
+        if counted is None:
+            return
+        city, verified = counted
+        self.client_count -= 1
+        self._count(self.client_cities, city, -1)
+        if verified:
+            self.verified_clients -= 1
+        else:
+            self.unverified_clients -= 1
+        self.suspicious_clients.pop(user_id, None)
+
+    def translator_saved(self, user_id: int, data: Optional[Dict[str, Any]]) -> None:
+        """Account for a translator's record being saved as `data` (None if deleted)."""
+        with self._lock:
+            self._remove_translator(user_id)
+            if data is not None:
+                self._add_translator(user_id, data)
+            self.version += 1
+
+    def client_saved(self, user_id: int, data: Optional[Dict[str, Any]]) -> None:
+        """Account for a client's record being saved as `data` (None if deleted)."""
+        with self._lock:
+            self._remove_client(user_id)
+            if data is not None:
+                self._add_client(user_id, data)
+            self.version += 1
+
+    def rebuild(self, translators, clients) -> None:
+        """Recount everything from (user_id, data) pairs, e.g. after loading."""
+        with self._lock:
+            version = self.version
+            self._reset()
+            # Keep the version increasing, so cached summaries never match again
+            self.version = version + 1
+            for user_id, data in translators:
+                self._add_translator(user_id, data)
+            for user_id, data in clients:
+                self._add_client(user_id, data)
+
+    # Reads
+    def price_summary(self) -> Dict[str, float]:
+        """Average, minimum and maximum translator price."""
+        with self._lock:
+            if not self.price_count:
+                return {'avg': 0, 'min': 0, 'max': 0}
+            return {
+                'avg': self.price_sum / self.price_count,
+                'min': self._distinct_prices[0],
+                'max': self._distinct_prices[-1],
+            }
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Counters for the JSON API and the dashboard."""
+        with self._lock:
+            return {
+                'translator_count': self.translator_count,
+                'client_count': self.client_count,
+                'cities': {
+                    'translators': list(self.translator_cities),
+                    'clients': list(self.client_cities)
+                },
+                'verified_clients': self.verified_clients,
+                'unverified_clients': self.unverified_clients,
+                'suspicious_clients': len(self.suspicious_clients),
+            }
+
+    def summary(self, texts: Sequence[str]) -> str:
+        """
+        The Markdown summary for the /admin command in the locale of the
+        message table `texts`, cached until the next change.
+        """
+        with self._lock:
+            if self._summary_version != self.version:
+                self._summaries = {}
+                self._summary_version = self.version
+            summary = self._summaries.get(texts.code)
+            if summary is None:
+                summary = self._summaries[texts.code] = self._build_summary(texts)
+            return summary
+
+    def _build_summary(self, texts: Sequence[str]) -> str:
+        translators = self.translator_count
+        clients = self.client_count
+
+        summary = texts[ADMIN_SUMMARY].format(
+            translators,
+            clients,
+            translators / clients if clients > 0 else translators,
+            self.verified_clients,
+            self.unverified_clients,
+            len(self.suspicious_clients)
+        )
+
+        if self.price_count:
+            summary += texts[ADMIN_SUMMARY_PRICES].format(
+                self.price_sum / self.price_count, self._distinct_prices[0], self._distinct_prices[-1]
+            )
+
+        summary += texts[ADMIN_SUMMARY_TRANSLATOR_CITIES]
+        for city, count in sorted(self.translator_cities.items()):
+            summary += f"• {city}: {count}\n"
+
+        summary += texts[ADMIN_SUMMARY_CLIENT_CITIES]
+        for city, count in sorted(self.client_cities.items()):
+            summary += f"• {city}: {count}\n"
+
+        summary += texts[ADMIN_SUMMARY_LEVELS]
+        for level, count in sorted(self.translator_levels.items()):
+            summary += f"• {level}: {count}\n"
+
+        # Add suspicious verifications if any
+        suspicious = self.suspicious_clients
+        if suspicious:
+            summary += texts[ADMIN_SUMMARY_SUSPICIOUS]
+            for i, sv in enumerate(suspicious.values(), 1):
+                verification = sv['verification_text']
+                if len(verification) > 30:
+                    verification = verification[:27] + "..."
+                summary += texts[ADMIN_SUMMARY_SUSPICIOUS_LINE].format(sv['user_id'], sv['city'], verification)
+
+                # Limit to 5 suspicious users to avoid message size limits
+                if i >= 5 and len(suspicious) > 5:
+                    summary += texts[ADMIN_SUMMARY_MORE].format(len(suspicious) - 5)
+                    break
+
+        return summary
@@ -0,0 +1,6 @@
+"""
+Offline benchmarks for the Translation Service Bot.
+
+Run a benchmark from the repository root, e.g.:
+    python -m benchmarks.storage_writes
+"""
@@ -0,0 +1,338 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Drive the real bot with synthetic Telegram updates, offline.
+
+Builds the Application with bot.create_bot, points it at the local fake
+Bot API and feeds update streams through getUpdates long polling:
+
+  registration  users going through /start and the translator or client form
+  chatter       group messages from clients, translators and strangers, with spam
+  admin         /admin calls from an admin
+
+Reports throughput, end-to-end latency (fed to fully processed), p50/p99
+latency per handler and peak RSS. Data is written to a temporary
+directory, so the run leaves nothing behind.
+
+To compare two commits, save the results of each and pass one as the baseline:
+
+  git worktree add /tmp/base <commit>
+  python -m benchmarks.bot_load --root /tmp/base --output base.json
+  python -m benchmarks.bot_load --baseline base.json
+
+--root imports the bot from another checkout while the benchmark itself
+comes from this one, so older commits without this file can be measured.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import resource
+import sys
+import tempfile
+import time
+from collections import defaultdict
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+from benchmarks.fake_bot_api import FakeBotAPI  # noqa: E402
+from benchmarks.spam_filter import CORPUS  # noqa: E402
+
+TOKEN = "123456:BENCHMARK"
+GROUP_ID = -1001234567890
+ADMIN_ID = 892197915  # The default ADMIN_USER_IDS
+CITIES = ["Berlin", "Hamburg", "München", "Köln", "Frankfurt", "Leipzig"]
+# Telegram app languages of the users, as in a mixed Russian/Ukrainian/German group
+LANGUAGE_CODES = ["ru", "uk", "de", "ru", "en", "uk"]
+
+
+def percentile(samples, fraction):
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, int(len(samples) * fraction))] if samples else 0.0
+
+
+class Updates:
+    """Builds Bot API update payloads."""
+
+    def __init__(self):
+        self._message_ids = defaultdict(int)
+
+    @staticmethod
+    def user(user_id):
+        return {"id": user_id, "is_bot": False, "first_name": f"User{user_id}",
+                "language_code": LANGUAGE_CODES[user_id % len(LANGUAGE_CODES)]}
+
+    def message(self, user_id, text, chat_id=None):
+        chat_id = chat_id or user_id
+        self._message_ids[chat_id] += 1
+        message = {
+            "message_id": self._message_ids[chat_id],
+            "date": int(time.time()),
+            "chat": {"id": chat_id, "type": "private"} if chat_id > 0 else
+                    {"id": chat_id, "type": "supergroup", "title": "Benchmark group", "username": "benchmark"},
+            "from": self.user(user_id),
+            "text": text,
+        }
+        if text.startswith("/"):
+            message["entities"] = [{"type": "bot_command", "offset": 0, "length": len(text.split()[0])}]
+        return {"message": message}
+
+    def callback(self, user_id, data):
+        return {"callback_query": {
+            "id": str(user_id),
+            "from": self.user(user_id),
+            "chat_instance": str(user_id),
+            "data": data,
+            "message": {
+                "message_id": 1,
+                "date": int(time.time()),
+                "chat": {"id": user_id, "type": "private"},
+                "from": {"id": 1000, "is_bot": True, "first_name": "Fake"},
+                "text": "start",
+            },
+        }}
+
+
+def registration_stream(rng, updates, users, first_user_id):
+    """Interleaved registrations; each user's updates stay in order."""
+    flows = []
+    for user_id in range(first_user_id, first_user_id + users):
+        city = rng.choice(CITIES)
+        if rng.random() < 0.5:
+            flow = [
+                updates.message(user_id, "/start"),
+                updates.callback(user_id, "translator"),
+                updates.message(user_id, f"Translator {user_id}"),
+                updates.message(user_id, city),
+                updates.message(user_id, rng.choice(["B1", "B2", "C1", "C2"])),
+                updates.message(user_id, str(rng.randint(15, 60))),
+                updates.message(user_id, f"@translator{user_id}"),
+            ]
+        else:
+            flow = [
+                updates.message(user_id, "/start"),
+                updates.callback(user_id, "client"),
+                updates.message(user_id, city),
+                updates.message(user_id, "Termin beim Arzt, brauche Begleitung"),
+            ]
+        flows.append(flow)
+
+    stream = []
+    while flows:
+        flow = rng.choice(flows)
+        stream.append(flow.pop(0))
+        if not flow:
+            flows.remove(flow)
+    return stream
+
+
+def chatter_stream(rng, updates, count, clients, translators, first_stranger_id):
+    """Group messages: mostly clients, some translators and unregistered users, with spam."""
+    stream = []
+    for _ in range(count):
+        roll = rng.random()
+        if roll < 0.7:
+            user_id = rng.choice(clients)
+        elif roll < 0.85:
+            user_id = rng.choice(translators)
+        else:
+            user_id = first_stranger_id + rng.randrange(1000)
+        stream.append(updates.message(user_id, rng.choice(CORPUS), chat_id=GROUP_ID))
+    return stream
+
+
+def admin_stream(updates, count):
+    return [updates.message(ADMIN_ID, "/admin") for _ in range(count)]
+
+
+def seed_users(rng, translators, clients):
+    """Registered users for the chatter scenario, saved directly through data_manager."""
+    from data_manager import save_client_data, save_translator_data, save_user_type
+
+    for user_id in translators:
+        save_user_type(user_id, "translator")
+        save_translator_data(user_id, {
+            "name": f"Translator {user_id}", "city": rng.choice(CITIES),
+            "language_level": rng.choice(["B2", "C1"]), "price": str(rng.randint(15, 60)),
+            "contact": f"@translator{user_id}",
+        })
+    for user_id in clients:
+        save_user_type(user_id, "client")
+        save_client_data(user_id, {
+            "city": rng.choice(CITIES), "service_needed": "Arzt", "registration_complete": True,
+        })
+
+
+class Recorder:
+    """Handler and end-to-end timings, collected by patching python-telegram-bot entry points."""
+
+    def __init__(self):
+        self.handlers = defaultdict(list)
+        self.fed = {}
+        self.done = {}
+
+    def install(self):
+        from telegram.ext import Application, BaseHandler
+
+        recorder = self
+        handle_update = BaseHandler.handle_update
+        process_update = Application.process_update
+
+        async def timed_handle_update(self, update, application, check_result, context):
+            start = time.perf_counter()
+            try:
+                return await handle_update(self, update, application, check_result, context)
+            finally:
+                name = getattr(self.callback, "__name__", type(self).__name__)
+                recorder.handlers[name].append(time.perf_counter() - start)
+
+        async def timed_process_update(self, update):
+            try:
+                return await process_update(self, update)
+            finally:
+                recorder.done[update.update_id] = time.perf_counter()
+
+        BaseHandler.handle_update = timed_handle_update
+        Application.process_update = timed_process_update
+
+
+async def run_scenario(name, stream, rate, latency, recorder):
+    """Start the bot, feed `stream` at `rate` updates/s (0: all at once), wait until all are processed."""
+    from bot import create_bot
+
+    api = FakeBotAPI(latency=latency, flood_limits=False)
+    await api.start()
+    application = create_bot(TOKEN)
+    # The builder has no base URL option in create_bot; point the bot at the fake API
+    application.bot._base_url = api.base_url + TOKEN
+    await application.initialize()
+    await application.updater.start_polling(poll_interval=0.0, timeout=1)
+    await application.start()
+
+    recorder.handlers.clear()
+    recorder.fed.clear()
+    recorder.done.clear()
+    start = time.perf_counter()
+    for number, update in enumerate(stream):
+        if rate:
+            delay = start + number / rate - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+        recorder.fed[api.feed(update)] = time.perf_counter()
+        if not rate and number % 100 == 99:
+            await asyncio.sleep(0)
+
+    while len(recorder.done) < len(stream):
+        await asyncio.sleep(0.01)
+    elapsed = max(recorder.done.values()) - start
+
+    await application.updater.stop()
+    await application.stop()
+    await application.shutdown()
+    await api.stop()
+
+    latencies = [recorder.done[update_id] - fed for update_id, fed in recorder.fed.items()]
+    return {
+        "updates": len(stream),
+        "seconds": elapsed,
+        "updates_per_second": len(stream) / elapsed if elapsed else 0.0,
+        "latency_p50_ms": percentile(latencies, 0.50) * 1e3,
+        "latency_p99_ms": percentile(latencies, 0.99) * 1e3,
+        "api_requests": api.requests,
+        "handlers": {
+            handler: {
+                "calls": len(samples),
+                "p50_ms": percentile(samples, 0.50) * 1e3,
+                "p99_ms": percentile(samples, 0.99) * 1e3,
+            }
+            for handler, samples in sorted(recorder.handlers.items())
+        },
+    }
+
+
+def peak_rss_mb():
+    # ru_maxrss is in kilobytes on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def print_results(results, baseline=None):
+    def delta(new, old):
+        return f" ({(new - old) / old * 100:+.0f}%)" if old else ""
+
+    for scenario, result in results["scenarios"].items():
+        base = (baseline or {}).get("scenarios", {}).get(scenario, {})
+        print(f"\n{scenario}: {result['updates']} updates in {result['seconds']:.2f} s")
+        for key, label in (("updates_per_second", "throughput/s"), ("latency_p50_ms", "e2e p50 ms"),
+                           ("latency_p99_ms", "e2e p99 ms")):
+            print(f"  {label:<16} {result[key]:10.1f}{delta(result[key], base.get(key))}")
+        print(f"  {'handler':<28} {'calls':>7} {'p50 ms':>9} {'p99 ms':>9}")
+        for handler, stats in result["handlers"].items():
+            old = base.get("handlers", {}).get(handler, {})
+            print(f"  {handler:<28} {stats['calls']:7d} {stats['p50_ms']:9.3f} {stats['p99_ms']:9.3f}"
+                  f"{delta(stats['p99_ms'], old.get('p99_ms'))}")
+    old_rss = (baseline or {}).get("peak_rss_mb")
+    print(f"\npeak RSS {results['peak_rss_mb']:.1f} MB{delta(results['peak_rss_mb'], old_rss)}")
+
+
+async def run(args):
+    rng = random.Random(args.seed)
+    updates = Updates()
+    recorder = Recorder()
+    recorder.install()
+
+    translators = list(range(10000, 10000 + args.users // 2))
+    clients = list(range(20000, 20000 + args.users))
+    seed_users(rng, translators, clients)
+
+    streams = {
+        "registration": registration_stream(rng, updates, args.users, 100000),
+        "chatter": chatter_stream(rng, updates, args.messages, clients, translators, 500000),
+        "admin": admin_stream(updates, args.admin_calls),
+    }
+    scenarios = {}
+    for name in args.scenarios:
+        scenarios[name] = await run_scenario(name, streams[name], args.rate, args.latency, recorder)
+    return {"scenarios": scenarios, "peak_rss_mb": peak_rss_mb()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--scenarios", nargs="+", default=["registration", "chatter", "admin"],
+                        choices=["registration", "chatter", "admin"])
+    parser.add_argument("--users", type=int, default=500, help="Users registering; also the seeded population")
+    parser.add_argument("--messages", type=int, default=5000, help="Group messages in the chatter scenario")
+    parser.add_argument("--admin-calls", type=int, default=200)
+    parser.add_argument("--rate", type=float, default=0, help="Updates per second (0: as fast as possible)")
+    parser.add_argument("--latency", type=float, default=0.005, help="Fake API response time in seconds")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--root", help="Checkout to import the bot from (default: this one)")
+    parser.add_argument("--output", help="Write the results as JSON")
+    parser.add_argument("--baseline", help="Results JSON of an earlier run to compare against")
+    args = parser.parse_args()
+
+    if args.root:
+        sys.path.insert(0, os.path.abspath(args.root))
+    output = os.path.abspath(args.output) if args.output else None
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+    # The bot keeps its data under ./data; keep the run's data out of the checkout
+    os.chdir(tempfile.mkdtemp(prefix="bot_load_"))
+    os.environ.setdefault("LOG_LEVEL", "WARNING")
+    import logging
+    logging.basicConfig(level=logging.WARNING)
+
+    results = asyncio.run(run(args))
+    print_results(results, baseline)
+    if output:
+        with open(output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
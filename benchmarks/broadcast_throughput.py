@@ -0,0 +1,207 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Sustained broadcast throughput against the local fake Bot API.
+
+Sends the same batch of messages twice: once as a naive burst of
+concurrent send_message calls, once through BroadcastQueue. Reports
+delivered messages per second and how many requests were rejected
+with 429 (flood control) for each.
+
+Before that, checks the queue's guarantees against the same fake API:
+a RetryAfter pauses all sends, a duplicate key is rejected, and after a
+restart pending jobs resume while sent ones are not sent again, also
+when the stop cancelled a send in flight. --checks-only skips the
+throughput runs.
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+from telegram import Bot  # noqa: E402
+from telegram.error import TelegramError  # noqa: E402
+from telegram.request import HTTPXRequest  # noqa: E402
+
+from benchmarks.fake_bot_api import FakeBotAPI  # noqa: E402
+from broadcast import BroadcastQueue  # noqa: E402
+from config import BROADCAST_CONCURRENCY  # noqa: E402
+
+
+def make_jobs(messages, chats):
+    """(chat_id, text) pairs spread round-robin over `chats` private chats."""
+    return [(100000 + i % chats, f"Notification {i}") for i in range(messages)]
+
+
+async def connect(api):
+    bot = Bot("123456:TEST", base_url=api.base_url,
+              request=HTTPXRequest(connection_pool_size=BROADCAST_CONCURRENCY * 2))
+    await bot.initialize()
+    return bot
+
+
+def report(label, api, elapsed):
+    rate = api.delivered / elapsed if elapsed else 0.0
+    print(f"{label:<10} delivered {api.delivered:5d} in {elapsed:6.1f} s  "
+          f"{rate:6.1f} msg/s  429s: {api.rejected}")
+
+
+async def naive(jobs, latency):
+    """Every message at once, no limits, no retries."""
+    api = FakeBotAPI(latency=latency)
+    await api.start()
+    bot = await connect(api)
+    start = time.perf_counter()
+
+    async def send(chat_id, text):
+        try:
+            await bot.send_message(chat_id=chat_id, text=text)
+        except TelegramError:
+            pass
+
+    await asyncio.gather(*(send(chat_id, text) for chat_id, text in jobs))
+    report("naive", api, time.perf_counter() - start)
+    await bot.shutdown()
+    await api.stop()
+
+
+async def queued(jobs, latency):
+    """Through BroadcastQueue until every message is delivered."""
+    api = FakeBotAPI(latency=latency)
+    await api.start()
+    bot = await connect(api)
+    queue = BroadcastQueue(persist=False)
+    for chat_id, text in jobs:
+        queue.enqueue(chat_id, text)
+
+    start = time.perf_counter()
+    await queue.start(bot)
+    while queue.sent + queue.failed < len(jobs):
+        await asyncio.sleep(0.05)
+    report("queue", api, time.perf_counter() - start)
+    await queue.stop()
+    await bot.shutdown()
+    await api.stop()
+
+
+async def wait_for(condition, timeout=10.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        await asyncio.sleep(0.01)
+
+
+async def check_flood_pause():
+    """After a 429, no message is sent to any chat until retry_after has passed."""
+    # The API allows 3 messages per second; the queue's own limits are far higher
+    api = FakeBotAPI(latency=0.001, global_per_second=3, chat_per_second=100, chat_burst=100)
+    await api.start()
+    bot = await connect(api)
+    queue = BroadcastQueue(global_per_second=1000, chat_per_second=1000, concurrency=1, persist=False)
+    for chat_id, text in make_jobs(8, 8):
+        queue.enqueue(chat_id, text)
+    await queue.start(bot)
+    await wait_for(lambda: queue.sent == 8)
+    await queue.stop()
+    await bot.shutdown()
+    await api.stop()
+
+    assert queue.flood_waits >= 1 and api.rejected == queue.flood_waits, (queue.flood_waits, api.rejected)
+    for arrived, _, status, retry_after in api.sends:
+        if status == 429:
+            during_pause = [t for t, _, _, _ in api.sends if arrived < t < arrived + retry_after - 0.05]
+            assert not during_pause, f"{len(during_pause)} sends during a flood pause"
+
+
+async def check_duplicates():
+    """A key already queued is rejected, so is the same chat and text without a key."""
+    queue = BroadcastQueue(persist=False)
+    assert queue.enqueue(1, "Hello", key="request:1")
+    assert not queue.enqueue(1, "Other text", key="request:1")
+    assert queue.enqueue(2, "Hello")
+    assert not queue.enqueue(2, "Hello")
+    assert queue.duplicates == 2 and queue.get_stats()["pending"] == 2
+
+
+async def check_restart():
+    """Pending jobs resume after a restart, sent ones are neither resent nor accepted again."""
+    from data_manager import get_broadcast_jobs, init_data
+
+    init_data()
+    api = FakeBotAPI(latency=0.001, flood_limits=False)
+    await api.start()
+    bot = await connect(api)
+    jobs = make_jobs(6, 6)
+
+    # Two messages per second, so the first process stops with most of them pending
+    first = BroadcastQueue(global_per_second=2)
+    for chat_id, text in jobs:
+        assert first.enqueue(chat_id, text, key=text)
+    await first.start(bot)
+    await wait_for(lambda: first.sent >= 2)
+    await first.stop()
+    sent_before = first.sent
+    assert sent_before < len(jobs)
+
+    # A new process: restores the persisted jobs
+    second = BroadcastQueue(global_per_second=100)
+    assert not second.enqueue(jobs[0][0], jobs[0][1], key=jobs[0][1]), "a sent key was accepted again"
+    await second.start(bot)
+    await wait_for(lambda: second.sent == len(jobs) - sent_before)
+    await second.stop()
+    assert all(api.messages[job] == 1 for job in jobs), api.messages
+    assert all(job["status"] == "sent" for job in get_broadcast_jobs().values())
+
+    # A stop that cancels a send in flight leaves the job pending; the next start sends it
+    slow = FakeBotAPI(latency=0.5, flood_limits=False)
+    await slow.start()
+    slow_bot = await connect(slow)
+    queue = BroadcastQueue()
+    queue.enqueue(42, "In flight", key="in-flight")
+    await queue.start(slow_bot)
+    await wait_for(lambda: slow.requests >= 2)  # getMe, then the sendMessage
+    await queue.stop(timeout=0)
+    assert queue.sent == 0 and get_broadcast_jobs()["in-flight"]["status"] == "pending"
+    await queue.start(slow_bot)
+    await wait_for(lambda: queue.sent == 1)
+    await queue.stop()
+
+    for connection, server in ((bot, api), (slow_bot, slow)):
+        await connection.shutdown()
+        await server.stop()
+
+
+def checks():
+    # The persistent queue writes to ./data; keep it out of the checkout
+    os.chdir(tempfile.mkdtemp())
+    for check in (check_flood_pause, check_duplicates, check_restart):
+        asyncio.run(check())
+        print(f"ok  {check.__name__}: {check.__doc__}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--messages", type=int, default=500)
+    parser.add_argument("--chats", type=int, default=200, help="Distinct recipients")
+    parser.add_argument("--latency", type=float, default=0.03, help="Fake API response time in seconds")
+    parser.add_argument("--checks-only", action="store_true", help="Only check the queue's guarantees")
+    args = parser.parse_args()
+
+    checks()
+    if args.checks_only:
+        return
+    jobs = make_jobs(args.messages, args.chats)
+    print(f"{args.messages} messages to {args.chats} chats, API latency {args.latency * 1e3:.0f} ms")
+    asyncio.run(naive(jobs, args.latency))
+    asyncio.run(queued(jobs, args.latency))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,197 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+A local stand-in for the Telegram Bot API, for benchmarks.
+
+Serves the few methods the bot uses over plain HTTP on 127.0.0.1, with a
+configurable response latency and Telegram's flood limits: requests over
+the global or per-chat rate get a 429 with retry_after, like the real API.
+Point a telegram.Bot at it with base_url=server.base_url.
+
+Updates passed to feed() are served by getUpdates with long polling, so
+a polling Application can be driven with synthetic traffic.
+"""
+
+import asyncio
+import collections
+import itertools
+import json
+import math
+import os
+import sys
+import time
+from typing import Any, Deque, Dict, Optional, Tuple
+from urllib.parse import parse_qsl
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+BOT_USER = {"id": 1000, "is_bot": True, "first_name": "Fake", "username": "fake_bot"}
+
+
+class FakeBotAPI:
+    """HTTP/1.1 server answering getMe, getUpdates, sendMessage and a few other methods."""
+
+    def __init__(self, latency: float = 0.02, global_per_second: float = 30,
+                 chat_per_second: float = 1, chat_burst: int = 3, flood_limits: bool = True):
+        self.latency = latency
+        self._global = self._chats = None
+        if flood_limits:
+            # Imported here, so benchmarks without flood limits don't load the bot's modules
+            from rate_limiter import RateLimiter
+            self._global = RateLimiter(global_per_second, period=1.0)
+            self._chats = RateLimiter(chat_burst, period=chat_burst / chat_per_second)
+        self._message_ids = itertools.count(1)
+        self._update_ids = itertools.count(1)
+        self._updates: Deque[Dict[str, Any]] = collections.deque()  # Fed, not yet confirmed
+        self._new_updates = asyncio.Event()
+        self._server: Optional[asyncio.AbstractServer] = None
+        self.port = 0
+
+        # Counters
+        self.requests = 0
+        self.delivered = 0
+        self.rejected = 0  # 429 responses
+        self.first_delivery: Optional[float] = None
+        self.last_delivery: Optional[float] = None
+        self.methods = collections.Counter()
+        self.messages = collections.Counter()  # (chat_id, text) -> deliveries
+        self.sends = []  # (arrival time, chat_id, HTTP status, retry_after) of every sendMessage
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.port}/bot"
+
+    async def start(self) -> None:
+        self._server = await asyncio.start_server(self._serve, "127.0.0.1", 0)
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    async def stop(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+
+    def feed(self, update: Dict[str, Any]) -> int:
+        """Queue an update (without update_id) for getUpdates; returns its update_id."""
+        update_id = next(self._update_ids)
+        self._updates.append({"update_id": update_id, **update})
+        self._new_updates.set()
+        return update_id
+
+    # HTTP
+    async def _serve(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                _, path, _ = request_line.decode("latin-1").split(" ", 2)
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, value = line.decode("latin-1").split(":", 1)
+                    headers[name.strip().lower()] = value.strip()
+                body = await reader.readexactly(int(headers.get("content-length", "0")))
+
+                status, payload = await self._dispatch(path.rsplit("/", 1)[-1], body)
+                data = json.dumps(payload).encode("utf-8")
+                writer.write(
+                    f"HTTP/1.1 {status} {'OK' if status == 200 else 'Error'}\r\n"
+                    f"Content-Type: application/json\r\nContent-Length: {len(data)}\r\n"
+                    f"Connection: keep-alive\r\n\r\n".encode("latin-1") + data
+                )
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        except asyncio.CancelledError:
+            # A long poll still waiting when the event loop shuts down
+            pass
+        finally:
+            writer.close()
+
+    @staticmethod
+    def _parameters(body: bytes) -> Dict[str, Any]:
+        """Form-encoded parameters; python-telegram-bot JSON-encodes non-string values."""
+        parameters = {}
+        for name, value in parse_qsl(body.decode("utf-8")):
+            try:
+                parameters[name] = json.loads(value)
+            except ValueError:
+                parameters[name] = value
+        return parameters
+
+    # Methods
+    async def _dispatch(self, method: str, body: bytes) -> Tuple[int, Dict[str, Any]]:
+        self.requests += 1
+        self.methods[method] += 1
+        parameters = self._parameters(body)
+        if method == "getUpdates":
+            return await self._get_updates(parameters)
+        await asyncio.sleep(self.latency)
+
+        if method == "getMe":
+            return 200, {"ok": True, "result": BOT_USER}
+        if method == "sendMessage":
+            return self._send_message(parameters)
+        if method == "editMessageText":
+            return 200, {"ok": True, "result": self._message(int(parameters["chat_id"]), parameters)}
+        if method in ("deleteWebhook", "setWebhook", "setMyCommands", "answerCallbackQuery", "deleteMessages"):
+            return 200, {"ok": True, "result": True}
+        return 404, {"ok": False, "error_code": 404, "description": "Not Found: method not found"}
+
+    def _flood(self, wait: float) -> Tuple[int, Dict[str, Any]]:
+        self.rejected += 1
+        retry_after = max(1, math.ceil(wait))
+        return 429, {
+            "ok": False,
+            "error_code": 429,
+            "description": f"Too Many Requests: retry after {retry_after}",
+            "parameters": {"retry_after": retry_after}
+        }
+
+    async def _get_updates(self, parameters: Dict[str, Any]) -> Tuple[int, Dict[str, Any]]:
+        """Long polling: confirm updates before `offset`, wait up to `timeout` for new ones."""
+        offset = int(parameters.get("offset") or 0)
+        while self._updates and self._updates[0]["update_id"] < offset:
+            self._updates.popleft()
+        if not self._updates:
+            self._new_updates.clear()
+            try:
+                await asyncio.wait_for(self._new_updates.wait(), timeout=float(parameters.get("timeout") or 0))
+            except asyncio.TimeoutError:
+                pass
+        limit = int(parameters.get("limit") or 100)
+        return 200, {"ok": True, "result": list(itertools.islice(self._updates, limit))}
+
+    def _message(self, chat_id: int, parameters: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "message_id": int(parameters.get("message_id") or next(self._message_ids)),
+            "date": int(time.time()),
+            "chat": {"id": chat_id, "type": "private" if chat_id > 0 else "supergroup"},
+            "from": BOT_USER,
+            "text": str(parameters.get("text", ""))
+        }
+
+    def _send_message(self, parameters: Dict[str, Any]) -> Tuple[int, Dict[str, Any]]:
+        chat_id = int(parameters["chat_id"])
+        now = time.monotonic()
+        if self._chats is not None:
+            wait = None
+            if not self._chats.allow(chat_id):
+                wait = self._chats.wait_time(chat_id)
+            elif not self._global.allow("global"):
+                wait = self._global.wait_time("global")
+            if wait is not None:
+                status, payload = self._flood(wait)
+                self.sends.append((now, chat_id, status, payload["parameters"]["retry_after"]))
+                return status, payload
+
+        self.sends.append((now, chat_id, 200, 0))
+        self.messages[chat_id, str(parameters.get("text", ""))] += 1
+        self.delivered += 1
+        self.first_delivery = self.first_delivery or now
+        self.last_delivery = now
+        return 200, {"ok": True, "result": self._message(chat_id, parameters)}
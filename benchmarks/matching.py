@@ -0,0 +1,121 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Measure translator matching on synthetic populations.
+
+Builds a MatchEngine over N translators spread over the known cities
+(skewed towards the large ones), checks its results against a full scan
+and reports build time and query latency percentiles.
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+from cities import CITY_COORDINATES, NEARBY_RADIUS_KM, city_key, nearby_cities, record_city_key  # noqa: E402
+from config import LANGUAGE_LEVELS  # noqa: E402
+from matching import LEVEL_RANK, MatchEngine  # noqa: E402
+from storage import MISSING_PRICE, parse_price  # noqa: E402
+
+CITIES = list(CITY_COORDINATES)
+
+
+def make_population(rng, size):
+    """Translators with Zipf-like city sizes, random levels and prices."""
+    weights = [1 / (rank + 1) for rank in range(len(CITIES))]
+    cities = rng.choices(CITIES, weights=weights, k=size)
+    return [
+        (user_id, {
+            "name": f"Translator {user_id}",
+            "city": city,
+            "language_level": rng.choice(LANGUAGE_LEVELS),
+            "price": str(rng.randint(10, 80)),
+            "contact": f"@translator{user_id}"
+        })
+        for user_id, city in enumerate(cities)
+    ]
+
+
+def full_scan(population, city, k, min_level, max_price):
+    """Reference ranking: score every translator and sort."""
+    city = city_key(city)
+    distances = {city: 0.0, **dict(nearby_cities(city, NEARBY_RADIUS_KM))}
+    min_rank = LEVEL_RANK[min_level] if min_level else -1
+    ranked = []
+    for user_id, data in population:
+        translator_city = record_city_key(data)
+        if translator_city not in distances:
+            continue
+        rank = LEVEL_RANK.get(data["language_level"].upper(), -1)
+        price = parse_price(data["price"])
+        price = MISSING_PRICE if price is None else price
+        if rank < min_rank or (max_price is not None and price > max_price):
+            continue
+        ranked.append((translator_city != city, -rank, price, user_id))
+    ranked.sort()
+    return [user_id for *_, user_id in ranked[:k]]
+
+
+def percentile(samples, fraction):
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, int(len(samples) * fraction))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--translators", type=int, default=100000)
+    parser.add_argument("--queries", type=int, default=2000)
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    population = make_population(rng, args.translators)
+    queries = [
+        (
+            rng.choice(CITIES),
+            rng.choice([None, "B1", "C1"]),
+            rng.choice([None, None, 20.0, 40.0])
+        )
+        for _ in range(args.queries)
+    ]
+
+    engine = MatchEngine()
+    start = time.perf_counter()
+    engine.rebuild(population)
+    build = time.perf_counter() - start
+
+    for city, min_level, max_price in queries[:50]:
+        expected = full_scan(population, city, args.k, min_level, max_price)
+        got = [match.user_id for match in engine.match(city, args.k, min_level, max_price)]
+        assert got == expected, (city, min_level, max_price, got, expected)
+
+    latencies = []
+    for city, min_level, max_price in queries:
+        start = time.perf_counter()
+        engine.match(city, args.k, min_level, max_price)
+        latencies.append(time.perf_counter() - start)
+
+    scan = []
+    for city, min_level, max_price in queries[:20]:
+        start = time.perf_counter()
+        full_scan(population, city, args.k, min_level, max_price)
+        scan.append(time.perf_counter() - start)
+
+    print(f"{args.translators} translators in {len(CITIES)} cities, top {args.k}")
+    print(f"  build            {build * 1e3:10.1f} ms")
+    print(f"  query p50        {percentile(latencies, 0.50) * 1e6:10.1f} us")
+    print(f"  query p99        {percentile(latencies, 0.99) * 1e6:10.1f} us")
+    print(f"  query max        {max(latencies) * 1e6:10.1f} us")
+    print(f"  full scan mean   {statistics.mean(scan) * 1e3:10.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Microbenchmark of the handler hot path: building and sending the replies.
+
+Runs /start, /help, /cancel and the registration steps that only reply
+(no saves) against stub updates whose reply_text does nothing, so what is
+measured is the handler itself: template lookup, formatting and keyboard
+construction. Senders come from a pool of first names, cities and
+Telegram languages, as in a group where the same names and cities
+recur. --root measures another checkout, e.g. a git worktree of the
+commit before the message catalog.
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import sys
+import tempfile
+import time
+from types import SimpleNamespace
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+FIRST_NAMES = ["Olga", "Ivan", "Natalia", "Sergei", "Anna", "Dmitri", "Oksana", "Taras", "Maria", "Andrii"]
+CITIES = ["Berlin", "Hamburg", "München", "Köln", "Frankfurt", "Stuttgart", "Dresden", "Leipzig"]
+# Telegram language_code of the senders, as in a mixed Russian/Ukrainian/German group
+LANGUAGE_CODES = ["ru", "ru", "uk", "uk", "de", "de-AT", "en", "pl", None]
+
+
+class Message:
+    """Stands in for telegram.Message: replies are counted, not sent."""
+
+    def __init__(self, text):
+        self.text = text
+        self.message_id = 1
+        self.replies = 0
+
+    async def reply_text(self, text, **kwargs):
+        self.replies += 1
+
+
+def make_update(rng, user_id, text):
+    user = SimpleNamespace(id=user_id, first_name=f"{rng.choice(FIRST_NAMES)} {user_id % 50}",
+                           language_code=rng.choice(LANGUAGE_CODES))
+    return SimpleNamespace(
+        effective_user=user,
+        effective_chat=SimpleNamespace(id=user_id, type="private"),
+        message=Message(text)
+    )
+
+
+def scenarios():
+    """Handler name and a function making its (update, context) arguments."""
+    import handlers
+    import conversation_flows as flows
+
+    def context(user_data=None):
+        return SimpleNamespace(user_data=dict(user_data or {}), args=[])
+
+    return [
+        ("/start", handlers.start_command, lambda rng, uid: context(), lambda rng: ""),
+        ("/help", handlers.help_command, lambda rng, uid: context(), lambda rng: ""),
+        ("/cancel", handlers.cancel_command, lambda rng, uid: context(), lambda rng: ""),
+        ("name step", flows.translator_name, lambda rng, uid: context(), lambda rng: rng.choice(FIRST_NAMES)),
+        ("city step", flows.translator_city, lambda rng, uid: context(), lambda rng: rng.choice(CITIES)),
+        ("level step", flows.translator_language_level, lambda rng, uid: context(), lambda rng: "B2"),
+        ("bad level step", flows.translator_language_level, lambda rng, uid: context(), lambda rng: "X9"),
+        ("price step", flows.translator_price, lambda rng, uid: context(), lambda rng: "25"),
+        ("client city step", flows.client_city, lambda rng, uid: context(), lambda rng: rng.choice(CITIES)),
+    ]
+
+
+async def measure(handler, make_context, make_text, count, seed):
+    rng = random.Random(seed)
+    calls = [
+        (make_update(rng, user_id, make_text(rng)), make_context(rng, user_id))
+        for user_id in range(count)
+    ]
+    start = time.perf_counter()
+    for update, context in calls:
+        await handler(update, context)
+    elapsed = time.perf_counter() - start
+    assert all(update.message.replies for update, _ in calls)
+    return elapsed / count
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--calls", type=int, default=20000, help="Calls per handler")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--root", default=ROOT_DIR, help="Checkout to measure (default: this one)")
+    args = parser.parse_args()
+    sys.path.insert(0, os.path.abspath(args.root))
+
+    # Handlers may touch the data directory; keep it out of the checkout
+    os.chdir(tempfile.mkdtemp())
+    loop = asyncio.new_event_loop()
+    total = 0.0
+    print(f"{'handler':<18} {'per call':>10}")
+    for name, handler, make_context, make_text in scenarios():
+        # A warm-up round first: imports and one-time loading are not the hot path
+        loop.run_until_complete(measure(handler, make_context, make_text, 100, args.seed))
+        per_call = loop.run_until_complete(measure(handler, make_context, make_text, args.calls, args.seed))
+        total += per_call
+        print(f"{name:<18} {per_call * 1e6:7.2f} µs")
+    print(f"{'sum':<18} {total * 1e6:7.2f} µs")
+    loop.close()
+
+
+if __name__ == "__main__":
+    main()
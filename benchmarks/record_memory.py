@@ -0,0 +1,111 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Compare the memory use of translator records as plain dicts and as records.Translator.
+
+Loads N synthetic translators the way the JSON store does (json.load of
+snapshot data) and keeps them either as the parsed dicts, as before, or
+as slotted Translator records. Reports the retained memory per record
+and what building the full translator listing allocates in each case.
+Measured with tracemalloc, so absolute numbers include its bookkeeping.
+"""
+
+import argparse
+import gc
+import json
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+from cities import GERMAN_CITIES, city_id  # noqa: E402
+from config import LANGUAGE_LEVELS  # noqa: E402
+from records import Translator, from_stored  # noqa: E402
+
+# Records per json.loads call; like a snapshot file, each batch shares its key strings
+BATCH = 10000
+
+
+def make_batches(rng, size):
+    """JSON texts of `size` translators, as stored in the snapshot file."""
+    batches = []
+    for start in range(0, size, BATCH):
+        batch = {}
+        for user_id in range(start, min(size, start + BATCH)):
+            city = rng.choice(GERMAN_CITIES)
+            batch[str(1000000000 + user_id)] = {
+                "name": f"Translator {user_id}",
+                "city": city,
+                "city_id": city_id(city),
+                "language_level": rng.choice(LANGUAGE_LEVELS),
+                "price": str(rng.randint(10, 80)),
+                "contact": f"@translator{user_id}"
+            }
+        batches.append(json.dumps(batch, ensure_ascii=False))
+    return batches
+
+
+def load_dicts(batches):
+    records = {}
+    for text in batches:
+        records.update((int(key), value) for key, value in json.loads(text).items())
+    return records
+
+
+def load_records(batches):
+    records = {}
+    for text in batches:
+        records.update(
+            (key, from_stored("translators", key, value))
+            for key, value in ((int(k), v) for k, v in json.loads(text).items())
+        )
+    return records
+
+
+def measure(build):
+    """(retained bytes, peak bytes, seconds, result) of calling build() under tracemalloc."""
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = build()
+    elapsed = time.perf_counter() - start
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return current, peak, elapsed, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--records", type=int, default=1000000)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    batches = make_batches(random.Random(args.seed), args.records)
+    print(f"{args.records} translators, sizes from tracemalloc")
+    print(f"{'':<10} {'load':>12} {'per record':>12} {'load peak':>12} {'listing':>12} {'load time':>10}")
+
+    for label, load, listing in (
+        # Before: dict records, listings copied each one with user_id merged in
+        ("dict", load_dicts, lambda records: [{"user_id": user_id, **data} for user_id, data in records.items()]),
+        # After: records carry their user_id, listings hold references
+        ("Translator", load_records, lambda records: list(records.values())),
+    ):
+        retained, peak, elapsed, records = measure(lambda: load(batches))
+        listed, _, _, result = measure(lambda: listing(records))
+        del result
+        print(f"{label:<10} {retained / 2**20:9.1f} MB {retained / args.records:9.0f} B "
+              f"{peak / 2**20:9.1f} MB {listed / 2**20:9.1f} MB {elapsed:9.2f} s")
+        del records
+
+    sample = Translator(1, name="x", city="Berlin", city_id=0, language_level="B2", price="25", contact="@x")
+    print(f"sys.getsizeof: Translator {sys.getsizeof(sample)} B, "
+          f"dict {sys.getsizeof(json.loads(json.dumps(sample.to_dict())))} B (without values)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Measure how long a worker takes to catch up with another process's writes.
+
+Runs data_manager in multi-process mode over a SQLite database of N
+translators and as many clients, with REVALIDATE_INTERVAL=0. A second
+store on the same file stands in for another worker: it saves one
+translator, client or request at a time, and the time of the next
+get_admin_stats() call, which revalidates, is reported. Then checks that
+after a random mix of saves and deletions by the other process the admin
+statistics, the matching index and the open requests equal ones built
+from scratch. --root measures another checkout, e.g. a git worktree of
+the commit before per-record revalidation.
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CITIES = ["Berlin", "Hamburg", "Munich", "Cologne", "Frankfurt", "Stuttgart", "Dresden", "Leipzig"]
+LEVELS = ["A1", "A2", "B1", "B2", "C1", "C2", "NATIVE"]
+
+
+def make_translator(rng, user_id):
+    return {
+        "user_id": user_id,
+        "name": f"Translator {user_id}",
+        "city": rng.choice(CITIES),
+        "language_level": rng.choice(LEVELS),
+        "price": str(rng.randint(10, 60)),
+        "contact": f"@translator{user_id}"
+    }
+
+
+def make_client(rng, user_id):
+    return {
+        "user_id": user_id,
+        "city": rng.choice(CITIES),
+        "registration_complete": rng.random() < 0.8,
+        "service_needed": rng.choice(["Doctor's appointment", "Jobcenter", "translation of documents"])
+    }
+
+
+def make_request(rng, message_id):
+    return {
+        "chat_id": -100,
+        "message_id": message_id,
+        "user_id": rng.randint(0, 1000),
+        "city": rng.choice(CITIES),
+        "text": "Need a translator",
+        "link": None,
+        "created": time.time() + message_id,
+        "status": rng.choice(["open", "open", "fulfilled"])
+    }
+
+
+def foreign_write(other, rng, population, step):
+    """One write of the other process: a translator, a client or a request."""
+    kind = ("translators", "clients", "requests")[step % 3]
+    if kind == "translators":
+        user_id = rng.randrange(population)
+        other.put(kind, user_id, make_translator(rng, user_id))
+    elif kind == "clients":
+        user_id = population + rng.randrange(population)
+        other.put(kind, user_id, make_client(rng, user_id))
+    else:
+        other.put(kind, f"-100:{step}", make_request(rng, step))
+
+
+def check(data_manager, other, rng, population, steps=300):
+    """Random saves and deletions by the other process; the aggregates must match a rebuild."""
+    from admin_stats import AdminStats
+    from matching import MatchEngine
+    from request_tracker import RequestTracker
+
+    for step in range(steps):
+        if rng.random() < 0.15:
+            kind = rng.choice(["translators", "clients"])
+            offset = 0 if kind == "translators" else population
+            other.delete(kind, offset + rng.randrange(population))
+        else:
+            foreign_write(other, rng, population, step)
+        if rng.random() < 0.3:
+            data_manager.get_admin_stats()
+    data_manager.get_admin_stats()
+
+    store = data_manager._data()
+    stats, matcher, requests = AdminStats(), MatchEngine(), RequestTracker()
+    stats.rebuild(store.items("translators"), store.items("clients"))
+    matcher.rebuild(store.items("translators"))
+    requests.rebuild(store.items("requests"))
+
+    assert data_manager._stats.as_dict() == stats.as_dict(), "admin statistics differ"
+    assert data_manager._stats.price_summary() == stats.price_summary(), "price summary differs"
+    assert data_manager._stats.translator_levels == stats.translator_levels, "level counts differ"
+    for city in CITIES:
+        assert data_manager._matcher.match(city, k=population) == matcher.match(city, k=population), \
+            f"matches in {city} differ"
+    assert sorted(data_manager._requests.open_requests()) == sorted(requests.open_requests()), \
+        "open requests differ"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--population", type=int, default=20000, help="Translators (and clients)")
+    parser.add_argument("--writes", type=int, default=60, help="Foreign writes to time")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--root", default=ROOT_DIR, help="Checkout to measure (default: this one)")
+    args = parser.parse_args()
+    sys.path.insert(0, os.path.abspath(args.root))
+
+    os.chdir(tempfile.mkdtemp())
+    os.environ.update(STORAGE_BACKEND="sqlite", MULTI_PROCESS="true", REVALIDATE_INTERVAL="0",
+                      LOG_LEVEL="WARNING")
+    import data_manager
+    from storage import SQLiteStore
+
+    rng = random.Random(args.seed)
+    other = SQLiteStore(os.path.join("data", "bot.db"))
+    other.load()
+    other.put_many("translators", [(user_id, make_translator(rng, user_id)) for user_id in range(args.population)])
+    other.put_many("clients", [
+        (user_id, make_client(rng, user_id)) for user_id in range(args.population, 2 * args.population)
+    ])
+
+    start = time.perf_counter()
+    data_manager.init_data()
+    print(f"load of {args.population} translators and clients: {(time.perf_counter() - start) * 1e3:.0f} ms")
+
+    timings = []
+    for step in range(args.writes):
+        foreign_write(other, rng, args.population, step)
+        start = time.perf_counter()
+        data_manager.get_admin_stats()
+        timings.append(time.perf_counter() - start)
+    print(f"revalidation after one foreign write: median {statistics.median(timings) * 1e3:.2f} ms, "
+          f"max {max(timings) * 1e3:.2f} ms")
+
+    start = time.perf_counter()
+    data_manager.get_admin_stats()
+    print(f"revalidation without changes: {(time.perf_counter() - start) * 1e3:.2f} ms")
+
+    check(data_manager, other, rng, args.population)
+    print("aggregates match a rebuild after foreign saves and deletions")
+
+
+if __name__ == "__main__":
+    main()
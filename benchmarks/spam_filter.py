@@ -0,0 +1,133 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Microbenchmark of spam classification over a mixed group-chat corpus.
+
+Compares the previous data_manager.is_spam_message and filters spam check
+with the single-pass classifier, in messages per second. The handler rows
+compare all checks handle_text_message makes on a message: trigger phrases
+and spam, before and after sharing one scan.
+"""
+
+import argparse
+import os
+import random
+import re
+import sys
+import time
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+from config import NEED_REPLACEMENT_PHRASES, TRANSLATOR_FOUND_PHRASES  # noqa: E402
+from message_classifier import classifier, is_spam  # noqa: E402
+
+CORPUS = [
+    # Russian
+    "Ищу переводчика в Берлине на завтра, нужно сходить к врачу в 10:00",
+    "Нужен переводчик в Гамбурге для Jobcenter, 2 часа, пятница",
+    "Кто может помочь с переводом документов для Ausländerbehörde в Мюнхене?",
+    "Переводчик найден, спасибо всем!",
+    "Нужна замена на четверг, Кёльн, прием у стоматолога",
+    "Добрый день! Подскажите, сколько стоит сопровождение в больницу в Дрездене?",
+    "Быстрый заработок без вложений, пишите в личку",
+    "Пассивный доход от 500€ в день, подробности по ссылке https://bit.ly/xyz",
+    "КРИПТОВАЛЮТА БЕСПЛАТНО ЗАБИРАЙ СЕЙЧАС",
+    "Требуется переводчик на свадьбу в Лейпциге, 3 июня, весь день",
+    # German
+    "Suche Dolmetscher für Russisch in Düsseldorf, Termin beim Arzt nächste Woche",
+    "Wer kann am Montag beim Bürgeramt in Frankfurt helfen?",
+    "Dringend: Übersetzung einer Geburtsurkunde, Stuttgart",
+    "Schnell Geld verdienen mit Bitcoin, melde dich jetzt!",
+    "Vielen Dank, Übersetzer gefunden.",
+    # English
+    "Looking for a translator in Bremen for a court hearing on Tuesday",
+    "Need someone for a parent-teacher meeting in Hanover, 1 hour",
+    "Congratulations, you've won a prize! Claim at http://win.example.top",
+    "translator found, thanks everyone",
+    "Join @group1 @group2 @group3 @group4 @group5 @group6 for more",
+    "Call me +4915112345678 for cheap services",
+    "Can anyone recommend a sworn translator in Nuremberg? Details: https://t.me/dolmecher/123",
+]
+
+
+def old_is_spam_message(text):
+    """data_manager.is_spam_message before the single-pass classifier."""
+    spam_patterns = [
+        r'https?://(?!t\.me)',
+        r'(?i)viagra|casino|lottery|winner|prize|money|bitcoin|crypto',
+        r'(?i)казино|лотерея|выигрыш|приз|деньги|биткоин|крипто|обогащение|доход',
+        r'(?i)заработок онлайн|быстрые деньги|инвестиции|вложения|пассивный доход',
+        r'\+\d{9,}',
+    ]
+    for pattern in spam_patterns:
+        if re.search(pattern, text):
+            return True
+    if sum(1 for c in text if c.isupper()) / max(1, len(text)) > 0.7:
+        return True
+    return False
+
+
+_OLD_FILTER_PATTERNS = [re.compile(pattern, re.IGNORECASE) for pattern in [
+    r'bitcoin', r'crypto', r'earn money fast', r'get rich', r'investment opportunity',
+    r'\b(viagra|cialis)\b', r'https?:\/\/.*\.(ru|cn|bid|click|top|tk)', r'casino', r'lottery',
+    r'prize', r'you\'ve won', r'биткоин', r'крипт(о|а|у|ой|е)', r'быстрый заработок',
+    r'заработ(ок|ать) быстро', r'инвестиционн(ая|ый|ое) возможност(ь|и)', r'казино',
+    r'лотере(я|и|ю)', r'выигр(ыш|ал|ать)', r'заработ(ай|аешь|ать|ок) деньги', r'доход от',
+    r'зарабатыва(й|ть)', r'обогащение', r'разбогате(й|ть)', r'выплат(а|ы) каждый день',
+    r'работа из дома', r'удаленная работа',
+]]
+
+
+def old_both_checks(text):
+    """Both previous spam checks, as a message would need to pass both lists."""
+    if old_is_spam_message(text):
+        return True
+    lowered = text.lower()
+    for pattern in _OLD_FILTER_PATTERNS:
+        if pattern.search(lowered):
+            return True
+    return len(re.findall(r'https?:\/\/\S+', lowered)) > 3 or len(re.findall(r'@\w+', lowered)) > 5
+
+
+def old_handler_checks(text):
+    """handle_text_message before the shared scan: phrase lists, then the spam check."""
+    message_text = text.lower()
+    found = any(phrase in message_text.lower() for phrase in TRANSLATOR_FOUND_PHRASES)
+    spam = is_spam(message_text)
+    replacement = any(phrase in message_text.lower() for phrase in NEED_REPLACEMENT_PHRASES)
+    return found, spam, replacement
+
+
+def throughput(func, messages):
+    """Messages classified per second."""
+    start = time.perf_counter()
+    for message in messages:
+        func(message)
+    return len(messages) / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--messages", type=int, default=200000, help="Number of messages to classify")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    messages = [rng.choice(CORPUS) for _ in range(args.messages)]
+
+    results = [
+        ("old is_spam_message", throughput(old_is_spam_message, messages)),
+        ("old both lists", throughput(old_both_checks, messages)),
+        ("single-pass classifier", throughput(is_spam, messages)),
+        ("old handler checks", throughput(old_handler_checks, messages)),
+        # Uncached, so every message is really scanned
+        ("handler single pass", throughput(classifier.classify, messages)),
+    ]
+    for label, rate in results:
+        print(f"{label:<24} {rate:12,.0f} msg/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Measure the cold start of the admin web app: import of main to the first served request.
+
+Each run is a fresh interpreter, as with a new gunicorn worker, over a
+data directory holding N translators and clients. Reports the median
+import time, the time of the first /api/stats request (which needs the
+data loaded) and the whole process wall time, and whether the import
+pulled in python-telegram-bot. --root measures another checkout, e.g.
+a git worktree of an older commit.
+"""
+
+import argparse
+import json
+import os
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+CITIES = ["Berlin", "Hamburg", "Munich", "Cologne", "Frankfurt", "Stuttgart", "Dresden", "Leipzig"]
+LEVELS = ["A1", "A2", "B1", "B2", "C1", "C2", "NATIVE"]
+
+# Runs in the child interpreter, with the data directory as working directory
+CHILD = """
+import json, sys, time
+start = time.perf_counter()
+sys.path.insert(0, {root!r})
+import main
+imported = time.perf_counter()
+response = main.app.test_client().get('/api/stats')
+served = time.perf_counter()
+assert response.status_code == 200, response.status_code
+print(json.dumps({{
+    "import": imported - start,
+    "first_request": served - imported,
+    "telegram": "telegram" in sys.modules,
+}}))
+"""
+
+
+def write_data(data_dir, population, seed):
+    """Snapshot files of the JSON store with `population` translators and as many clients."""
+    rng = random.Random(seed)
+    os.makedirs(data_dir)
+    translators = {
+        str(user_id): {
+            "name": f"Translator {user_id}",
+            "city": rng.choice(CITIES),
+            "language_level": rng.choice(LEVELS),
+            "price": str(rng.randint(10, 60)),
+            "contact": f"@translator{user_id}"
+        }
+        for user_id in range(population)
+    }
+    clients = {
+        str(population + user_id): {"city": rng.choice(CITIES), "registration_complete": True}
+        for user_id in range(population)
+    }
+    users = {**{key: "translator" for key in translators}, **{key: "client" for key in clients}}
+    for kind, data in (("translators", translators), ("clients", clients), ("users", users)):
+        with open(os.path.join(data_dir, f"{kind}.json"), "w", encoding="utf-8") as f:
+            json.dump(data, f)
+
+
+def run_once(root, work_dir):
+    start = time.perf_counter()
+    output = subprocess.run(
+        [sys.executable, "-c", CHILD.format(root=root)],
+        cwd=work_dir, env={**os.environ, "LOG_LEVEL": "WARNING"},
+        check=True, capture_output=True, text=True
+    ).stdout
+    result = json.loads(output.strip().splitlines()[-1])
+    result["process"] = time.perf_counter() - start
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--populations", default="0,10000,100000",
+                        help="Comma-separated translator (and client) counts")
+    parser.add_argument("--runs", type=int, default=5, help="Fresh processes per population")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--root", default=ROOT_DIR, help="Checkout to start (default: this one)")
+    args = parser.parse_args()
+    root = os.path.abspath(args.root)
+
+    print(f"{'users':>8} {'import':>10} {'1st request':>12} {'process':>10}  telegram imported")
+    for population in (int(p) for p in args.populations.split(",")):
+        with tempfile.TemporaryDirectory() as work_dir:
+            write_data(os.path.join(work_dir, "data"), population, args.seed)
+            runs = [run_once(root, work_dir) for _ in range(args.runs)]
+        median = {key: statistics.median(run[key] for run in runs) for key in ("import", "first_request", "process")}
+        print(f"{population:>8} {median['import'] * 1e3:7.0f} ms {median['first_request'] * 1e3:9.0f} ms "
+              f"{median['process'] * 1e3:7.0f} ms  {runs[0]['telegram']}")
+
+
+if __name__ == "__main__":
+    main()
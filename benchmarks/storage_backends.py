@@ -0,0 +1,87 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Compare the JSON journal store and the SQLite store at a given population.
+
+Reports bulk load, single save, point lookup, city lookup and full listing
+timings for each backend.
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+from storage import JsonStore, SQLiteStore  # noqa: E402
+
+CITIES = ["Berlin", "Hamburg", "Munich", "Cologne", "Frankfurt", "Stuttgart", "Dresden", "Leipzig"]
+LEVELS = ["A1", "A2", "B1", "B2", "C1", "C2", "NATIVE"]
+
+
+def make_translator(rng, user_id):
+    """Build a translator record shaped like the ones the bot collects."""
+    return {
+        "name": f"Translator {user_id}",
+        "city": rng.choice(CITIES),
+        "language_level": rng.choice(LEVELS),
+        "price": str(rng.randint(10, 60)),
+        "contact": f"@translator{user_id}"
+    }
+
+
+def timed(func, repeat=1):
+    """Return the average wall time of `func` in seconds."""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - start) / repeat
+
+
+def bench_store(name, store, records, lookups):
+    """Run all measurements against one store."""
+    store.load()
+    if hasattr(store, "put_many"):
+        load = timed(lambda: store.put_many("translators", records))
+    else:
+        load = timed(lambda: [store.put("translators", key, value) for key, value in records])
+    store.checkpoint()
+
+    user_ids = [key for key, _ in records]
+    new_id = len(records) + 1
+    results = {
+        "bulk load": load,
+        "single save": timed(lambda: store.put("translators", new_id, records[0][1]), repeat=200),
+        "point lookup": timed(lambda: [store.get("translators", uid) for uid in lookups]) / len(lookups),
+        "city lookup": timed(lambda: list(store.by_city("translators", "Dresden")), repeat=5),
+        "full listing": timed(lambda: list(store.items("translators"))),
+    }
+    store.close()
+
+    print(f"\n{name} ({len(user_ids)} translators)")
+    for label, seconds in results.items():
+        print(f"  {label:<14} {seconds * 1e3:12.3f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--records", type=int, default=100000, help="Number of translators to store")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    records = [(user_id, make_translator(rng, user_id)) for user_id in range(args.records)]
+    lookups = [rng.randrange(args.records) for _ in range(1000)]
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        bench_store("json", JsonStore(os.path.join(tmp_dir, "json")), records, lookups)
+        bench_store("sqlite", SQLiteStore(os.path.join(tmp_dir, "bot.db")), records, lookups)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Benchmark the cost of a single registration write as the user base grows.
+
+The journaled store should keep the per-save cost flat, while the old
+full JSON rewrite grows linearly with the number of stored users.
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+from records import to_stored  # noqa: E402
+
+
+def make_translator(user_id):
+    """Build a translator record shaped like the ones the bot collects."""
+    return {
+        "name": f"Translator {user_id}",
+        "city": "Berlin",
+        "language_level": "C1",
+        "price": "25",
+        "contact": f"@translator{user_id}"
+    }
+
+
+def full_rewrite(store):
+    """The pre-journal save path: rewrite every file on every save."""
+    for kind, data in store._data.items():
+        with open(store._snapshot_file(kind), 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, indent=4, default=to_stored)
+
+
+def bench_population(data_manager, population, writes, include_rewrite):
+    """Measure the average save latency with `population` users already stored."""
+    translators = data_manager._store._data["translators"]
+    translators.clear()
+    translators.update(
+        (user_id, make_translator(user_id)) for user_id in range(population)
+    )
+
+    start = time.perf_counter()
+    for i in range(writes):
+        user_id = population + i
+        data_manager.save_translator_data(user_id, make_translator(user_id))
+    journaled = (time.perf_counter() - start) / writes
+
+    rewrite = None
+    if include_rewrite:
+        start = time.perf_counter()
+        full_rewrite(data_manager._store)
+        rewrite = time.perf_counter() - start
+
+    return journaled, rewrite
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--populations", default="1000,10000,100000,1000000",
+                        help="Comma-separated user counts to benchmark")
+    parser.add_argument("--writes", type=int, default=2000,
+                        help="Number of saves measured per population")
+    parser.add_argument("--rewrite-limit", type=int, default=100000,
+                        help="Largest population to also time a full JSON rewrite for")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        os.chdir(tmp_dir)
+        import data_manager
+        data_manager.init_data()
+
+        print(f"{'users':>10} {'journaled save':>16} {'full rewrite':>14}")
+        for population in (int(p) for p in args.populations.split(",")):
+            journaled, rewrite = bench_population(
+                data_manager, population, args.writes, population <= args.rewrite_limit
+            )
+            rewrite_text = f"{rewrite * 1e3:11.2f} ms" if rewrite is not None else f"{'-':>14}"
+            print(f"{population:>10} {journaled * 1e6:13.2f} µs {rewrite_text}")
+
+        data_manager.save_data()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Load test for the webhook endpoint.
+
+POSTs synthetic Telegram Update JSON to a running admin app at increasing
+rates and reports the p50/p99 latency until each update is accepted into
+the bot's update queue.
+
+Example:
+    # In another shell; main.py serves the app and the webhook on PORT in webhook mode
+    BOT_MODE=webhook WEBHOOK_URL=https://example.com WEBHOOK_SECRET=s3cret python main.py
+    python -m benchmarks.webhook_load --url http://localhost:5000/telegram/webhook --secret s3cret
+"""
+
+import argparse
+import json
+import random
+import statistics
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+GROUP_CHAT_ID = -1001234567890
+
+MESSAGES = [
+    "Ищу переводчика в Берлине на завтра",
+    "Нужна замена на четверг, Кёльн",
+    "Переводчик найден, спасибо!",
+    "Suche Dolmetscher in Hamburg",
+    "Быстрый заработок без вложений",
+]
+
+
+def make_update(update_id, rng):
+    """Build a group text message update."""
+    user_id = rng.randint(1, 100000)
+    return {
+        "update_id": update_id,
+        "message": {
+            "message_id": update_id,
+            "date": int(time.time()),
+            "chat": {"id": GROUP_CHAT_ID, "type": "supergroup", "title": "Benchmark"},
+            "from": {"id": user_id, "is_bot": False, "first_name": f"User{user_id}"},
+            "text": rng.choice(MESSAGES),
+        },
+    }
+
+
+def post(url, secret, body):
+    """POST one update and return (latency in seconds, HTTP status)."""
+    request = urllib.request.Request(url, data=body, method="POST")
+    request.add_header("Content-Type", "application/json")
+    if secret:
+        request.add_header("X-Telegram-Bot-Api-Secret-Token", secret)
+    start = time.perf_counter()
+    try:
+        with urllib.request.urlopen(request, timeout=30) as response:
+            status = response.status
+    except urllib.error.HTTPError as e:
+        status = e.code
+    return time.perf_counter() - start, status
+
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+def run_rate(url, secret, rate, duration, workers, rng, first_update_id):
+    """Send updates at `rate` per second for `duration` seconds."""
+    total = int(rate * duration)
+    latencies = []
+    errors = 0
+    lock = threading.Lock()
+
+    def send(body):
+        nonlocal errors
+        latency, status = post(url, secret, body)
+        with lock:
+            if status == 200:
+                latencies.append(latency)
+            else:
+                errors += 1
+
+    bodies = [json.dumps(make_update(first_update_id + i, rng)).encode() for i in range(total)]
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for i, body in enumerate(bodies):
+            delay = start + i / rate - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            executor.submit(send, body)
+    elapsed = time.perf_counter() - start
+    return latencies, errors, total / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the webhook endpoint.")
+    parser.add_argument("--url", default="http://localhost:5000/telegram/webhook")
+    parser.add_argument("--secret", required=True, help="Value of WEBHOOK_SECRET on the server")
+    parser.add_argument("--rates", default="10,50,100,200,500", help="Comma-separated updates per second")
+    parser.add_argument("--duration", type=float, default=5.0, help="Seconds per rate step")
+    parser.add_argument("--workers", type=int, default=64, help="Concurrent HTTP connections")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    update_id = 1
+    print(f"{'target/s':>9} {'achieved/s':>11} {'p50 ms':>8} {'p99 ms':>8} {'mean ms':>8} {'errors':>7}")
+    for rate in (float(r) for r in args.rates.split(",")):
+        latencies, errors, achieved = run_rate(
+            args.url, args.secret, rate, args.duration, args.workers, rng, update_id
+        )
+        update_id += int(rate * args.duration)
+        if latencies:
+            print(f"{rate:9.0f} {achieved:11.1f} {percentile(latencies, 0.5) * 1e3:8.2f} "
+                  f"{percentile(latencies, 0.99) * 1e3:8.2f} {statistics.mean(latencies) * 1e3:8.2f} {errors:7d}")
+        else:
+            print(f"{rate:9.0f} {achieved:11.1f} {'-':>8} {'-':>8} {'-':>8} {errors:7d}")
+
+
+if __name__ == "__main__":
+    main()
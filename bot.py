@@ -5,7 +5,10 @@
 Bot initialization and core functionality.
 """
 
+import asyncio
 import logging
+import time
+from telegram import Update
 from telegram.ext import (
     Application,
     CommandHandler,
@@ -14,6 +17,7 @@ from telegram.ext import (
     ConversationHandler,
     filters
 )
+from telegram.request import HTTPXRequest
 
 from handlers import (
     start_command,
@@ -22,13 +26,20 @@ from handlers import (
     button_callback,
     handle_text_message,
     cancel_command,
-    admin_data_command
+    admin_data_command,
+    match_command,
+    found_command
 )
 
 from conversation_flows import (
     SELECTING_USER_TYPE,
-    TRANSLATOR_FORM,
-    CLIENT_FORM,
+    TRANSLATOR_NAME,
+    TRANSLATOR_CITY,
+    TRANSLATOR_LEVEL,
+    TRANSLATOR_PRICE,
+    TRANSLATOR_CONTACT,
+    CLIENT_CITY,
+    CLIENT_VERIFICATION,
     translator_name,
     translator_city,
     translator_language_level,
@@ -39,70 +50,100 @@ from conversation_flows import (
     end_conversation
 )
 
+from rate_limiter import rate_limit_check
+from broadcast import broadcast_queue
+from update_processor import ChatOrderedUpdateProcessor
+from metrics import TELEGRAM_API_SECONDS, UPDATE_QUEUE_DEPTH, timed_handler as timed
+
 logger = logging.getLogger(__name__)
 
+# Running application and its event loop, used to hand webhook updates to the bot thread
+_running_application = None
+_running_loop = None
+# Periodic stale request cleanup of the running bot
+_cleanup_task = None
+
+class TimedHTTPXRequest(HTTPXRequest):
+    """HTTPXRequest that observes the latency of every Bot API call, by method and HTTP status."""
+
+    async def do_request(self, url, method, *args, **kwargs):
+        start = time.perf_counter()
+        status = "error"
+        try:
+            status, payload = await super().do_request(url, method, *args, **kwargs)
+            return status, payload
+        finally:
+            # The API method is the last path segment; the token is not part of it
+            TELEGRAM_API_SECONDS.observe(time.perf_counter() - start, url.rsplit("/", 1)[-1], str(status))
+
 def create_bot(token):
     """Create and configure the bot with all necessary handlers."""
+    from config import CONCURRENT_UPDATES, PERSISTENCE_UPDATE_INTERVAL
+    from conversation_persistence import StorePersistence
+    
     # Create the Application
-    application = Application.builder().token(token).build()
+    application = (
+        Application.builder()
+        .token(token)
+        .concurrent_updates(ChatOrderedUpdateProcessor(max(1, CONCURRENT_UPDATES)))
+        .persistence(StorePersistence(update_interval=PERSISTENCE_UPDATE_INTERVAL))
+        # Same pool sizes as the builder's defaults
+        .request(TimedHTTPXRequest(connection_pool_size=256))
+        .get_updates_request(TimedHTTPXRequest(connection_pool_size=1))
+        .build()
+    )
     
-    # Add conversation handler for user registration 
-    # Import all states from conversation_flows
-    from conversation_flows import (
-        SELECTING_USER_TYPE,
-        TRANSLATOR_FORM,
-        CLIENT_FORM,
-        TRANSLATOR_NAME,
-        TRANSLATOR_CITY,
-        TRANSLATOR_LEVEL,
-        TRANSLATOR_PRICE, 
-        TRANSLATOR_CONTACT,
-        CLIENT_CITY,
-        CLIENT_VERIFICATION
+    # Every handler callback is wrapped with timed() for the per-handler latency metrics
+    # Throttle group flooders before any other processing (group -1 runs first)
+    application.add_handler(
+        MessageHandler(filters.ChatType.GROUPS, timed(rate_limit_check)),
+        group=-1
     )
     
+    # Add conversation handler for user registration 
     conv_handler = ConversationHandler(
-        entry_points=[CommandHandler('start', start_command)],
+        entry_points=[CommandHandler('start', timed(start_command))],
         states={
-            SELECTING_USER_TYPE: [CallbackQueryHandler(button_callback)],
-            TRANSLATOR_FORM: [
-                MessageHandler(filters.TEXT & ~filters.COMMAND, translator_name),
-            ],
+            SELECTING_USER_TYPE: [CallbackQueryHandler(timed(button_callback))],
+            # Each state waits for the answer its handler processes
             TRANSLATOR_NAME: [
-                MessageHandler(filters.TEXT & ~filters.COMMAND, translator_city),
+                MessageHandler(filters.TEXT & ~filters.COMMAND, timed(translator_name)),
             ],
             TRANSLATOR_CITY: [
-                MessageHandler(filters.TEXT & ~filters.COMMAND, translator_language_level),
+                MessageHandler(filters.TEXT & ~filters.COMMAND, timed(translator_city)),
             ],
             TRANSLATOR_LEVEL: [
-                MessageHandler(filters.TEXT & ~filters.COMMAND, translator_price),
+                MessageHandler(filters.TEXT & ~filters.COMMAND, timed(translator_language_level)),
             ],
             TRANSLATOR_PRICE: [
-                MessageHandler(filters.TEXT & ~filters.COMMAND, translator_contact),
+                MessageHandler(filters.TEXT & ~filters.COMMAND, timed(translator_price)),
             ],
-            CLIENT_FORM: [
-                MessageHandler(filters.TEXT & ~filters.COMMAND, client_city),
+            TRANSLATOR_CONTACT: [
+                MessageHandler(filters.TEXT & ~filters.COMMAND, timed(translator_contact)),
             ],
             CLIENT_CITY: [
-                MessageHandler(filters.TEXT & ~filters.COMMAND, client_verification),
+                MessageHandler(filters.TEXT & ~filters.COMMAND, timed(client_city)),
+            ],
+            CLIENT_VERIFICATION: [
+                MessageHandler(filters.TEXT & ~filters.COMMAND, timed(client_verification)),
             ],
         },
-        fallbacks=[CommandHandler('cancel', cancel_command)],
+        fallbacks=[CommandHandler('cancel', timed(cancel_command))],
         allow_reentry=True, # Allow users to restart registration
         name="registration_conversation", # Name the conversation for easier tracking
-        persistent=False # Don't require persistence, which simplifies the setup
+        persistent=True # Keep half-finished registrations across restarts
     )
     
     application.add_handler(conv_handler)
     
     # Command handlers
-    application.add_handler(CommandHandler('help', help_command))
-    application.add_handler(CommandHandler('found', lambda update, context: 
-                                          handle_text_message(update, context, "translator found")))
-    application.add_handler(CommandHandler('admin', admin_data_command))
+    application.add_handler(CommandHandler('help', timed(help_command)))
+    application.add_handler(CommandHandler('found', timed(found_command)))
+    application.add_handler(CommandHandler('admin', timed(admin_data_command)))
+    application.add_handler(CommandHandler('match', timed(match_command)))
     
     # General message handler for text messages
-    application.add_handler(MessageHandler(filters.TEXT & ~filters.COMMAND, handle_text_message))
+    application.add_handler(MessageHandler(filters.TEXT & ~filters.COMMAND, timed(handle_text_message)))
     
     # Error handler
     application.add_error_handler(error_handler)
@@ -119,16 +160,16 @@ async def get_group_info(application, group_username):
     
     try:
         bot = application.bot
-        logger.info(f"Attempting to get information for group @{GROUP_USERNAME}")
+        logger.info("Attempting to get information for group @%s", GROUP_USERNAME)
         
         # Try to get chat info by username
         chat = await bot.get_chat(f"@{GROUP_USERNAME}")
         chat_id = chat.id
         
-        logger.info(f"Successfully retrieved info for group @{GROUP_USERNAME}")
-        logger.info(f"Chat ID: {chat_id}")
-        logger.info(f"Chat Type: {chat.type}")
-        logger.info(f"Chat Title: {chat.title}")
+        logger.info("Successfully retrieved info for group @%s", GROUP_USERNAME)
+        logger.info("Chat ID: %s", chat_id)
+        logger.info("Chat Type: %s", chat.type)
+        logger.info("Chat Title: %s", chat.title)
         
         # In a real environment, we could store this in an environment variable
         # or configuration file for future use
@@ -138,42 +179,150 @@ async def get_group_info(application, group_username):
         
         return chat_id
     except Exception as e:
-        logger.error(f"Error getting group info: {str(e)}")
+        logger.error("Error getting group info: %s", e)
         logger.info("Bot will continue to run without group integration until added to the group.")
         return None
 
-def run_bot(application):
-    """Run the bot until the user presses Ctrl-C"""
-    import asyncio
-    from config import GROUP_USERNAME
+async def start_webhook(application):
+    """Register the webhook with Telegram; updates then arrive through the admin app."""
+    from config import WEBHOOK_URL, WEBHOOK_PATH, WEBHOOK_SECRET, DROP_PENDING_UPDATES
     
-    logger.info("Starting the Translation Service Bot")
+    if not WEBHOOK_URL:
+        raise ValueError("WEBHOOK_URL must be set when BOT_MODE is webhook")
+    if not WEBHOOK_SECRET:
+        raise ValueError("WEBHOOK_SECRET must be set when BOT_MODE is webhook")
     
-    # Создаем новый event loop для потока
-    loop = asyncio.new_event_loop()
-    asyncio.set_event_loop(loop)
+    await application.bot.set_webhook(
+        url=WEBHOOK_URL.rstrip("/") + WEBHOOK_PATH,
+        secret_token=WEBHOOK_SECRET,
+        allowed_updates=Update.ALL_TYPES,
+        drop_pending_updates=DROP_PENDING_UPDATES
+    )
+    logger.info("Webhook registered at %s%s", WEBHOOK_URL.rstrip('/'), WEBHOOK_PATH)
+
+def submit_webhook_update(payload, timeout=5.0):
+    """Queue an update received on the webhook into the running bot.
     
-    # Запускаем бота с правильной конфигурацией для потоков
-    try:
-        # Используем только поддерживаемые параметры для данной версии библиотеки
-        # И запускаем в созданном event loop
-        loop.run_until_complete(application.initialize())
-        loop.run_until_complete(application.updater.start_polling(drop_pending_updates=True))
-        loop.run_until_complete(application.start())
-        loop.run_forever()
-    except Exception as e:
-        logger.error(f"Error running bot: {e}")
-        import traceback
-        logger.error(traceback.format_exc())
-    finally:
-        # Закрываем loop при выходе
-        try:
-            # Останавливаем application и updater
-            if hasattr(application, 'updater') and application.updater.running:
-                loop.run_until_complete(application.updater.stop())
-            if application.running:
-                loop.run_until_complete(application.stop())
-            # Закрываем loop
-            loop.close()
-        except Exception as e:
-            logger.error(f"Error closing bot: {e}")
+    Called from the web server's threads. Returns False if the bot is not
+    running, so the caller can ask Telegram to retry later.
+    """
+    application = _running_application
+    loop = _running_loop
+    if application is None or loop is None or not application.running:
+        return False
+    
+    update = Update.de_json(payload, application.bot)
+    future = asyncio.run_coroutine_threadsafe(application.update_queue.put(update), loop)
+    future.result(timeout)
+    return True
+
+def get_update_stats():
+    """Update processing metrics of the running bot, or None if it is not running."""
+    application = _running_application
+    if application is None:
+        return None
+    
+    stats = application.update_processor.get_stats()
+    stats["update_queue_depth"] = application.update_queue.qsize()
+    return stats
+
+def _update_queue_depth():
+    application = _running_application
+    return {(): application.update_queue.qsize()} if application is not None else {}
+
+UPDATE_QUEUE_DEPTH.set_function(_update_queue_depth)
+
+async def close_stale_requests_periodically(bot):
+    """Close client requests left open for STALE_REQUEST_HOURS, optionally deleting their posts."""
+    from collections import defaultdict
+    from telegram.error import TelegramError
+    from config import (
+        STALE_REQUEST_HOURS,
+        DELETE_STALE_REQUESTS,
+        REQUEST_CLEANUP_INTERVAL,
+        REQUEST_CLEANUP_BATCH
+    )
+    from data_manager import close_stale_requests
+    
+    loop = asyncio.get_running_loop()
+    while True:
+        await asyncio.sleep(REQUEST_CLEANUP_INTERVAL)
+        closed = 0
+        # Small batches keep each pass short; they are sent as one deleteMessages call per chat.
+        # Closing saves each request, so it runs in a worker thread, not on the event loop
+        while True:
+            batch = await loop.run_in_executor(
+                None, close_stale_requests, STALE_REQUEST_HOURS * 3600, REQUEST_CLEANUP_BATCH
+            )
+            if not batch:
+                break
+            closed += len(batch)
+            if not DELETE_STALE_REQUESTS:
+                continue
+            
+            message_ids = defaultdict(list)
+            for request in batch:
+                message_ids[request['chat_id']].append(request['message_id'])
+            for chat_id, ids in message_ids.items():
+                try:
+                    await bot.delete_messages(chat_id=chat_id, message_ids=ids)
+                except TelegramError as e:
+                    # Messages older than 48 hours can't be deleted by bots
+                    logger.warning("Could not delete %s stale requests in %s: %s", len(ids), chat_id, e)
+        if closed:
+            logger.info("Closed %s stale client requests", closed)
+
+async def start_application(application):
+    """Initialize and start the bot on the running event loop, in polling or webhook mode."""
+    global _running_application, _running_loop, _cleanup_task
+    from config import BOT_MODE, DROP_PENDING_UPDATES
+    from data_manager import init_data
+    
+    logger.info("Starting the Translation Service Bot (%s mode)", BOT_MODE)
+    loop = asyncio.get_running_loop()
+    
+    # Загружаем данные до приёма первого обновления, не блокируя event loop
+    await loop.run_in_executor(None, init_data)
+    await application.initialize()
+    if BOT_MODE == "webhook":
+        await start_webhook(application)
+    else:
+        # A webhook left over from webhook mode would make getUpdates fail
+        await application.bot.delete_webhook()
+        await application.updater.start_polling(drop_pending_updates=DROP_PENDING_UPDATES)
+    await application.start()
+    await broadcast_queue.start(application.bot)
+    _cleanup_task = loop.create_task(close_stale_requests_periodically(application.bot))
+    _running_application = application
+    _running_loop = loop
+
+async def stop_application(application):
+    """Stop the bot gracefully.
+    
+    Stops taking updates, finishes the ones already received, stops the
+    background tasks and flushes the conversation persistence. Safe to call
+    on a partly started application.
+    """
+    global _running_application, _running_loop, _cleanup_task
+    
+    # Webhook updates arriving from now on get a 503 and are retried by Telegram
+    _running_application = None
+    _running_loop = None
+    
+    # Останавливаем очистку запросов
+    cleanup_task, _cleanup_task = _cleanup_task, None
+    if cleanup_task is not None:
+        cleanup_task.cancel()
+        await asyncio.gather(cleanup_task, return_exceptions=True)
+    
+    # Больше не получаем обновления; application.stop() обрабатывает уже полученные
+    if application.updater is not None and application.updater.running:
+        await application.updater.stop()
+    if application.running:
+        await application.stop()
+    
+    # Unsent broadcasts stay persisted for the next start
+    await broadcast_queue.stop()
+    # Writes the conversation states and waits for the queued saves
+    await application.shutdown()
+    logger.info("Bot stopped")
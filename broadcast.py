@@ -0,0 +1,361 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Queued fan-out of bot messages within Telegram's send limits.
+"""
+
+import asyncio
+import hashlib
+import heapq
+import itertools
+import logging
+import random
+import threading
+import time
+from collections import deque
+from datetime import timedelta
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from telegram.error import BadRequest, Forbidden, RetryAfter, TelegramError
+
+from config import (
+    BROADCAST_GLOBAL_PER_SECOND,
+    BROADCAST_CHAT_PER_SECOND,
+    BROADCAST_GROUP_PER_MINUTE,
+    BROADCAST_CONCURRENCY,
+    BROADCAST_MAX_ATTEMPTS,
+    BROADCAST_DEDUPE_HOURS,
+    BROADCAST_STOP_TIMEOUT
+)
+from rate_limiter import RateLimiter
+
+logger = logging.getLogger(__name__)
+
+
+def _seconds(value: Any) -> float:
+    """RetryAfter.retry_after is an int or a timedelta depending on the library settings."""
+    return value.total_seconds() if isinstance(value, timedelta) else float(value)
+
+
+class BroadcastQueue:
+    """
+    Messages waiting to be sent, drained by one task on the bot's event loop.
+
+    Sends respect a global rate and a per-chat rate (a lower one for groups).
+    A RetryAfter from Telegram pauses the whole queue for the requested time,
+    since flood control applies to the bot, not to one chat. Network errors
+    are retried with exponential backoff.
+
+    Every job is persisted through the data store under a dedupe key. A job
+    is marked as sent or failed once it finishes, and the marker is kept for
+    BROADCAST_DEDUPE_HOURS. After a restart, pending jobs resume, finished
+    ones are not resent, and enqueuing the same key again is a no-op.
+    """
+
+    def __init__(self, global_per_second: float = BROADCAST_GLOBAL_PER_SECOND,
+                 chat_per_second: float = BROADCAST_CHAT_PER_SECOND,
+                 group_per_minute: float = BROADCAST_GROUP_PER_MINUTE,
+                 concurrency: int = BROADCAST_CONCURRENCY,
+                 max_attempts: int = BROADCAST_MAX_ATTEMPTS,
+                 persist: bool = True):
+        self._global = RateLimiter(global_per_second, period=1.0)
+        self._chats = RateLimiter(chat_per_second, period=1.0)
+        self._groups = RateLimiter(group_per_minute, period=60.0)
+        self.concurrency = concurrency
+        self.max_attempts = max_attempts
+        self.persist = persist
+
+        self._jobs: Dict[str, Dict[str, Any]] = {}  # Dedupe key -> job record
+        self._finished = deque()  # (finish time, key) in finishing order, for expiry
+        self._pending = 0
+        self._ready: List[Tuple[float, int, str]] = []  # Heap of (not before, sequence, key)
+        self._sequence = itertools.count()
+        self._lock = threading.Lock()
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._sending: Set[asyncio.Task] = set()  # send_message calls in flight
+        self._paused_until = 0.0
+        self._restored = False
+
+        # Counters
+        self.sent = 0
+        self.failed = 0
+        self.retried = 0
+        self.flood_waits = 0
+        self.duplicates = 0
+
+    # Persistence
+    def _save(self, key: str, job: Dict[str, Any]) -> None:
+        if self.persist:
+            from data_manager import save_broadcast_job
+            save_broadcast_job(key, job)
+
+    def _delete(self, key: str) -> None:
+        if self.persist:
+            from data_manager import delete_broadcast_job
+            delete_broadcast_job(key)
+
+    def _restore(self) -> None:
+        """Once per process: requeue pending jobs from the store and drop expired finished ones."""
+        if not self.persist or self._restored:
+            return
+        from data_manager import get_broadcast_jobs
+
+        pending = 0
+        finished = []
+        with self._lock:
+            if self._restored:
+                return
+            self._restored = True
+            for key, job in get_broadcast_jobs().items():
+                if key in self._jobs:
+                    continue
+                self._jobs[key] = job
+                if job.get("status") == "pending":
+                    heapq.heappush(self._ready, (0.0, next(self._sequence), key))
+                    pending += 1
+                else:
+                    finished.append((job.get("finished", 0), key))
+            self._finished.extend(sorted(finished))
+            self._pending += pending
+        self._expire()
+        if pending:
+            logger.info("Resuming %s pending broadcast messages", pending)
+
+    def _expire(self) -> None:
+        """Forget finished jobs older than the dedupe window."""
+        expired_before = time.time() - BROADCAST_DEDUPE_HOURS * 3600
+        expired = []
+        with self._lock:
+            while self._finished and self._finished[0][0] < expired_before:
+                _, key = self._finished.popleft()
+                job = self._jobs.get(key)
+                if job is not None and job.get("status") != "pending":
+                    del self._jobs[key]
+                    expired.append(key)
+        for key in expired:
+            self._delete(key)
+
+    # Producer side
+    def enqueue(self, chat_id: int, text: str, key: Optional[str] = None, **options: Any) -> bool:
+        """
+        Queue a message; `options` are passed to send_message. Returns False
+        if a job with the same key (by default: same chat and text) is
+        already queued or was finished recently. Safe to call from any thread.
+        """
+        if key is None:
+            key = hashlib.sha1(f"{chat_id}\0{text}".encode("utf-8")).hexdigest()
+        # Jobs finished before a restart must block duplicates too
+        self._restore()
+        with self._lock:
+            if key in self._jobs:
+                self.duplicates += 1
+                return False
+            job = {
+                "chat_id": chat_id,
+                "text": text,
+                "options": options,
+                "status": "pending",
+                "attempts": 0,
+                "created": time.time()
+            }
+            self._jobs[key] = job
+            self._pending += 1
+            heapq.heappush(self._ready, (0.0, next(self._sequence), key))
+        self._save(key, job)
+        self._wake()
+        return True
+
+    def _wake(self) -> None:
+        loop, wakeup = self._loop, self._wakeup
+        if loop is None or wakeup is None:
+            return
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is loop:
+            wakeup.set()
+        elif not loop.is_closed():
+            loop.call_soon_threadsafe(wakeup.set)
+
+    # Consumer side
+    async def start(self, bot) -> None:
+        """Start draining the queue with `bot` on the current event loop."""
+        self._loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        self._restore()
+        self._task = self._loop.create_task(self._run(bot), name="broadcast_queue")
+
+    async def stop(self, timeout: float = BROADCAST_STOP_TIMEOUT) -> None:
+        """
+        Stop draining. Messages in flight get `timeout` seconds to finish,
+        while the bot's HTTP client is still open; the ones that don't are
+        cancelled and stay pending with the unsent jobs for the next start.
+        """
+        task, self._task = self._task, None
+        if task is not None:
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        sending, self._sending = self._sending, set()
+        if sending:
+            _, unfinished = await asyncio.wait(sending, timeout=timeout)
+            for send in unfinished:
+                send.cancel()
+            if unfinished:
+                await asyncio.gather(*unfinished, return_exceptions=True)
+                logger.warning("Stopped %s broadcast messages in flight; they will be resent", len(unfinished))
+        self._loop = self._wakeup = None
+
+    def _limiter_for(self, chat_id: int) -> RateLimiter:
+        # Group and channel ids are negative
+        return self._groups if chat_id < 0 else self._chats
+
+    async def _sleep(self, seconds: float) -> None:
+        """Sleep, waking early when a new job arrives."""
+        self._wakeup.clear()
+        try:
+            await asyncio.wait_for(self._wakeup.wait(), timeout=seconds)
+        except asyncio.TimeoutError:
+            pass
+
+    async def _run(self, bot) -> None:
+        loop = asyncio.get_running_loop()
+        slots = asyncio.Semaphore(self.concurrency)
+
+        while True:
+            # Take a slot before choosing the job: a RetryAfter arriving
+            # while all slots are busy must hold back the next send too
+            await slots.acquire()
+            try:
+                picked = await self._next_job(loop)
+            except BaseException:
+                slots.release()
+                raise
+            if picked is None:
+                slots.release()
+                continue
+
+            key, job = picked
+            task = loop.create_task(self._send(bot, key, job))
+            sending = self._sending
+            sending.add(task)
+            task.add_done_callback(sending.discard)
+            task.add_done_callback(lambda _: slots.release())
+
+    async def _next_job(self, loop: asyncio.AbstractEventLoop) -> Optional[Tuple[str, Dict[str, Any]]]:
+        """The job to send now, counted against the rate limits; None after waiting or skipping one."""
+        with self._lock:
+            head = self._ready[0] if self._ready else None
+        if head is None:
+            await self._sleep(3600)
+            return None
+
+        now = loop.time()
+        wait = max(head[0], self._paused_until) - now
+        if wait <= 0:
+            wait = self._global.wait_time("global")
+        if wait > 0:
+            await self._sleep(wait)
+            return None
+
+        # No awaits from here on, so a cancelled task can't lose a popped job
+        with self._lock:
+            _, _, key = heapq.heappop(self._ready)
+            job = self._jobs.get(key)
+        if job is None or job["status"] != "pending":
+            return None
+
+        chat_limiter = self._limiter_for(job["chat_id"])
+        chat_wait = chat_limiter.wait_time(job["chat_id"])
+        if chat_wait > 0:
+            # This chat is busy; other chats can go first
+            with self._lock:
+                heapq.heappush(self._ready, (now + chat_wait, next(self._sequence), key))
+            return None
+
+        chat_limiter.allow(job["chat_id"])
+        self._global.allow("global")
+        return key, job
+
+    async def _send(self, bot, key: str, job: Dict[str, Any]) -> None:
+        loop = asyncio.get_running_loop()
+        job["attempts"] += 1
+        try:
+            await bot.send_message(chat_id=job["chat_id"], text=job["text"], **job["options"])
+        except asyncio.CancelledError:
+            # Stopped mid-send: the message may have reached Telegram, but
+            # sending it again after the next start beats losing it
+            job["attempts"] -= 1
+            self._requeue(key)
+            raise
+        except RetryAfter as e:
+            delay = _seconds(e.retry_after)
+            self.flood_waits += 1
+            self._paused_until = max(self._paused_until, loop.time() + delay)
+            logger.warning("Flood control: pausing broadcasts for %.0fs", delay)
+            self._retry(key, job, loop.time() + delay, count_attempt=False)
+        except (Forbidden, BadRequest) as e:
+            # The user blocked the bot, deleted the chat or the message is invalid: retrying won't help
+            logger.info("Dropping broadcast to %s: %s", job['chat_id'], e)
+            self._finish(key, job, "failed")
+        except TelegramError as e:
+            if job["attempts"] >= self.max_attempts:
+                logger.error("Giving up broadcast to %s after %s attempts: %s", job['chat_id'], job['attempts'], e)
+                self._finish(key, job, "failed")
+            else:
+                backoff = min(300.0, 2 ** job["attempts"]) * random.uniform(0.8, 1.2)
+                self._retry(key, job, loop.time() + backoff)
+        else:
+            self._finish(key, job, "sent")
+
+    def _requeue(self, key: str) -> None:
+        """Put a job taken off the queue back at the front; it is still persisted as pending."""
+        with self._lock:
+            heapq.heappush(self._ready, (0.0, next(self._sequence), key))
+
+    def _retry(self, key: str, job: Dict[str, Any], not_before: float, count_attempt: bool = True) -> None:
+        if not count_attempt:
+            job["attempts"] -= 1
+        self.retried += 1
+        with self._lock:
+            heapq.heappush(self._ready, (not_before, next(self._sequence), key))
+        self._save(key, job)
+        self._wake()
+
+    def _finish(self, key: str, job: Dict[str, Any], status: str) -> None:
+        job["status"] = status
+        job["finished"] = time.time()
+        # The finished record only serves deduplication; drop the payload
+        job.pop("text", None)
+        job.pop("options", None)
+        if status == "sent":
+            self.sent += 1
+        else:
+            self.failed += 1
+        self._save(key, job)
+        with self._lock:
+            self._pending -= 1
+            self._finished.append((job["finished"], key))
+        self._expire()
+
+    def get_stats(self) -> Dict[str, int]:
+        """Counters for monitoring."""
+        return {
+            "pending": self._pending,
+            "sent": self.sent,
+            "failed": self.failed,
+            "retried": self.retried,
+            "flood_waits": self.flood_waits,
+            "duplicates": self.duplicates,
+        }
+
+
+# Shared queue drained by the running bot
+broadcast_queue = BroadcastQueue()
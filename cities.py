@@ -1,8 +1,19 @@
 """
-List of German cities for the bot.
+German cities known to the bot and canonicalization of free-text city names.
+
+Every known city has an integer id: its position in GERMAN_CITIES. The ids
+are stored in translator and client records, so new cities must be appended
+at the end of the list.
 """
 
-# List of major German cities
+import math
+import re
+from collections import Counter
+from difflib import SequenceMatcher
+from functools import lru_cache
+from typing import Dict, Hashable, List, Optional, Tuple
+
+# List of major German cities (canonical names)
 GERMAN_CITIES = [
     "Berlin",
     "Hamburg",
@@ -84,3 +95,352 @@ GERMAN_CITIES = [
     "Hildesheim",
     "Salzgitter",
 ]
+
+# Approximate coordinates (latitude, longitude) of the cities above
+CITY_COORDINATES = {
+    "Berlin": (52.520, 13.405),
+    "Hamburg": (53.551, 9.994),
+    "Munich": (48.137, 11.575),
+    "Cologne": (50.938, 6.960),
+    "Frankfurt": (50.110, 8.682),
+    "Stuttgart": (48.776, 9.183),
+    "Düsseldorf": (51.228, 6.774),
+    "Leipzig": (51.340, 12.375),
+    "Dortmund": (51.514, 7.468),
+    "Essen": (51.456, 7.012),
+    "Bremen": (53.079, 8.802),
+    "Dresden": (51.050, 13.738),
+    "Hanover": (52.376, 9.732),
+    "Nuremberg": (49.452, 11.077),
+    "Duisburg": (51.435, 6.763),
+    "Bochum": (51.482, 7.216),
+    "Wuppertal": (51.256, 7.151),
+    "Bielefeld": (52.030, 8.532),
+    "Bonn": (50.737, 7.098),
+    "Münster": (51.961, 7.626),
+    "Karlsruhe": (49.007, 8.404),
+    "Mannheim": (49.487, 8.466),
+    "Augsburg": (48.371, 10.898),
+    "Wiesbaden": (50.078, 8.240),
+    "Gelsenkirchen": (51.518, 7.086),
+    "Mönchengladbach": (51.181, 6.442),
+    "Braunschweig": (52.269, 10.521),
+    "Chemnitz": (50.828, 12.921),
+    "Kiel": (54.323, 10.123),
+    "Aachen": (50.776, 6.084),
+    "Halle": (51.483, 11.970),
+    "Magdeburg": (52.120, 11.628),
+    "Freiburg": (47.999, 7.842),
+    "Krefeld": (51.339, 6.586),
+    "Lübeck": (53.866, 10.687),
+    "Oberhausen": (51.470, 6.852),
+    "Erfurt": (50.978, 11.029),
+    "Mainz": (49.993, 8.247),
+    "Rostock": (54.092, 12.099),
+    "Kassel": (51.313, 9.480),
+    "Hagen": (51.367, 7.463),
+    "Hamm": (51.681, 7.816),
+    "Saarbrücken": (49.240, 6.997),
+    "Mülheim": (51.427, 6.883),
+    "Potsdam": (52.391, 13.065),
+    "Ludwigshafen": (49.477, 8.445),
+    "Oldenburg": (53.144, 8.214),
+    "Leverkusen": (51.046, 6.984),
+    "Osnabrück": (52.279, 8.047),
+    "Solingen": (51.171, 7.083),
+    "Heidelberg": (49.399, 8.672),
+    "Herne": (51.538, 7.226),
+    "Neuss": (51.200, 6.691),
+    "Darmstadt": (49.873, 8.651),
+    "Paderborn": (51.718, 8.754),
+    "Regensburg": (49.013, 12.102),
+    "Ingolstadt": (48.766, 11.426),
+    "Würzburg": (49.791, 9.953),
+    "Fürth": (49.477, 10.989),
+    "Wolfsburg": (52.423, 10.787),
+    "Offenbach": (50.100, 8.766),
+    "Ulm": (48.401, 9.988),
+    "Heilbronn": (49.142, 9.219),
+    "Pforzheim": (48.892, 8.695),
+    "Göttingen": (51.541, 9.916),
+    "Bottrop": (51.524, 6.929),
+    "Trier": (49.750, 6.637),
+    "Recklinghausen": (51.614, 7.198),
+    "Reutlingen": (48.492, 9.205),
+    "Bremerhaven": (53.540, 8.581),
+    "Koblenz": (50.357, 7.589),
+    "Bergisch Gladbach": (50.992, 7.136),
+    "Jena": (50.927, 11.589),
+    "Remscheid": (51.179, 7.190),
+    "Erlangen": (49.590, 11.004),
+    "Moers": (51.451, 6.627),
+    "Siegen": (50.875, 8.024),
+    "Hildesheim": (52.154, 9.951),
+    "Salzgitter": (52.154, 10.333),
+}
+
+# Other spellings of the cities above: German, English and Russian
+CITY_ALIASES = {
+    "Berlin": ("Берлин",),
+    "Hamburg": ("Гамбург",),
+    "Munich": ("München", "Мюнхен"),
+    "Cologne": ("Köln", "Кёльн"),
+    "Frankfurt": ("Frankfurt am Main", "Франкфурт", "Франкфурт-на-Майне"),
+    "Stuttgart": ("Штутгарт",),
+    "Düsseldorf": ("Дюссельдорф",),
+    "Leipzig": ("Лейпциг",),
+    "Dortmund": ("Дортмунд",),
+    "Essen": ("Эссен",),
+    "Bremen": ("Бремен",),
+    "Dresden": ("Дрезден",),
+    "Hanover": ("Hannover", "Ганновер"),
+    "Nuremberg": ("Nürnberg", "Нюрнберг"),
+    "Duisburg": ("Дуйсбург",),
+    "Bochum": ("Бохум",),
+    "Wuppertal": ("Вупперталь",),
+    "Bielefeld": ("Билефельд",),
+    "Bonn": ("Бонн",),
+    "Münster": ("Мюнстер",),
+    "Karlsruhe": ("Карлсруэ",),
+    "Mannheim": ("Маннгейм", "Мангейм"),
+    "Augsburg": ("Аугсбург",),
+    "Wiesbaden": ("Висбаден",),
+    "Gelsenkirchen": ("Гельзенкирхен",),
+    "Mönchengladbach": ("Мёнхенгладбах",),
+    "Braunschweig": ("Brunswick", "Брауншвейг"),
+    "Chemnitz": ("Хемниц",),
+    "Kiel": ("Киль",),
+    "Aachen": ("Аахен", "Ахен"),
+    "Halle": ("Halle (Saale)", "Halle an der Saale", "Галле"),
+    "Magdeburg": ("Магдебург",),
+    "Freiburg": ("Freiburg im Breisgau", "Фрайбург"),
+    "Krefeld": ("Крефельд",),
+    "Lübeck": ("Любек",),
+    "Oberhausen": ("Оберхаузен",),
+    "Erfurt": ("Эрфурт",),
+    "Mainz": ("Майнц",),
+    "Rostock": ("Росток",),
+    "Kassel": ("Кассель",),
+    "Hagen": ("Хаген",),
+    "Hamm": ("Хамм",),
+    "Saarbrücken": ("Саарбрюккен",),
+    "Mülheim": ("Mülheim an der Ruhr", "Мюльхайм"),
+    "Potsdam": ("Потсдам",),
+    "Ludwigshafen": ("Ludwigshafen am Rhein", "Людвигсхафен"),
+    "Oldenburg": ("Ольденбург",),
+    "Leverkusen": ("Леверкузен",),
+    "Osnabrück": ("Оснабрюк",),
+    "Solingen": ("Золинген",),
+    "Heidelberg": ("Гейдельберг", "Хайдельберг"),
+    "Herne": ("Херне",),
+    "Neuss": ("Нойс",),
+    "Darmstadt": ("Дармштадт",),
+    "Paderborn": ("Падерборн",),
+    "Regensburg": ("Регенсбург",),
+    "Ingolstadt": ("Ингольштадт",),
+    "Würzburg": ("Вюрцбург",),
+    "Fürth": ("Фюрт",),
+    "Wolfsburg": ("Вольфсбург",),
+    "Offenbach": ("Offenbach am Main", "Оффенбах"),
+    "Ulm": ("Ульм",),
+    "Heilbronn": ("Хайльбронн",),
+    "Pforzheim": ("Пфорцхайм",),
+    "Göttingen": ("Гёттинген",),
+    "Bottrop": ("Ботроп",),
+    "Trier": ("Трир",),
+    "Recklinghausen": ("Реклингхаузен",),
+    "Reutlingen": ("Ройтлинген",),
+    "Bremerhaven": ("Бремерхафен",),
+    "Koblenz": ("Кобленц",),
+    "Bergisch Gladbach": ("Бергиш-Гладбах",),
+    "Jena": ("Йена",),
+    "Remscheid": ("Ремшайд",),
+    "Erlangen": ("Эрланген",),
+    "Moers": ("Мёрс",),
+    "Siegen": ("Зиген",),
+    "Hildesheim": ("Хильдесхайм",),
+    "Salzgitter": ("Зальцгиттер",),
+}
+
+# Cities within this distance of each other count as nearby when matching
+NEARBY_RADIUS_KM = 50
+
+# Minimum trigram similarity (0..1) for a misspelled name to resolve to a city
+FUZZY_CITY_THRESHOLD = 0.55
+# How much closer the best city must be than the next one; closer calls stay unrecognized
+FUZZY_CITY_MARGIN = 0.1
+# Minimum similarity of each word of a misspelled name to a word of the city's name
+FUZZY_WORD_THRESHOLD = 0.7
+
+# Cell size of the spatial grid, in degrees of latitude and longitude
+GRID_DEGREES = 0.5
+
+
+def normalize_city(city: str) -> str:
+    """Normalize a free-text city name for comparisons and index keys."""
+    return " ".join(city.split()).lower()
+
+
+# Canonicalization
+_UMLAUTS = str.maketrans({"ä": "a", "ö": "o", "ü": "u"})
+_UMLAUT_DIGRAPHS = str.maketrans({"ä": "ae", "ö": "oe", "ü": "ue"})
+_PUNCTUATION = re.compile(r"[\s\-().,']+")
+
+
+def _alias_key(name: str) -> str:
+    """Fold case, ё/е, ß and punctuation so spelling variants compare equal."""
+    key = name.casefold().replace("ё", "е").replace("ß", "ss")
+    return _PUNCTUATION.sub(" ", key).strip()
+
+
+def _build_aliases() -> Dict[str, int]:
+    aliases = {}
+    for city_id, city in enumerate(GERMAN_CITIES):
+        for name in (city, *CITY_ALIASES.get(city, ())):
+            key = _alias_key(name)
+            # Users type umlauts as plain vowels or as ae/oe/ue
+            for variant in (key, key.translate(_UMLAUTS), key.translate(_UMLAUT_DIGRAPHS)):
+                aliases.setdefault(variant, city_id)
+    return aliases
+
+
+def _trigrams(key: str) -> set:
+    padded = f"  {key} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+# Alias key -> city id
+_ALIASES = _build_aliases()
+
+# Trigram -> alias keys containing it, for fuzzy lookups
+_ALIAS_TRIGRAMS = {key: _trigrams(key) for key in _ALIASES}
+_TRIGRAM_INDEX: Dict[str, List[str]] = {}
+for _key, _grams in _ALIAS_TRIGRAMS.items():
+    for _gram in _grams:
+        _TRIGRAM_INDEX.setdefault(_gram, []).append(_key)
+
+
+def _words_match(key: str, alias: str) -> bool:
+    """
+    Whether every word of `key` is a spelling of some word of `alias`, so
+    "frankfurt oder" can't resolve to "frankfurt am main" on "frankfurt" alone.
+    """
+    alias_words = alias.split()
+    return all(
+        word in alias_words or any(
+            SequenceMatcher(None, word, other).ratio() >= FUZZY_WORD_THRESHOLD for other in alias_words
+        )
+        for word in key.split()
+    )
+
+
+def _fuzzy_city_id(key: str) -> Optional[int]:
+    """
+    The city of the closest alias by trigram (Jaccard) similarity, if it is
+    close enough, clearly closer than any other city and has every word of
+    `key`. None otherwise: a wrong city is worse than an unrecognized one.
+    """
+    grams = _trigrams(key)
+    shared = Counter(alias for gram in grams for alias in _TRIGRAM_INDEX.get(gram, ()))
+    best: Dict[int, float] = {}
+    for alias, count in shared.items():
+        score = count / (len(grams) + len(_ALIAS_TRIGRAMS[alias]) - count)
+        if score >= FUZZY_CITY_THRESHOLD - FUZZY_CITY_MARGIN and _words_match(key, alias):
+            found = _ALIASES[alias]
+            best[found] = max(score, best.get(found, 0.0))
+    ranked = sorted(best.items(), key=lambda item: -item[1])
+    if not ranked or ranked[0][1] < FUZZY_CITY_THRESHOLD:
+        return None
+    if len(ranked) > 1 and ranked[0][1] - ranked[1][1] < FUZZY_CITY_MARGIN:
+        return None
+    return ranked[0][0]
+
+
+@lru_cache(maxsize=4096)
+def city_id(city: str) -> Optional[int]:
+    """
+    Canonical id of a free-text city name: exact spellings first, then the
+    closest name by trigram similarity. None if no known city is close.
+    """
+    key = _alias_key(city)
+    found = _ALIASES.get(key)
+    if found is None and len(key) >= 4:
+        found = _fuzzy_city_id(key)
+    return found
+
+
+def city_key(city: str) -> Hashable:
+    """Index key of a city: its canonical id if known, otherwise the normalized text."""
+    found = city_id(city)
+    return found if found is not None else normalize_city(city)
+
+
+def record_city_key(data: dict) -> Hashable:
+    """Index key of the city of a translator or client record."""
+    found = data.get('city_id')
+    return found if found is not None else city_key(data.get('city', ''))
+
+
+def city_name(key: Hashable) -> str:
+    """Display name for a city key."""
+    return GERMAN_CITIES[key] if isinstance(key, int) else key
+
+
+def record_city_name(data: dict) -> str:
+    """Canonical name of a record's city, or the name as entered for unknown cities."""
+    key = record_city_key(data)
+    return GERMAN_CITIES[key] if isinstance(key, int) else data.get('city', 'Unknown')
+
+
+# Proximity
+def distance_km(a: Tuple[float, float], b: Tuple[float, float]) -> float:
+    """Great-circle distance between two (latitude, longitude) points."""
+    lat1, lon1 = map(math.radians, a)
+    lat2, lon2 = map(math.radians, b)
+    h = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+    return 2 * 6371.0 * math.asin(math.sqrt(h))
+
+
+def _cell(point: Tuple[float, float]) -> Tuple[int, int]:
+    return int(math.floor(point[0] / GRID_DEGREES)), int(math.floor(point[1] / GRID_DEGREES))
+
+
+# Id -> coordinates, and grid cell -> ids of the cities in it
+_COORDINATES = {GERMAN_CITIES.index(city): point for city, point in CITY_COORDINATES.items()}
+_GRID: Dict[Tuple[int, int], List[int]] = {}
+for _id, _point in _COORDINATES.items():
+    _GRID.setdefault(_cell(_point), []).append(_id)
+
+
+def cities_within(point: Tuple[float, float], radius_km: float) -> List[Tuple[int, float]]:
+    """Ids of the known cities within `radius_km` of a point with their distances, nearest first."""
+    lat_cells = math.ceil(radius_km / 111.0 / GRID_DEGREES)
+    lon_cells = math.ceil(radius_km / (111.0 * max(0.1, math.cos(math.radians(point[0])))) / GRID_DEGREES)
+    center_lat, center_lon = _cell(point)
+
+    found = []
+    for lat in range(center_lat - lat_cells, center_lat + lat_cells + 1):
+        for lon in range(center_lon - lon_cells, center_lon + lon_cells + 1):
+            for other in _GRID.get((lat, lon), ()):
+                distance = distance_km(point, _COORDINATES[other])
+                if distance <= radius_km:
+                    found.append((other, distance))
+    found.sort(key=lambda item: item[1])
+    return found
+
+
+@lru_cache(maxsize=None)
+def _nearby(key: Hashable, radius_km: float) -> Tuple[Tuple[int, float], ...]:
+    point = _COORDINATES.get(key) if isinstance(key, int) else None
+    if point is None:
+        return ()
+    return tuple(item for item in cities_within(point, radius_km) if item[0] != key)
+
+
+def nearby_cities(key: Hashable, radius_km: float = NEARBY_RADIUS_KM) -> Tuple[Tuple[int, float], ...]:
+    """
+    Ids of the known cities within `radius_km` of the city with index key
+    `key` (see city_key) with their distances, nearest first. Empty for
+    unknown cities.
+    """
+    return _nearby(key, radius_km)
@@ -7,14 +7,63 @@ Configuration settings for the Telegram bot.
 
 import os
 
+import cities as _cities
+
 # Bot configuration
 BOT_TOKEN = os.environ.get("TELEGRAM_BOT_TOKEN")
 
 # Application configuration
 DEBUG = os.environ.get("DEBUG", "False").lower() == "true"
+LOG_LEVEL = os.environ.get("LOG_LEVEL", "DEBUG" if DEBUG else "INFO").upper()
+
+# Update ingestion configuration
+BOT_MODE = os.environ.get("BOT_MODE", "polling").lower()  # polling or webhook
+WEBHOOK_URL = os.environ.get("WEBHOOK_URL")  # Public base URL of the admin app, e.g. https://example.com
+WEBHOOK_PATH = "/telegram/webhook"
+WEBHOOK_SECRET = os.environ.get("WEBHOOK_SECRET")  # Checked against X-Telegram-Bot-Api-Secret-Token
+PORT = int(os.environ.get("PORT", "5000"))  # Port of the admin app when main.py serves it itself (webhook mode)
+DROP_PENDING_UPDATES = os.environ.get("DROP_PENDING_UPDATES", "False").lower() == "true"
+BOT_START_TIMEOUT = float(os.environ.get("BOT_START_TIMEOUT", "30"))  # Seconds to wait for the bot to come up
+BOT_STOP_TIMEOUT = float(os.environ.get("BOT_STOP_TIMEOUT", "30"))  # Seconds to wait for in-flight updates and saves when stopping
+PERSISTENCE_UPDATE_INTERVAL = float(os.environ.get("PERSISTENCE_UPDATE_INTERVAL", "5"))  # Seconds between conversation state flushes
+CONCURRENT_UPDATES = int(os.environ.get("CONCURRENT_UPDATES", "16"))  # Updates processed in parallel across chats
+
+# Storage configuration
+STORAGE_BACKEND = os.environ.get("STORAGE_BACKEND", "json")  # json, sqlite or postgres
+DATABASE_URL = os.environ.get("DATABASE_URL")  # SQLite file path or PostgreSQL DSN
+MULTI_PROCESS = os.environ.get("MULTI_PROCESS", "False").lower() == "true"  # Several processes (e.g. gunicorn workers) share the store
+REVALIDATE_INTERVAL = float(os.environ.get("REVALIDATE_INTERVAL", "1"))  # Seconds between checks for other processes' changes
+
+# Admin web interface configuration
+ADMIN_PAGE_SIZE = int(os.environ.get("ADMIN_PAGE_SIZE", "50"))  # Rows per page in the translator/client lists
+ADMIN_MAX_PAGE_SIZE = 500
+
+# Matching configuration
+MATCH_RESULTS = 5  # Translators suggested by /match
+MAX_MATCH_RESULTS = 50  # Upper limit for the k parameter of /api/match
+
+# Broadcast configuration (Telegram allows about 30 messages per second overall,
+# one per second to the same chat and 20 per minute to the same group)
+BROADCAST_GLOBAL_PER_SECOND = 25
+BROADCAST_CHAT_PER_SECOND = 1
+BROADCAST_GROUP_PER_MINUTE = 20
+BROADCAST_CONCURRENCY = 8  # Messages in flight at once
+BROADCAST_MAX_ATTEMPTS = 5  # Attempts per message on network errors
+BROADCAST_DEDUPE_HOURS = 24  # How long a sent message blocks an identical one
+BROADCAST_STOP_TIMEOUT = 10  # Seconds a stopping bot waits for messages in flight
+NOTIFY_TRANSLATORS = os.environ.get("NOTIFY_TRANSLATORS", "true").lower() == "true"  # DM translators about new requests in their city
+
+# Client request tracking
+STALE_REQUEST_HOURS = float(os.environ.get("STALE_REQUEST_HOURS", "24"))  # Open requests older than this are closed
+# Also delete the group posts of stale requests (bots can only delete messages younger than 48 hours)
+DELETE_STALE_REQUESTS = os.environ.get("DELETE_STALE_REQUESTS", "false").lower() == "true"
+REQUEST_CLEANUP_INTERVAL = 600  # Seconds between stale request checks
+REQUEST_CLEANUP_BATCH = 100  # Requests closed per batch (also the Bot API limit for deleteMessages)
 
 # Language configuration
-USE_RUSSIAN = True  # Set to True to use Russian language, False for English
+# Replies follow each user's Telegram language (ru, uk, de, en); other languages get this default
+USE_RUSSIAN = os.environ.get("USE_RUSSIAN", "true").lower() == "true"  # False for English
+MESSAGE_CACHE_SIZE = 1024  # Rendered replies kept by the message catalog
 
 # Group configuration
 GROUP_USERNAME = "dolmecher"  # Username of your Telegram group without @
@@ -27,29 +76,20 @@ MAX_MESSAGES_PER_MINUTE = 5  # Maximum messages a user can send per minute
 # Default to your user ID (from testing) if environment variable not set
 ADMIN_USER_IDS = [int(id_str) for id_str in os.environ.get("ADMIN_USER_IDS", "892197915").split(",") if id_str]
 
+# German language levels, from lowest to highest
+LANGUAGE_LEVELS = ['A1', 'A2', 'B1', 'B2', 'C1', 'C2', 'NATIVE']
+
 # Message trigger phrases
-TRANSLATOR_FOUND_PHRASES = ["переводчик найден", "translator found", "нашел переводчика", "нашла переводчика"]
-NEED_REPLACEMENT_PHRASES = ["нужна замена", "need replacement", "ищу замену", "требуется замена"]
+TRANSLATOR_FOUND_PHRASES = ["переводчик найден", "translator found", "нашел переводчика", "нашла переводчика",
+                            "перекладача знайдено", "знайшов перекладача", "знайшла перекладача",
+                            "dolmetscher gefunden", "übersetzer gefunden"]
+NEED_REPLACEMENT_PHRASES = ["нужна замена", "need replacement", "ищу замену", "требуется замена",
+                            "потрібна заміна", "шукаю заміну", "brauche vertretung", "suche vertretung"]
 
-# Cities in Germany (for validation and suggestions) - including Russian names
+# Cities in Germany (for validation and suggestions) - including Russian names.
+# Derived from cities.py, which owns the canonical list and all spellings.
 GERMAN_CITIES = [
-    # German/English names
-    "Berlin", "Hamburg", "Munich", "Cologne", "Frankfurt", "Stuttgart", "Düsseldorf",
-    "Dortmund", "Essen", "Leipzig", "Bremen", "Dresden", "Hanover", "Nuremberg",
-    "Duisburg", "Bochum", "Wuppertal", "Bielefeld", "Bonn", "Münster", "Karlsruhe",
-    "Mannheim", "Augsburg", "Wiesbaden", "Gelsenkirchen", "Mönchengladbach",
-    "Braunschweig", "Chemnitz", "Kiel", "Aachen", "Halle", "Magdeburg", "Freiburg",
-    "Krefeld", "Lübeck", "Oberhausen", "Erfurt", "Mainz", "Rostock", "Kassel",
-    "Hagen", "Hamm", "Saarbrücken", "Mülheim", "Potsdam", "Ludwigshafen", "Oldenburg",
-    "Leverkusen", "Osnabrück", "Solingen", "Heidelberg", "Herne", "Neuss", "Darmstadt",
-    
-    # Russian names
-    "Берлин", "Гамбург", "Мюнхен", "Кёльн", "Франкфурт", "Штутгарт", "Дюссельдорф",
-    "Дортмунд", "Эссен", "Лейпциг", "Бремен", "Дрезден", "Ганновер", "Нюрнберг",
-    "Дуйсбург", "Бохум", "Вупперталь", "Билефельд", "Бонн", "Мюнстер", "Карлсруэ",
-    "Маннгейм", "Аугсбург", "Висбаден", "Гельзенкирхен", "Мёнхенгладбах",
-    "Брауншвейг", "Хемниц", "Киль", "Аахен", "Галле", "Магдебург", "Фрайбург",
-    "Крефельд", "Любек", "Оберхаузен", "Эрфурт", "Майнц", "Росток", "Кассель",
-    "Хаген", "Хамм", "Саарбрюккен", "Мюльхайм", "Потсдам", "Людвигсхафен", "Ольденбург",
-    "Леверкузен", "Оснабрюк", "Золинген", "Гейдельберг", "Херне", "Нойс", "Дармштадт"
+    name
+    for city in _cities.GERMAN_CITIES
+    for name in (city, *_cities.CITY_ALIASES.get(city, ()))
 ]
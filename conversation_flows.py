@@ -5,6 +5,7 @@
 Conversation handlers for user registration flows.
 """
 
+import asyncio
 import logging
 from telegram import Update
 from telegram.ext import ContextTypes, ConversationHandler
@@ -13,7 +14,21 @@ from typing import Union
 from data_manager import (
     save_translator_data,
     save_client_data,
-    get_user_type
+    get_user_type,
+    wait_for_saves
+)
+from messages import catalog
+from message_ids import (
+    TRANSLATOR_CITY_PROMPT,
+    TRANSLATOR_LEVEL_PROMPT,
+    TRANSLATOR_LEVEL_INVALID,
+    TRANSLATOR_PRICE_PROMPT,
+    TRANSLATOR_PRICE_INVALID,
+    TRANSLATOR_CONTACT_PROMPT,
+    TRANSLATOR_REGISTRATION_COMPLETE,
+    CLIENT_VERIFICATION_PROMPT,
+    CLIENT_SUSPICIOUS,
+    CLIENT_REGISTRATION_COMPLETE
 )
 from utils import send_instructions, validate_price, validate_language_level
 
@@ -35,69 +50,68 @@ CLIENT_VERIFICATION = 'client_verification'
 
 async def translator_name(update: Update, context: ContextTypes.DEFAULT_TYPE) -> Union[int, str]:
     """Handle the translator's name input."""
+    texts = catalog.for_user(update.effective_user)
     user_id = update.effective_user.id
     name = update.message.text
     
     # Store the provided name
     context.user_data['name'] = name
     
-    from russian_messages import TRANSLATOR_CITY_PROMPT
     await update.message.reply_text(
-        TRANSLATOR_CITY_PROMPT.format(name)
+        texts.render(TRANSLATOR_CITY_PROMPT, name)
     )
     
     return TRANSLATOR_CITY
 
 async def translator_city(update: Update, context: ContextTypes.DEFAULT_TYPE) -> Union[int, str]:
     """Handle the translator's city input."""
+    texts = catalog.for_user(update.effective_user)
     city = update.message.text
     
     # Store the provided city
     context.user_data['city'] = city
     
-    from russian_messages import TRANSLATOR_LEVEL_PROMPT
-    await update.message.reply_text(TRANSLATOR_LEVEL_PROMPT)
+    await update.message.reply_text(texts[TRANSLATOR_LEVEL_PROMPT])
     
     return TRANSLATOR_LEVEL
 
 async def translator_language_level(update: Update, context: ContextTypes.DEFAULT_TYPE) -> Union[int, str]:
     """Handle the translator's language level input."""
+    texts = catalog.for_user(update.effective_user)
     level = update.message.text.upper()
     
     # Validate language level format
     if not validate_language_level(level):
-        from russian_messages import TRANSLATOR_LEVEL_INVALID
-        await update.message.reply_text(TRANSLATOR_LEVEL_INVALID)
-        return TRANSLATOR_CITY  # Return to the city input stage to try again
+        await update.message.reply_text(texts[TRANSLATOR_LEVEL_INVALID])
+        return TRANSLATOR_LEVEL  # Ask for the language level again
     
     # Store the provided language level
     context.user_data['language_level'] = level
     
-    from russian_messages import TRANSLATOR_PRICE_PROMPT
-    await update.message.reply_text(TRANSLATOR_PRICE_PROMPT)
+    await update.message.reply_text(texts[TRANSLATOR_PRICE_PROMPT])
     
     return TRANSLATOR_PRICE
 
 async def translator_price(update: Update, context: ContextTypes.DEFAULT_TYPE) -> Union[int, str]:
     """Handle the translator's price input."""
+    texts = catalog.for_user(update.effective_user)
     price_text = update.message.text
     
     # Validate price format
     if not validate_price(price_text):
-        from russian_messages import TRANSLATOR_PRICE_INVALID
-        await update.message.reply_text(TRANSLATOR_PRICE_INVALID)
-        return TRANSLATOR_LEVEL  # Return to language level input to try again
+        await update.message.reply_text(texts[TRANSLATOR_PRICE_INVALID])
+        return TRANSLATOR_PRICE  # Ask for the price again
     
     # Store the provided price
     context.user_data['price'] = price_text
     
-    from russian_messages import TRANSLATOR_CONTACT_PROMPT
-    await update.message.reply_text(TRANSLATOR_CONTACT_PROMPT)
+    await update.message.reply_text(texts[TRANSLATOR_CONTACT_PROMPT])
     
     return TRANSLATOR_CONTACT
 
 async def translator_contact(update: Update, context: ContextTypes.DEFAULT_TYPE) -> Union[int, str]:
     """Handle the translator's contact info and complete the registration."""
+    texts = catalog.for_user(update.effective_user)
     contact = update.message.text
     
     # Store the provided contact info
@@ -110,15 +124,19 @@ async def translator_contact(update: Update, context: ContextTypes.DEFAULT_TYPE)
         'city': context.user_data.get('city', ''),
         'language_level': context.user_data.get('language_level', ''),
         'price': context.user_data.get('price', ''),
-        'contact': contact
+        'contact': contact,
+        # Language for the messages the bot sends without an update, e.g. request notifications
+        'locale': catalog.locale_for(update.effective_user.language_code)
     }
     
-    save_translator_data(user_id, translator_data)
+    # The save commits to the database on the SQL backends; keep it off the event loop
+    await asyncio.get_running_loop().run_in_executor(None, save_translator_data, user_id, translator_data)
+    await wait_for_saves()
     
     # Send completion message
-    from russian_messages import TRANSLATOR_REGISTRATION_COMPLETE
+    # Sent once per profile, so not worth a render cache entry
     await update.message.reply_text(
-        TRANSLATOR_REGISTRATION_COMPLETE.format(
+        texts[TRANSLATOR_REGISTRATION_COMPLETE].format(
             translator_data['name'],
             translator_data['city'],
             translator_data['language_level'],
@@ -138,19 +156,20 @@ async def translator_contact(update: Update, context: ContextTypes.DEFAULT_TYPE)
 
 async def client_city(update: Update, context: ContextTypes.DEFAULT_TYPE) -> Union[int, str]:
     """Handle the client's city input and collect verification information."""
+    texts = catalog.for_user(update.effective_user)
     city = update.message.text
     
     # Store the provided city
     context.user_data['city'] = city
     
     # Ask for verification details to ensure they're not a translator
-    from russian_messages import CLIENT_VERIFICATION_PROMPT
-    await update.message.reply_text(CLIENT_VERIFICATION_PROMPT)
+    await update.message.reply_text(texts[CLIENT_VERIFICATION_PROMPT])
     
     return CLIENT_VERIFICATION
 
 async def client_verification(update: Update, context: ContextTypes.DEFAULT_TYPE) -> Union[int, str]:
     """Verify client status and complete registration."""
+    texts = catalog.for_user(update.effective_user)
     verification = update.message.text
     user_id = update.effective_user.id
     city = context.user_data.get('city', '')
@@ -171,8 +190,7 @@ async def client_verification(update: Update, context: ContextTypes.DEFAULT_TYPE
             break
     
     if is_suspicious:
-        from russian_messages import CLIENT_SUSPICIOUS
-        await update.message.reply_text(CLIENT_SUSPICIOUS)
+        await update.message.reply_text(texts[CLIENT_SUSPICIOUS])
         context.user_data.clear()
         return ConversationHandler.END
     
@@ -180,14 +198,15 @@ async def client_verification(update: Update, context: ContextTypes.DEFAULT_TYPE
     client_data = {
         'city': city,
         'service_needed': verification,
-        'registration_complete': True
+        'registration_complete': True,
+        'locale': catalog.locale_for(update.effective_user.language_code)
     }
-    save_client_data(user_id, client_data)
+    await asyncio.get_running_loop().run_in_executor(None, save_client_data, user_id, client_data)
+    await wait_for_saves()
     
     # Send completion message
-    from russian_messages import CLIENT_REGISTRATION_COMPLETE
     await update.message.reply_text(
-        CLIENT_REGISTRATION_COMPLETE.format(city)
+        texts.render(CLIENT_REGISTRATION_COMPLETE, city)
     )
     
     # Send instructions
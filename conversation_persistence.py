@@ -0,0 +1,119 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+PTB persistence backed by the bot's own data store, so half-finished
+registrations survive restarts.
+"""
+
+import asyncio
+import logging
+from typing import Any, Dict, Optional, Tuple
+
+from telegram.ext import BasePersistence, PersistenceInput
+
+from data_manager import (
+    get_conversation_states,
+    get_all_user_data,
+    save_persisted_changes,
+    wait_for_saves
+)
+
+logger = logging.getLogger(__name__)
+
+
+class StorePersistence(BasePersistence):
+    """
+    Keeps conversation states and user_data in the data store, one record
+    per conversation key and per user.
+
+    PTB collects the changed entries and hands them over every
+    `update_interval` seconds, so each flush writes only what changed
+    since the last one. The entries handed over together are saved as one
+    batch in a worker thread, a single transaction on the SQL backends.
+    Chat data, bot data and callback data are not used by the bot and are
+    not stored.
+    """
+
+    def __init__(self, update_interval: float = 60):
+        super().__init__(
+            store_data=PersistenceInput(bot_data=False, chat_data=False, user_data=True, callback_data=False),
+            update_interval=update_interval
+        )
+        self._conversations: Dict[Tuple[str, Tuple[int, ...]], Optional[object]] = {}
+        self._user_data: Dict[int, Dict[Any, Any]] = {}
+        self._saving: Optional[asyncio.Task] = None
+
+    async def _saved(self) -> None:
+        """Wait until the entries queued so far are saved."""
+        if self._saving is None:
+            # PTB starts the update_* calls of one flush together; the task's first
+            # step runs after all of them have queued their entry
+            self._saving = asyncio.ensure_future(self._save())
+        await asyncio.shield(self._saving)
+
+    async def _save(self) -> None:
+        conversations, self._conversations = self._conversations, {}
+        user_data, self._user_data = self._user_data, {}
+        self._saving = None
+        await asyncio.get_running_loop().run_in_executor(None, save_persisted_changes, conversations, user_data)
+
+    # Conversations
+    async def get_conversations(self, name: str) -> Dict[Tuple[int, ...], object]:
+        conversations = get_conversation_states(name)
+        logger.info("Restored %s conversations for %s", len(conversations), name)
+        return conversations
+
+    async def update_conversation(self, name: str, key: Tuple[int, ...], new_state: Optional[object]) -> None:
+        self._conversations[(name, key)] = new_state
+        await self._saved()
+
+    # User data
+    async def get_user_data(self) -> Dict[int, Dict[Any, Any]]:
+        return get_all_user_data()
+
+    async def update_user_data(self, user_id: int, data: Dict[Any, Any]) -> None:
+        # Copied now, the handlers may change it while the batch is saved
+        self._user_data[user_id] = dict(data)
+        await self._saved()
+
+    async def refresh_user_data(self, user_id: int, user_data: Dict[Any, Any]) -> None:
+        """The in-memory user_data is always the latest copy."""
+
+    async def drop_user_data(self, user_id: int) -> None:
+        self._user_data[user_id] = {}
+        await self._saved()
+
+    # Not stored
+    async def get_chat_data(self) -> Dict[int, Any]:
+        return {}
+
+    async def update_chat_data(self, chat_id: int, data: Any) -> None:
+        pass
+
+    async def refresh_chat_data(self, chat_id: int, chat_data: Any) -> None:
+        pass
+
+    async def drop_chat_data(self, chat_id: int) -> None:
+        pass
+
+    async def get_bot_data(self) -> Dict[Any, Any]:
+        return {}
+
+    async def update_bot_data(self, data: Any) -> None:
+        pass
+
+    async def refresh_bot_data(self, bot_data: Any) -> None:
+        pass
+
+    async def get_callback_data(self) -> None:
+        return None
+
+    async def update_callback_data(self, data: Any) -> None:
+        pass
+
+    async def flush(self) -> None:
+        """Called on shutdown; wait until every queued record is on disk."""
+        if self._saving is not None:
+            await asyncio.shield(self._saving)
+        await wait_for_saves()
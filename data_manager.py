@@ -5,175 +5,524 @@
 Data management functions for the Telegram bot.
 """
 
-import logging
+import base64
+import gc
 import json
+import logging
 import os
-import re
-from typing import Dict, List, Any, Optional
+import threading
+import time
+from typing import Dict, Hashable, Iterator, List, Any, Optional, Tuple
+
+from config import STORAGE_BACKEND, DATABASE_URL, MULTI_PROCESS, REVALIDATE_INTERVAL
+from admin_stats import AdminStats
+from cities import city_id
+from matching import MatchEngine
+from records import Client, Translator
+from request_tracker import CLOSED, FULFILLED, OPEN, RequestTracker, request_key
+from message_classifier import is_spam
+from storage import CITY_KEY_VERSION, SORT_FIELDS, TimedStore, create_store, sort_value
 
 logger = logging.getLogger(__name__)
 
-# In-memory storage
-_users = {}  # user_id -> user_type (translator or client)
-_translators = {}  # user_id -> translator data
-_clients = {}  # user_id -> client data
-
-# File paths for persistence
+# Directory for the JSON store and the default SQLite database
 DATA_DIR = "data"
-USERS_FILE = os.path.join(DATA_DIR, "users.json")
-TRANSLATORS_FILE = os.path.join(DATA_DIR, "translators.json")
-CLIENTS_FILE = os.path.join(DATA_DIR, "clients.json")
-
-# Create data directory if it doesn't exist
-os.makedirs(DATA_DIR, exist_ok=True)
-
-# Load data from files if they exist
-def load_data():
-    """Load all data from persistence files."""
-    global _users, _translators, _clients
-    
-    try:
-        if os.path.exists(USERS_FILE):
-            with open(USERS_FILE, 'r', encoding='utf-8') as f:
-                _users = json.load(f)
-        
-        if os.path.exists(TRANSLATORS_FILE):
-            with open(TRANSLATORS_FILE, 'r', encoding='utf-8') as f:
-                _translators = json.load(f)
-        
-        if os.path.exists(CLIENTS_FILE):
-            with open(CLIENTS_FILE, 'r', encoding='utf-8') as f:
-                _clients = json.load(f)
-                
-        # Convert string keys to integers
-        _users = {int(k): v for k, v in _users.items()}
-        _translators = {int(k): v for k, v in _translators.items()}
-        _clients = {int(k): v for k, v in _clients.items()}
-        
-    except (json.JSONDecodeError, IOError) as e:
-        logger.error(f"Error loading data: {e}")
-
-
-# Save data to files
+
+# Storage backend (JSON journal, SQLite or PostgreSQL), with its calls timed for /metrics.
+# Created and loaded by init_data(), at the latest on first use, so importing is cheap
+_store = None
+_init_lock = threading.Lock()
+
+# Aggregate statistics, updated by the save functions
+_stats = AdminStats()
+
+# Per-city translator lists for matching, updated by the save functions
+_matcher = MatchEngine()
+
+# Open client requests by city and user, updated by the request functions
+_requests = RequestTracker()
+
+# Store kinds the aggregates above are built from, and the generation of each they reflect.
+# With MULTI_PROCESS, other processes write the same store; the records changed since
+# the generation this process has seen are applied to the aggregates (see _sync)
+_DERIVED_KINDS = ("translators", "clients", "requests")
+_synced: Dict[str, int] = {}
+_next_revalidation = 0.0
+# Held while the aggregates are updated or rebuilt
+_sync_lock = threading.RLock()
+
+
+def _rebuild(store, kinds) -> None:
+    """Rebuild the aggregates that depend on the given kinds from the store."""
+    if "translators" in kinds or "clients" in kinds:
+        _stats.rebuild(store.items("translators"), store.items("clients"))
+    if "translators" in kinds:
+        _matcher.rebuild(store.items("translators"))
+    if "requests" in kinds:
+        _requests.rebuild(store.items("requests"))
+
+
+def _apply(kind: str, key: Hashable, data: Optional[Dict[str, Any]]) -> None:
+    """Update the aggregates for one record of `kind` saved as `data` (None if deleted)."""
+    if kind == "translators":
+        _stats.translator_saved(key, data)
+        _matcher.translator_saved(key, data)
+    elif kind == "clients":
+        _stats.client_saved(key, data)
+    elif kind == "requests":
+        _requests.request_saved(key, data)
+
+
+def _recheck_city_ids(store) -> None:
+    """
+    Correct the city ids of translators, clients and open requests saved
+    under an older CITY_KEY_VERSION, e.g. while the city matching still
+    resolved names such as "Frankfurt (Oder)" to a wrong city. Done once
+    per version; the version checked is kept in the store.
+    """
+    if store.get("meta", "city_ids_version") == CITY_KEY_VERSION:
+        return
+    fixed = 0
+    for kind in ("translators", "clients", "requests"):
+        for key, data in list(store.items(kind)):
+            if kind == "requests" and data.get('status') != OPEN:
+                continue
+            # Records without an id are indexed by their city text, which is matched anew
+            stored = data.get('city_id')
+            if stored is not None and stored != city_id(data.get('city', '')):
+                data = _with_city_id(data)
+                if kind == "translators":
+                    data = Translator.from_dict(key, data)
+                elif kind == "clients":
+                    data = Client.from_dict(key, data)
+                store.put(kind, key, data)
+                fixed += 1
+    store.put("meta", "city_ids_version", CITY_KEY_VERSION)
+    logger.info("Rechecked city ids for city key version %s, corrected %s records", CITY_KEY_VERSION, fixed)
+
+
+# Load data from the store
+def init_data() -> None:
+    """Create the storage backend and load all data from it; later calls return at once."""
+    global _store
+    if _store is not None:
+        return
+    with _init_lock:
+        if _store is not None:
+            return
+        start = time.perf_counter()
+        if MULTI_PROCESS and STORAGE_BACKEND.lower() == "json":
+            logger.warning("MULTI_PROCESS needs the sqlite or postgres backend; "
+                           "with json each process only sees its own changes")
+        os.makedirs(DATA_DIR, exist_ok=True)
+        store = TimedStore(create_store(STORAGE_BACKEND, DATA_DIR, DATABASE_URL))
+        # Loading allocates objects that all stay alive; collections during it
+        # would scan the growing heap again and again and find nothing
+        gc_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            store.load()
+            _recheck_city_ids(store)
+            _synced.update((kind, store.generation(kind)) for kind in _DERIVED_KINDS)
+            _rebuild(store, _DERIVED_KINDS)
+        finally:
+            if gc_enabled:
+                gc.enable()
+        _store = store
+        logger.info("Loaded data in %.3f s", time.perf_counter() - start)
+
+
+def _data():
+    """The storage backend, loaded on the first call."""
+    if _store is None:
+        init_data()
+    return _store
+
+
+def _sync():
+    """
+    The storage backend, with the aggregates up to date for reading them.
+
+    With MULTI_PROCESS the store generations are compared at most every
+    REVALIDATE_INTERVAL seconds, and only the records changed since are
+    read and applied. Aggregates of a backend without per-record changes
+    (or after the generations went back) are rebuilt.
+    """
+    global _next_revalidation
+    store = _data()
+    if not MULTI_PROCESS or time.monotonic() < _next_revalidation:
+        return store
+    with _sync_lock:
+        if time.monotonic() < _next_revalidation:
+            return store
+        for kind in _DERIVED_KINDS:
+            since = _synced.get(kind, 0)
+            changes = store.changes(kind, since)
+            if changes is None:
+                generation = store.generation(kind)
+                if generation != since:
+                    _rebuild(store, (kind,))
+                    _synced[kind] = generation
+                    logger.debug("Rebuilt aggregates of %s changed by other processes", kind)
+                continue
+            generation, changed, deleted = changes
+            if generation == since:
+                continue
+            for key in deleted:
+                _apply(kind, key, None)
+            for key, data in changed:
+                _apply(kind, key, data)
+            _synced[kind] = generation
+            logger.debug("Applied %s changed and %s deleted %s of other processes", len(changed), len(deleted), kind)
+        _next_revalidation = time.monotonic() + REVALIDATE_INTERVAL
+    return store
+
+
+def _applied(kind: str, generation: Optional[int]) -> None:
+    """
+    Note a write of this process whose change the aggregates already reflect.
+    Called under _sync_lock; a gap in the generations means another process
+    wrote in between, and the next _sync reads the changes since.
+    """
+    if generation is not None and _synced.get(kind) == generation - 1:
+        _synced[kind] = generation
+
+
+def get_admin_stats() -> AdminStats:
+    """Get the aggregate statistics about translators and clients."""
+    _sync()
+    return _stats
+
+
+def get_data_generation() -> int:
+    """A number that changes whenever a translator or client is saved or deleted."""
+    # The statistics are updated right after the store, so count their changes too:
+    # a reader never sees the new number together with the old statistics
+    return _sync().generation("translators", "clients") + _stats.version
+
+
+# Save data to the store
 def save_data():
-    """Save all data to persistence files."""
-    try:
-        with open(USERS_FILE, 'w', encoding='utf-8') as f:
-            json.dump(_users, f, ensure_ascii=False, indent=4)
-        
-        with open(TRANSLATORS_FILE, 'w', encoding='utf-8') as f:
-            json.dump(_translators, f, ensure_ascii=False, indent=4)
-        
-        with open(CLIENTS_FILE, 'w', encoding='utf-8') as f:
-            json.dump(_clients, f, ensure_ascii=False, indent=4)
-    
-    except IOError as e:
-        logger.error(f"Error saving data: {e}")
+    """Checkpoint the storage backend (full JSON snapshot or WAL checkpoint)."""
+    if _store is not None:
+        _store.checkpoint()
+
+
+async def wait_for_saves() -> None:
+    """Wait, without blocking the event loop, until all queued saves are on disk."""
+    if _store is not None:
+        await _store.wait()
+
+
+def flush_saves(timeout: Optional[float] = None) -> None:
+    """Block until all queued saves are on disk and release the store."""
+    if _store is not None:
+        _store.close(timeout)
 
 
 # User type management
 def save_user_type(user_id: int, user_type: str) -> None:
     """Save the user type for a given user ID."""
-    _users[user_id] = user_type
-    save_data()
+    _data().put("users", user_id, user_type)
 
 
 def get_user_type(user_id: int) -> Optional[str]:
     """Get the user type for a given user ID."""
-    return _users.get(user_id)
+    return _data().get("users", user_id)
+
+
+def _with_city_id(data: Dict[str, Any]) -> Dict[str, Any]:
+    """A copy of a translator or client record carrying the canonical id of its city."""
+    data = dict(data)
+    data.pop('city_id', None)
+    found = city_id(data.get('city', ''))
+    if found is not None:
+        data['city_id'] = found
+    return data
 
 
 # Translator data management
 def save_translator_data(user_id: int, data: Dict[str, Any]) -> None:
     """Save translator data for a given user ID."""
-    _translators[user_id] = data
-    save_data()
+    data = Translator.from_dict(user_id, _with_city_id(data))
+    store = _data()
+    with _sync_lock:
+        generation = store.put("translators", user_id, data)
+        _apply("translators", user_id, data)
+        _applied("translators", generation)
 
 
-def get_translator_data(user_id: int) -> Optional[Dict[str, Any]]:
+def get_translator_data(user_id: int) -> Optional[Translator]:
     """Get translator data for a given user ID."""
-    return _translators.get(user_id)
+    return _data().get("translators", user_id)
 
 
-def get_translator_list() -> List[Dict[str, Any]]:
+def iter_translators() -> Iterator[Translator]:
+    """Iterate over all translators; records carry their user_id and are not copied."""
+    return (data for _, data in _data().items("translators"))
+
+
+def get_translator_list() -> List[Translator]:
     """Get a list of all translators with their data."""
-    return [
-        {"user_id": user_id, **data}
-        for user_id, data in _translators.items()
-    ]
+    return list(iter_translators())
 
 
-def get_translators_by_city(city: str) -> List[Dict[str, Any]]:
+def get_translators_by_city(city: str) -> List[Translator]:
     """Get a list of translators in a specific city."""
-    city = city.lower()
-    return [
-        {"user_id": user_id, **data}
-        for user_id, data in _translators.items()
-        if data.get('city', '').lower() == city
-    ]
+    return [data for _, data in _data().by_city("translators", city)]
+
+
+def find_translators(city: Optional[str] = None, min_level: Optional[str] = None,
+                     max_price: Optional[float] = None, limit: Optional[int] = None) -> List[Translator]:
+    """
+    Find translators by city, minimum German level and maximum hourly price.
+    Any filter left as None is ignored. Results are sorted by price, cheapest first.
+    ValueError for an unknown `min_level`.
+    """
+    matches = _data().find_translators(city, min_level, max_price)
+    if limit is not None:
+        matches = matches[:limit]
+    return [data for _, data in matches]
+
+
+def match_translators(city: str, k: int = 5, min_level: Optional[str] = None,
+                      max_price: Optional[float] = None) -> List[Dict[str, Any]]:
+    """
+    The k best translators for a client in `city`, ranked by city (own city,
+    then nearby ones), German level and price. Each result carries the
+    translator's data plus `distance_km`. ValueError for an unknown `min_level`.
+    """
+    store = _sync()
+    results = []
+    for match in _matcher.match(city, k, min_level, max_price):
+        data = store.get("translators", match.user_id)
+        if data is not None:
+            results.append({**data, "distance_km": match.distance_km})
+    return results
 
 
 # Client data management
 def save_client_data(user_id: int, data: Dict[str, Any]) -> None:
     """Save client data for a given user ID."""
-    _clients[user_id] = data
-    save_data()
+    data = Client.from_dict(user_id, _with_city_id(data))
+    store = _data()
+    with _sync_lock:
+        generation = store.put("clients", user_id, data)
+        _apply("clients", user_id, data)
+        _applied("clients", generation)
 
 
-def get_client_data(user_id: int) -> Optional[Dict[str, Any]]:
+def get_client_data(user_id: int) -> Optional[Client]:
     """Get client data for a given user ID."""
-    return _clients.get(user_id)
+    return _data().get("clients", user_id)
+
+
+def iter_clients() -> Iterator[Client]:
+    """Iterate over all clients; records carry their user_id and are not copied."""
+    return (data for _, data in _data().items("clients"))
 
 
-def get_client_list() -> List[Dict[str, Any]]:
+def get_client_list() -> List[Client]:
     """Get a list of all clients with their data."""
-    return [
-        {"user_id": user_id, **data}
-        for user_id, data in _clients.items()
-    ]
+    return list(iter_clients())
 
 
-def get_clients_by_city(city: str) -> List[Dict[str, Any]]:
+def get_clients_by_city(city: str) -> List[Client]:
     """Get a list of clients in a specific city."""
-    city = city.lower()
-    return [
-        {"user_id": user_id, **data}
-        for user_id, data in _clients.items()
-        if data.get('city', '').lower() == city
+    return [data for _, data in _data().by_city("clients", city)]
+
+
+# Paginated listings
+def _encode_cursor(sort: str, user_id: int, data: Dict[str, Any]) -> str:
+    position = [sort_value(sort, data), user_id]
+    return base64.urlsafe_b64encode(json.dumps(position, ensure_ascii=False).encode()).decode()
+
+
+def _decode_cursor(cursor: Optional[str]) -> Optional[tuple]:
+    if not cursor:
+        return None
+    try:
+        value, user_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return (value, int(user_id))
+    except (ValueError, TypeError) as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+
+
+def _get_page(kind: str, sort: str, cursor: Optional[str], limit: int,
+              **filters) -> Tuple[list, Optional[str]]:
+    if sort not in SORT_FIELDS[kind]:
+        raise ValueError(f"Unknown sort order for {kind}: {sort}")
+
+    # Fetch one extra record to know whether a next page exists
+    records = _data().page(kind, sort, _decode_cursor(cursor), limit + 1, **filters)
+    next_cursor = None
+    if len(records) > limit:
+        records = records[:limit]
+        next_cursor = _encode_cursor(sort, *records[-1])
+    return [data for _, data in records], next_cursor
+
+
+def get_translator_page(sort: str = "user_id", cursor: Optional[str] = None, limit: int = 50,
+                        city: Optional[str] = None, min_level: Optional[str] = None,
+                        max_price: Optional[float] = None) -> Tuple[List[Translator], Optional[str]]:
+    """
+    Get one page of translators sorted by user_id, city, level or price.
+    Returns the page and the cursor of the next page (None on the last page).
+    """
+    return _get_page("translators", sort, cursor, limit,
+                     city=city, min_level=min_level, max_price=max_price)
+
+
+def get_client_page(sort: str = "user_id", cursor: Optional[str] = None, limit: int = 50,
+                    city: Optional[str] = None) -> Tuple[List[Client], Optional[str]]:
+    """
+    Get one page of clients sorted by user_id or city.
+    Returns the page and the cursor of the next page (None on the last page).
+    """
+    return _get_page("clients", sort, cursor, limit, city=city)
+
+
+def iter_records(kind: str, batch_size: int = 1000, **filters) -> Iterator[Any]:
+    """Yield all translators or clients page by page, without building the full list."""
+    cursor = None
+    while True:
+        records, cursor = _get_page(kind, "user_id", cursor, batch_size, **filters)
+        yield from records
+        if cursor is None:
+            return
+
+
+# Conversation state persistence
+def _conversation_key(name: str, key: Tuple[int, ...]) -> str:
+    return name + "/" + ",".join(str(part) for part in key)
+
+
+def get_conversation_states(name: str) -> Dict[Tuple[int, ...], object]:
+    """Get all saved states of a named conversation, keyed by conversation key."""
+    prefix = name + "/"
+    return {
+        tuple(int(part) for part in record_key[len(prefix):].split(",") if part): state
+        for record_key, state in _data().items("conversations")
+        if isinstance(record_key, str) and record_key.startswith(prefix)
+    }
+
+
+def save_persisted_changes(conversations: Dict[Tuple[str, Tuple[int, ...]], Optional[object]],
+                           user_data: Dict[int, Dict[str, Any]]) -> None:
+    """
+    Save changed conversation states, keyed by (name, key), and users'
+    data in one batch, a single transaction on the SQL backends. None
+    states and empty data are removed.
+    """
+    changes = [
+        ("conversations", _conversation_key(name, key), state) for (name, key), state in conversations.items()
     ]
+    changes.extend(("user_data", user_id, dict(data) if data else None) for user_id, data in user_data.items())
+    _data().write_many(changes)
+
+
+def get_all_user_data() -> Dict[int, Dict[str, Any]]:
+    """Get the saved conversation data of all users."""
+    return dict(_data().items("user_data"))
+
+
+# Client requests posted in the group
+def record_client_request(chat_id: int, message_id: int, user_id: int, city: str,
+                          text: str = "", link: Optional[str] = None) -> str:
+    """Record a client's request post as open; returns its key."""
+    key = request_key(chat_id, message_id)
+    record = _with_city_id({
+        "chat_id": chat_id,
+        "message_id": message_id,
+        "user_id": user_id,
+        "city": city,
+        "text": text[:500],
+        "link": link,
+        "created": time.time(),
+        "status": OPEN
+    })
+    store = _data()
+    with _sync_lock:
+        generation = store.put("requests", key, record)
+        _apply("requests", key, record)
+        _applied("requests", generation)
+    return key
+
+
+def _finish_request(key: str, status: str) -> Optional[Dict[str, Any]]:
+    store = _data()
+    with _sync_lock:
+        record = _requests.get(key)
+        if record is None:
+            return None
+        record = {**record, "status": status, "closed": time.time()}
+        generation = store.put("requests", key, record)
+        _apply("requests", key, record)
+        _applied("requests", generation)
+    return record
+
+
+def fulfil_requests(user_id: int, chat_id: Optional[int] = None,
+                    message_id: Optional[int] = None) -> int:
+    """
+    Mark a user's open requests as fulfilled: the one posted as `message_id`
+    if given, otherwise all of them (in `chat_id`, if given).
+    Returns the number of requests marked.
+    """
+    _sync()
+    if message_id is not None and chat_id is not None:
+        key = request_key(chat_id, message_id)
+        record = _requests.get(key)
+        keys = [key] if record is not None and record.get("user_id") == user_id else []
+    else:
+        keys = _requests.user_requests(user_id, chat_id)
+    return sum(1 for key in keys if _finish_request(key, FULFILLED) is not None)
+
+
+def get_open_requests(city: Optional[str] = None, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+    """Open requests, newest first, optionally only those of one city."""
+    _sync()
+    return [{"key": key, **record} for key, record in _requests.open_requests(city, limit)]
+
+
+def get_open_request_counts() -> Dict[str, int]:
+    """Number of open requests per city."""
+    _sync()
+    return _requests.city_counts()
+
+
+def close_stale_requests(max_age: float, batch_size: int = 100) -> List[Dict[str, Any]]:
+    """Close up to `batch_size` of the oldest requests open for more than `max_age` seconds."""
+    _sync()
+    closed = []
+    for key in _requests.stale(time.time() - max_age, batch_size):
+        record = _finish_request(key, CLOSED)
+        if record is not None:
+            closed.append(record)
+    return closed
+
+
+# Broadcast jobs
+def save_broadcast_job(key: str, job: Dict[str, Any]) -> None:
+    """Save a queued or finished broadcast message under its dedupe key."""
+    _data().put("broadcasts", key, job)
+
+
+def delete_broadcast_job(key: str) -> None:
+    """Forget a broadcast message."""
+    _data().delete("broadcasts", key)
+
+
+def get_broadcast_jobs() -> Dict[str, Dict[str, Any]]:
+    """Get all saved broadcast messages, keyed by dedupe key."""
+    return dict(_data().items("broadcasts"))
 
 
 # Spam detection
 def is_spam_message(text: str) -> bool:
     """
-    Basic spam detection.
+    Spam detection through the shared single-pass classifier.
     Returns True if the message appears to be spam.
     """
-    # Basic spam detection rules with Russian support
-    spam_patterns = [
-        r'https?://(?!t\.me)',  # Links except Telegram links
-        
-        # English spam words
-        r'(?i)viagra|casino|lottery|winner|prize|money|bitcoin|crypto',
-        
-        # Russian spam words
-        r'(?i)казино|лотерея|выигрыш|приз|деньги|биткоин|крипто|обогащение|доход',
-        r'(?i)заработок онлайн|быстрые деньги|инвестиции|вложения|пассивный доход',
-        
-        r'\+\d{9,}',  # International phone numbers (not related to translation services)
-    ]
-    
-    # Check if any pattern matches
-    for pattern in spam_patterns:
-        if re.search(pattern, text):
-            return True
-            
-    # Check for excessive capitalization
-    if sum(1 for c in text if c.isupper()) / max(1, len(text)) > 0.7:
-        return True
-        
-    return False
-
-
-# Initialize data
-load_data()
+    return is_spam(text)
+
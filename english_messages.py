@@ -0,0 +1,276 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Text messages of the bot in English.
+"""
+
+# Start messages
+START_MESSAGE = """
+Hello, {}! 👋
+
+Welcome to the translation service bot.
+
+Please choose your role:
+"""
+
+# Role selection messages
+TRANSLATOR_SELECTED = """
+You chose to register as a *Translator* 🗣️
+
+Please provide the following information:
+
+First, what is your full name?
+"""
+
+CLIENT_SELECTED = """
+You chose to register as a *Client* 👤
+
+Please tell us which city you are in:
+"""
+
+# Translator registration messages
+TRANSLATOR_CITY_PROMPT = "Thank you, {}! Now, please tell us which city in Germany you are in:"
+
+TRANSLATOR_LEVEL_PROMPT = """
+Great! What is your level of German?
+
+Please choose one of the following: A1, A2, B1, B2, C1, C2 or Native
+"""
+
+TRANSLATOR_LEVEL_INVALID = "Please enter a valid language level (A1, A2, B1, B2, C1, C2 or Native):"
+
+TRANSLATOR_PRICE_PROMPT = "Thank you! Please enter your price per hour in euros (for example, 25):"
+
+TRANSLATOR_PRICE_INVALID = "Please enter a valid price (a number, for example, 25):"
+
+TRANSLATOR_CONTACT_PROMPT = """
+Almost done! Please provide your contact information:
+This can be your Telegram username (for example, @username) or a phone number.
+"""
+
+TRANSLATOR_REGISTRATION_COMPLETE = """
+✅ Thank you! Your translator profile has been created.
+
+*Name:* {}
+*City:* {}
+*German level:* {}
+*Price per hour:* {}€
+*Contact:* {}
+
+You are registered as a translator!
+"""
+
+# Client registration messages
+CLIENT_VERIFICATION_PROMPT = """
+Thank you! To confirm that you are a client, please briefly describe what kind of translation service you need:
+
+For example: 'Doctor's appointment', 'Translation of legal documents', etc.
+"""
+
+CLIENT_SUSPICIOUS = """
+⚠️ It looks like you may be a translator rather than a client looking for translation services.
+
+If you are a translator, please restart the registration with the /start command and choose 'Translator'.
+
+This keeps the group organized and makes sure you get the right access to all translator features.
+"""
+
+CLIENT_REGISTRATION_COMPLETE = """
+✅ Thank you! You are registered as a client in {}.
+
+You can now post translation requests in the group chat.
+"""
+
+# Instructions for users
+TRANSLATOR_INSTRUCTIONS = """
+🔹 *Translator instructions* 🔹
+
+Thank you for registering as a translator! Here is how to get started:
+
+1️⃣ *Finding clients:*
+• Watch the group chat for translation requests in your city
+• Contact clients directly through private messages
+• Introduce yourself professionally and state your rates
+
+2️⃣ *Group chat rules (IMPORTANT):*
+• As a translator, you CANNOT post regular messages in the group
+• You may only post if you need a replacement (include the phrase "need replacement" in your message)
+• All contact with clients must happen through private messages
+• ⚠️ Translators who register as clients to get around these rules risk being removed
+
+3️⃣ *Earning with translations:*
+• Agree on your hourly rate clearly before appointments
+• Be punctual and professional during translation sessions
+• Consider asking satisfied clients for feedback
+
+4️⃣ *Future features:*
+• In the future, translator profiles may require a subscription fee
+• Registered translators will get priority access to clients
+• Additional professional tools for registered translators
+
+Remember that a proper registration gives you full access to all translator features!
+"""
+
+CLIENT_INSTRUCTIONS = """
+🔹 *Client instructions* 🔹
+
+Thank you for registering! Here is how to find a translator:
+
+1️⃣ *Posting requests:*
+• Describe clearly what you need a translation for
+• Always state your city and preferred date/time
+• Give any relevant details (duration, subject, etc.)
+
+2️⃣ *Group benefits for clients:*
+• As a verified client, you can freely post translation requests in the group
+• Translators will contact you privately to offer their services
+• This keeps the group organized and easy to use
+
+3️⃣ *Important rules:*
+• When you have found a translator, please write "translator found" in the group
+• This avoids you being contacted by many translators
+• Be clear about your expectations and budget
+
+4️⃣ *Safety tips:*
+• Choose public places for first meetings
+• Discuss rates before the meeting
+• For long-term needs, consider booking in advance
+
+We hope you find the perfect translator for your needs!
+"""
+
+# General messages
+HELP_MESSAGE = """
+🌟 *Translation service bot help* 🌟
+
+*Available commands:*
+/start - Register as a translator or client
+/help - Show this help message
+/found - Mark that you have found a translator
+/match - Find translators in your city (or: /match Berlin); for translators, the open client requests
+/cancel - Cancel the current operation
+
+{}
+
+*For translators:*
+• Fill in your profile with all the required information
+• Contact clients directly through private messages
+• Be professional and clear about your rates
+
+*For clients:*
+• Post your translation needs clearly
+• Always state your city
+• Use the /found command when you have found a translator
+
+If you need further help, please contact the group administrator.
+"""
+
+HELP_ADMIN_COMMAND = "/admin - View registration statistics and a data summary\n"
+
+CANCEL_MESSAGE = "Operation cancelled. You can start again with the /start command."
+
+# Group interaction messages
+TRANSLATOR_FOUND_MESSAGE = """
+✅ Thank you for letting us know that you found a translator!
+This lets other translators know that your request has been fulfilled.
+"""
+
+SPAM_WARNING = """
+⚠️ Your message was flagged as potential spam.
+Please make sure your messages are about translation services.
+"""
+
+TRANSLATOR_GROUP_RESTRICTION = """
+⚠️ As a translator, you cannot post regular messages in the group chat.
+You may only post if you need a replacement.
+
+To contact clients, please send them private messages.
+"""
+
+REGISTRATION_REQUIRED = """
+⚠️ You need to register before posting messages in the group.
+Please start a private chat with me and use the /start command to register
+either as a translator or as a client.
+"""
+
+CLIENT_VERIFICATION_REQUIRED = """
+⚠️ Please complete your client registration before posting in the group.
+Start a private chat with me and use the /start command.
+"""
+
+ERROR_MESSAGE = """
+Sorry, an error occurred. Please try again later or contact the administrator.
+"""
+
+ADMIN_NOT_ALLOWED = """
+Sorry, this command is only available to administrators.
+"""
+
+# Translator matching
+MATCH_USAGE = """
+Give a city, for example: /match Berlin
+Registered clients can just send /match to search in their own city.
+"""
+
+MATCH_HEADER = "🔎 Matching translators for {}:"
+
+MATCH_LINE = "{}. {} — {}, level {}, {}€/hour, contact: {}"
+
+MATCH_NEARBY = " ({} km from you)"
+
+MATCH_NONE = "Unfortunately, there are no matching translators in or near {} yet."
+
+# Open client requests
+OPEN_REQUESTS_HEADER = "📋 Open client requests in {}:"
+
+OPEN_REQUESTS_LINE = "{}. {}"
+
+OPEN_REQUESTS_LINK = " — {}"
+
+OPEN_REQUESTS_NONE = "There are no open client requests in {} right now."
+
+# Translator notifications
+NEW_REQUEST_NOTIFICATION = "📢 New client request in {}:\n\n{}"
+
+NEW_REQUEST_LINK = "\n\nGroup message: {}"
+
+# Admin data summary
+ADMIN_SUMMARY = """📊 *Admin data summary*
+
+Total translators: {}
+Total clients: {}
+Translator/client ratio: {:.2f}
+
+*Client verification:*
+• Verified clients: {}
+• Unverified clients: {}
+• Suspicious verifications: {}
+
+"""
+
+ADMIN_SUMMARY_PRICES = """*Prices:*
+• Average price: {:.2f}€
+• Lowest price: {:.2f}€
+• Highest price: {:.2f}€
+
+"""
+
+ADMIN_SUMMARY_TRANSLATOR_CITIES = "*Translators by city:*\n"
+
+ADMIN_SUMMARY_CLIENT_CITIES = "\n*Clients by city:*\n"
+
+ADMIN_SUMMARY_LEVELS = "\n*German levels of translators:*\n"
+
+ADMIN_SUMMARY_SUSPICIOUS = "\n*Suspicious client verifications:*\n"
+
+ADMIN_SUMMARY_SUSPICIOUS_LINE = "• User {} from {} - \"{}\"\n"
+
+ADMIN_SUMMARY_MORE = "... and {} more\n"
+
+# Buttons
+TRANSLATOR_BUTTON = "Translator 🗣️"
+CLIENT_BUTTON = "Client 👤"
+
+# Translator commands in the group
+REPLACEMENT_KEYWORDS = ["need replacement", "looking for replacement", "replacement needed"]
@@ -0,0 +1,276 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Textnachrichten des Bots auf Deutsch.
+"""
+
+# Startnachrichten
+START_MESSAGE = """
+Hallo, {}! 👋
+
+Willkommen beim Bot des Dolmetscher-Service.
+
+Bitte wählen Sie Ihre Rolle:
+"""
+
+# Nachrichten zur Rollenwahl
+TRANSLATOR_SELECTED = """
+Sie haben sich für die Registrierung als *Dolmetscher* 🗣️ entschieden.
+
+Bitte geben Sie die folgenden Informationen an:
+
+Zuerst: Wie lautet Ihr vollständiger Name?
+"""
+
+CLIENT_SELECTED = """
+Sie haben sich für die Registrierung als *Kunde* 👤 entschieden.
+
+Bitte geben Sie an, in welcher Stadt Sie sich befinden:
+"""
+
+# Nachrichten der Dolmetscher-Registrierung
+TRANSLATOR_CITY_PROMPT = "Danke, {}! Bitte geben Sie jetzt an, in welcher Stadt in Deutschland Sie sich befinden:"
+
+TRANSLATOR_LEVEL_PROMPT = """
+Sehr gut! Wie ist Ihr Deutschniveau?
+
+Bitte wählen Sie eines der folgenden: A1, A2, B1, B2, C1, C2 oder Native (Muttersprache)
+"""
+
+TRANSLATOR_LEVEL_INVALID = "Bitte geben Sie ein gültiges Sprachniveau an (A1, A2, B1, B2, C1, C2 oder Native):"
+
+TRANSLATOR_PRICE_PROMPT = "Danke! Bitte geben Sie Ihren Stundenpreis in Euro an (zum Beispiel 25):"
+
+TRANSLATOR_PRICE_INVALID = "Bitte geben Sie einen gültigen Preis an (eine Zahl, zum Beispiel 25):"
+
+TRANSLATOR_CONTACT_PROMPT = """
+Fast fertig! Bitte geben Sie Ihre Kontaktdaten an:
+Das kann Ihr Telegram-Benutzername (zum Beispiel @username) oder eine Telefonnummer sein.
+"""
+
+TRANSLATOR_REGISTRATION_COMPLETE = """
+✅ Danke! Ihr Dolmetscherprofil wurde erstellt.
+
+*Name:* {}
+*Stadt:* {}
+*Deutschniveau:* {}
+*Preis pro Stunde:* {}€
+*Kontakt:* {}
+
+Sie sind als Dolmetscher registriert!
+"""
+
+# Nachrichten der Kunden-Registrierung
+CLIENT_VERIFICATION_PROMPT = """
+Danke! Um zu bestätigen, dass Sie Kunde sind, beschreiben Sie bitte kurz, welche Art von Dolmetscherleistung Sie benötigen:
+
+Zum Beispiel: 'Arzttermin', 'Übersetzung von Rechtsdokumenten' usw.
+"""
+
+CLIENT_SUSPICIOUS = """
+⚠️ Es sieht so aus, als wären Sie eher Dolmetscher als ein Kunde, der Dolmetscherleistungen sucht.
+
+Wenn Sie Dolmetscher sind, starten Sie die Registrierung bitte mit dem Befehl /start neu und wählen Sie 'Dolmetscher'.
+
+So bleibt die Gruppe übersichtlich, und Sie erhalten den richtigen Zugang zu allen Funktionen für Dolmetscher.
+"""
+
+CLIENT_REGISTRATION_COMPLETE = """
+✅ Danke! Sie sind als Kunde in {} registriert.
+
+Sie können jetzt Dolmetscheranfragen im Gruppenchat veröffentlichen.
+"""
+
+# Anleitungen für Benutzer
+TRANSLATOR_INSTRUCTIONS = """
+🔹 *Anleitung für Dolmetscher* 🔹
+
+Danke für Ihre Registrierung als Dolmetscher! So fangen Sie an:
+
+1️⃣ *Kunden finden:*
+• Verfolgen Sie den Gruppenchat auf Anfragen in Ihrer Stadt
+• Kontaktieren Sie Kunden direkt per Privatnachricht
+• Stellen Sie sich professionell vor und nennen Sie Ihre Preise
+
+2️⃣ *Regeln im Gruppenchat (WICHTIG):*
+• Als Dolmetscher dürfen Sie KEINE normalen Nachrichten in der Gruppe veröffentlichen
+• Sie dürfen nur schreiben, wenn Sie eine Vertretung brauchen (schreiben Sie "brauche Vertretung" in Ihre Nachricht)
+• Der gesamte Kontakt mit Kunden läuft über Privatnachrichten
+• ⚠️ Dolmetscher, die sich als Kunden registrieren, um diese Regeln zu umgehen, riskieren den Ausschluss
+
+3️⃣ *Verdienen mit Dolmetschen:*
+• Vereinbaren Sie Ihren Stundensatz klar vor den Terminen
+• Seien Sie pünktlich und professionell
+• Bitten Sie zufriedene Kunden um eine Bewertung
+
+4️⃣ *Geplante Funktionen:*
+• Künftig können Dolmetscherprofile eine Abogebühr erfordern
+• Registrierte Dolmetscher erhalten bevorzugten Zugang zu Kunden
+• Zusätzliche professionelle Werkzeuge für registrierte Dolmetscher
+
+Denken Sie daran: Eine vollständige Registrierung gibt Ihnen Zugang zu allen Funktionen für Dolmetscher!
+"""
+
+CLIENT_INSTRUCTIONS = """
+🔹 *Anleitung für Kunden* 🔹
+
+Danke für Ihre Registrierung! So finden Sie einen Dolmetscher:
+
+1️⃣ *Anfragen veröffentlichen:*
+• Beschreiben Sie klar, wofür Sie einen Dolmetscher brauchen
+• Nennen Sie immer Ihre Stadt und das gewünschte Datum und die Uhrzeit
+• Geben Sie alle wichtigen Details an (Dauer, Thema usw.)
+
+2️⃣ *Vorteile der Gruppe für Kunden:*
+• Als bestätigter Kunde können Sie Anfragen frei in der Gruppe veröffentlichen
+• Dolmetscher melden sich privat bei Ihnen mit ihrem Angebot
+• So bleibt die Gruppe übersichtlich und leicht zu nutzen
+
+3️⃣ *Wichtige Regeln:*
+• Wenn Sie einen Dolmetscher gefunden haben, schreiben Sie bitte "Dolmetscher gefunden" in die Gruppe
+• So vermeiden Sie viele Anfragen von Dolmetschern
+• Seien Sie klar bei Ihren Erwartungen und Ihrem Budget
+
+4️⃣ *Sicherheitstipps:*
+• Wählen Sie für erste Treffen öffentliche Orte
+• Besprechen Sie die Preise vor dem Termin
+• Buchen Sie bei längerem Bedarf frühzeitig
+
+Wir hoffen, Sie finden den passenden Dolmetscher!
+"""
+
+# Allgemeine Nachrichten
+HELP_MESSAGE = """
+🌟 *Hilfe zum Bot des Dolmetscher-Service* 🌟
+
+*Verfügbare Befehle:*
+/start - Als Dolmetscher oder Kunde registrieren
+/help - Diese Hilfe anzeigen
+/found - Markieren, dass Sie einen Dolmetscher gefunden haben
+/match - Dolmetscher in Ihrer Stadt finden (oder: /match Berlin); für Dolmetscher die offenen Kundenanfragen
+/cancel - Den aktuellen Vorgang abbrechen
+
+{}
+
+*Für Dolmetscher:*
+• Füllen Sie Ihr Profil mit allen nötigen Angaben aus
+• Kontaktieren Sie Kunden direkt per Privatnachricht
+• Seien Sie professionell und klar bei Ihren Preisen
+
+*Für Kunden:*
+• Veröffentlichen Sie Ihren Bedarf klar und deutlich
+• Nennen Sie immer Ihre Stadt
+• Verwenden Sie den Befehl /found, wenn Sie einen Dolmetscher gefunden haben
+
+Wenn Sie weitere Hilfe brauchen, wenden Sie sich bitte an den Administrator der Gruppe.
+"""
+
+HELP_ADMIN_COMMAND = "/admin - Registrierungsstatistik und Datenübersicht anzeigen\n"
+
+CANCEL_MESSAGE = "Vorgang abgebrochen. Mit dem Befehl /start können Sie neu beginnen."
+
+# Nachrichten für die Gruppe
+TRANSLATOR_FOUND_MESSAGE = """
+✅ Danke für die Mitteilung, dass Sie einen Dolmetscher gefunden haben!
+So wissen die anderen Dolmetscher, dass Ihre Anfrage erledigt ist.
+"""
+
+SPAM_WARNING = """
+⚠️ Ihre Nachricht wurde als möglicher Spam markiert.
+Bitte achten Sie darauf, dass Ihre Nachrichten Dolmetscherleistungen betreffen.
+"""
+
+TRANSLATOR_GROUP_RESTRICTION = """
+⚠️ Als Dolmetscher dürfen Sie keine normalen Nachrichten im Gruppenchat veröffentlichen.
+Sie dürfen nur schreiben, wenn Sie eine Vertretung brauchen.
+
+Bitte kontaktieren Sie Kunden per Privatnachricht.
+"""
+
+REGISTRATION_REQUIRED = """
+⚠️ Sie müssen sich registrieren, bevor Sie in der Gruppe schreiben können.
+Bitte starten Sie einen privaten Chat mit mir und registrieren Sie sich mit dem Befehl /start
+als Dolmetscher oder als Kunde.
+"""
+
+CLIENT_VERIFICATION_REQUIRED = """
+⚠️ Bitte schließen Sie Ihre Registrierung als Kunde ab, bevor Sie in der Gruppe schreiben.
+Starten Sie einen privaten Chat mit mir und verwenden Sie den Befehl /start.
+"""
+
+ERROR_MESSAGE = """
+Entschuldigung, ein Fehler ist aufgetreten. Bitte versuchen Sie es später erneut oder wenden Sie sich an den Administrator.
+"""
+
+ADMIN_NOT_ALLOWED = """
+Entschuldigung, dieser Befehl steht nur Administratoren zur Verfügung.
+"""
+
+# Dolmetschersuche
+MATCH_USAGE = """
+Geben Sie eine Stadt an, zum Beispiel: /match Berlin
+Registrierte Kunden können einfach /match senden, um in ihrer eigenen Stadt zu suchen.
+"""
+
+MATCH_HEADER = "🔎 Passende Dolmetscher für {}:"
+
+MATCH_LINE = "{}. {} — {}, Niveau {}, {}€/Stunde, Kontakt: {}"
+
+MATCH_NEARBY = " ({} km von Ihnen)"
+
+MATCH_NONE = "Leider gibt es in {} und Umgebung noch keine passenden Dolmetscher."
+
+# Offene Kundenanfragen
+OPEN_REQUESTS_HEADER = "📋 Offene Kundenanfragen in {}:"
+
+OPEN_REQUESTS_LINE = "{}. {}"
+
+OPEN_REQUESTS_LINK = " — {}"
+
+OPEN_REQUESTS_NONE = "In {} gibt es gerade keine offenen Kundenanfragen."
+
+# Benachrichtigungen für Dolmetscher
+NEW_REQUEST_NOTIFICATION = "📢 Neue Kundenanfrage in {}:\n\n{}"
+
+NEW_REQUEST_LINK = "\n\nNachricht in der Gruppe: {}"
+
+# Datenübersicht für Administratoren
+ADMIN_SUMMARY = """📊 *Datenübersicht für Administratoren*
+
+Dolmetscher insgesamt: {}
+Kunden insgesamt: {}
+Verhältnis Dolmetscher/Kunden: {:.2f}
+
+*Verifizierung der Kunden:*
+• Bestätigte Kunden: {}
+• Unbestätigte Kunden: {}
+• Verdächtige Verifizierungen: {}
+
+"""
+
+ADMIN_SUMMARY_PRICES = """*Preise:*
+• Durchschnittspreis: {:.2f}€
+• Niedrigster Preis: {:.2f}€
+• Höchster Preis: {:.2f}€
+
+"""
+
+ADMIN_SUMMARY_TRANSLATOR_CITIES = "*Dolmetscher nach Städten:*\n"
+
+ADMIN_SUMMARY_CLIENT_CITIES = "\n*Kunden nach Städten:*\n"
+
+ADMIN_SUMMARY_LEVELS = "\n*Deutschniveau der Dolmetscher:*\n"
+
+ADMIN_SUMMARY_SUSPICIOUS = "\n*Verdächtige Verifizierungen von Kunden:*\n"
+
+ADMIN_SUMMARY_SUSPICIOUS_LINE = "• Benutzer {} aus {} - \"{}\"\n"
+
+ADMIN_SUMMARY_MORE = "... und {} weitere\n"
+
+# Schaltflächen
+TRANSLATOR_BUTTON = "Dolmetscher 🗣️"
+CLIENT_BUTTON = "Kunde 👤"
+
+# Befehle für Dolmetscher in der Gruppe
+REPLACEMENT_KEYWORDS = ["brauche vertretung", "suche vertretung"]
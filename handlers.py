@@ -5,43 +5,66 @@
 Command and message handlers for the Telegram bot.
 """
 
+import asyncio
 import logging
-import re
 from typing import Union
-from telegram import Update, InlineKeyboardMarkup, InlineKeyboardButton
+from telegram import Update
 from telegram.ext import ContextTypes, ConversationHandler
 
-from conversation_flows import SELECTING_USER_TYPE, TRANSLATOR_FORM, CLIENT_FORM
+from conversation_flows import SELECTING_USER_TYPE, TRANSLATOR_NAME, CLIENT_CITY
 from data_manager import (
     save_user_type,
-    get_translator_list,
-    get_client_list,
-    is_spam_message
+    get_client_data,
+    get_translators_by_city,
+    get_translator_data,
+    get_user_type,
+    match_translators,
+    record_client_request,
+    fulfil_requests,
+    get_open_requests
 )
+from broadcast import broadcast_queue
+from message_classifier import classify_message
+from records import format_price
 from utils import send_instructions, get_admin_data_summary
-from config import ADMIN_USER_IDS, USE_RUSSIAN, TRANSLATOR_FOUND_PHRASES, NEED_REPLACEMENT_PHRASES
-
-# Import Russian messages
-from russian_messages import *
+from config import ADMIN_USER_IDS, MATCH_RESULTS, NOTIFY_TRANSLATORS
+from messages import catalog
+from message_ids import (
+    START_MESSAGE,
+    TRANSLATOR_SELECTED,
+    CLIENT_SELECTED,
+    CANCEL_MESSAGE,
+    TRANSLATOR_FOUND_MESSAGE,
+    SPAM_WARNING,
+    TRANSLATOR_GROUP_RESTRICTION,
+    REGISTRATION_REQUIRED,
+    CLIENT_VERIFICATION_REQUIRED,
+    ERROR_MESSAGE,
+    ADMIN_NOT_ALLOWED,
+    MATCH_USAGE,
+    MATCH_HEADER,
+    MATCH_LINE,
+    MATCH_NEARBY,
+    MATCH_NONE,
+    OPEN_REQUESTS_HEADER,
+    OPEN_REQUESTS_LINE,
+    OPEN_REQUESTS_LINK,
+    OPEN_REQUESTS_NONE,
+    NEW_REQUEST_NOTIFICATION,
+    NEW_REQUEST_LINK
+)
 
 logger = logging.getLogger(__name__)
 
 async def start_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> Union[int, str]:
     """Start command handler that initiates user registration."""
     user = update.effective_user
-    logger.info(f"User {user.id} started the bot")
-    
-    keyboard = [
-        [
-            InlineKeyboardButton(TRANSLATOR_BUTTON, callback_data='translator'),
-            InlineKeyboardButton(CLIENT_BUTTON, callback_data='client')
-        ]
-    ]
-    reply_markup = InlineKeyboardMarkup(keyboard)
+    logger.info("User %s started the bot", user.id)
     
+    texts = catalog.for_user(user)
     await update.message.reply_text(
-        START_MESSAGE.format(user.first_name),
-        reply_markup=reply_markup
+        texts.render(START_MESSAGE, user.first_name),
+        reply_markup=texts.start_keyboard
     )
     
     return SELECTING_USER_TYPE
@@ -51,11 +74,8 @@ async def help_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> No
     user_id = update.effective_user.id
     is_admin = user_id in ADMIN_USER_IDS
     
-    admin_command = HELP_ADMIN_COMMAND if is_admin else ""
-    
-    help_text = HELP_MESSAGE.format(admin_command)
-    
-    await update.message.reply_text(help_text, parse_mode='Markdown')
+    texts = catalog.for_user(update.effective_user)
+    await update.message.reply_text(texts.help[is_admin], parse_mode='Markdown')
 
 async def button_callback(update: Update, context: ContextTypes.DEFAULT_TYPE) -> Union[int, str]:
     """Process the callback data when user selects their type."""
@@ -64,48 +84,50 @@ async def button_callback(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
     
     user_id = query.from_user.id
     user_type = query.data
+    texts = catalog.for_user(query.from_user)
     
-    # Save the user type
-    save_user_type(user_id, user_type)
+    # Save the user type, off the event loop like every store write
+    await asyncio.get_running_loop().run_in_executor(None, save_user_type, user_id, user_type)
     
     if user_type == 'translator':
         await query.edit_message_text(
-            TRANSLATOR_SELECTED,
+            texts[TRANSLATOR_SELECTED],
             parse_mode='Markdown'
         )
         # Use the first step of translator registration flow
-        from conversation_flows import TRANSLATOR_NAME
         return TRANSLATOR_NAME
     else:  # client
         await query.edit_message_text(
-            CLIENT_SELECTED,
+            texts[CLIENT_SELECTED],
             parse_mode='Markdown'
         )
         # Use the first step of client registration flow
-        from conversation_flows import CLIENT_CITY
         return CLIENT_CITY
 
-async def handle_text_message(update: Update, context: ContextTypes.DEFAULT_TYPE, override_text=None) -> None:
+async def handle_text_message(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Handle regular text messages in the group."""
-    message_text = override_text or update.message.text.lower()
+    message_text = update.message.text
     user_id = update.effective_user.id
+    texts = catalog.for_user(update.effective_user)
     
     # Check if message is in a group chat (not private)
     is_group_message = update.effective_chat.type in ["group", "supergroup"]
     
     # Get user type (translator or client)
-    from data_manager import get_user_type, get_client_data
     user_type = get_user_type(user_id)
     
+    # One pass over the text finds the trigger phrases and any spam
+    report = classify_message(message_text)
+    
     # Check if the message is related to finding a translator
-    translator_found = any(phrase in message_text.lower() for phrase in TRANSLATOR_FOUND_PHRASES)
-    if translator_found:
-        await update.message.reply_text(TRANSLATOR_FOUND_MESSAGE)
+    if report.found:
+        await mark_requests_found(update)
+        await update.message.reply_text(texts[TRANSLATOR_FOUND_MESSAGE])
         return
     
     # Check for spam
-    if is_spam_message(message_text):
-        await update.message.reply_text(SPAM_WARNING)
+    if report.is_spam:
+        await update.message.reply_text(texts[SPAM_WARNING])
         return
     
     # Enforce group message permissions
@@ -113,7 +135,7 @@ async def handle_text_message(update: Update, context: ContextTypes.DEFAULT_TYPE
         # In groups, enforce permission rules
         
         # Special case - if it contains "need replacement" and user is a translator, allow it
-        replacement_needed = any(phrase in message_text.lower() for phrase in NEED_REPLACEMENT_PHRASES)
+        replacement_needed = report.replacement
         if replacement_needed and user_type == "translator":
             # This is allowed - translator looking for a replacement
             return
@@ -121,7 +143,7 @@ async def handle_text_message(update: Update, context: ContextTypes.DEFAULT_TYPE
         # If user is a translator but trying to post a regular message (not replacement request)
         if user_type == "translator" and not replacement_needed:
             await update.message.reply_text(
-                TRANSLATOR_GROUP_RESTRICTION,
+                texts[TRANSLATOR_GROUP_RESTRICTION],
                 reply_to_message_id=update.message.message_id
             )
             return
@@ -129,7 +151,7 @@ async def handle_text_message(update: Update, context: ContextTypes.DEFAULT_TYPE
         # If user has not registered yet
         if not user_type:
             await update.message.reply_text(
-                REGISTRATION_REQUIRED,
+                texts[REGISTRATION_REQUIRED],
                 reply_to_message_id=update.message.message_id
             )
             return
@@ -139,35 +161,101 @@ async def handle_text_message(update: Update, context: ContextTypes.DEFAULT_TYPE
             client_data = get_client_data(user_id)
             if not client_data or not client_data.get('registration_complete'):
                 await update.message.reply_text(
-                    CLIENT_VERIFICATION_REQUIRED,
+                    texts[CLIENT_VERIFICATION_REQUIRED],
                     reply_to_message_id=update.message.message_id
                 )
                 return
+            
+            # A verified client's post is a request: track it and tell the translators in that city.
+            # Both save to the store, once for the request and once per notification,
+            # so they run in a worker thread, not on the event loop
+            await asyncio.get_running_loop().run_in_executor(
+                None, record_request, update.message, user_id, client_data
+            )
     
     # Check if we're in the middle of a conversation but it wasn't caught by the handler
     if hasattr(context, 'user_data') and context.user_data:
-        logger.debug(f"User data found: {context.user_data}")
+        logger.debug("User data found: %s", context.user_data)
         # This helps with debugging any potential conversation state issues
     
     # Default response if needed
     # This is left empty to avoid responding to all messages in the group
 
+async def mark_requests_found(update: Update) -> int:
+    """
+    Mark the sender's open requests as fulfilled: the request the message
+    replies to, or otherwise all of the sender's requests in this chat.
+    """
+    message = update.message
+    chat_id = update.effective_chat.id if update.effective_chat.type in ["group", "supergroup"] else None
+    reply_to = message.reply_to_message.message_id if message.reply_to_message else None
+    # Saving the requests writes to the store; keep it off the event loop
+    fulfilled = await asyncio.get_running_loop().run_in_executor(
+        None, fulfil_requests, update.effective_user.id, chat_id, reply_to if chat_id is not None else None
+    )
+    logger.info("User %s marked %s requests as found", update.effective_user.id, fulfilled)
+    return fulfilled
+
+async def found_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    """Mark the client's request as fulfilled."""
+    await mark_requests_found(update)
+    await update.message.reply_text(catalog.for_user(update.effective_user)[TRANSLATOR_FOUND_MESSAGE])
+
+def record_request(message, user_id: int, client_data) -> None:
+    """Record a verified client's group post as an open request and notify the translators in their city."""
+    record_client_request(
+        message.chat_id,
+        message.message_id,
+        user_id,
+        client_data.get('city', ''),
+        message.text,
+        message.link
+    )
+    if NOTIFY_TRANSLATORS:
+        queued = notify_translators(message, client_data)
+        logger.debug("Queued %s notifications about request from client %s", queued, user_id)
+
+def notify_translators(message, client_data) -> int:
+    """Queue a private message about a client's group post to every translator in the client's city."""
+    city = client_data.get('city', '')
+    # Each translator reads it in the locale saved on their record; built once per locale.
+    # Built from the client's free text: formatted directly instead of through the render cache
+    texts_by_locale = {}
+    
+    queued = 0
+    for translator in get_translators_by_city(city):
+        locale = translator.get('locale')
+        text = texts_by_locale.get(locale)
+        if text is None:
+            texts = catalog.table(locale)
+            text = texts[NEW_REQUEST_NOTIFICATION].format(city, message.text)
+            if message.link:
+                text += texts[NEW_REQUEST_LINK].format(message.link)
+            texts_by_locale[locale] = text
+        
+        # One notification per translator and group message, even if the update is delivered twice
+        key = f"request:{message.chat_id}:{message.message_id}:{translator['user_id']}"
+        if broadcast_queue.enqueue(translator['user_id'], text, key=key):
+            queued += 1
+    return queued
+
 async def cancel_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> Union[int, str]:
     """Cancel the current operation and end the conversation."""
-    await update.message.reply_text(CANCEL_MESSAGE)
+    await update.message.reply_text(catalog.for_user(update.effective_user)[CANCEL_MESSAGE])
     return ConversationHandler.END
 
 async def admin_data_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Admin command to get data summary about translators and clients."""
     user_id = update.effective_user.id
+    texts = catalog.for_user(update.effective_user)
     
     # Check if the user is an admin
     if user_id not in ADMIN_USER_IDS:
-        await update.message.reply_text(ADMIN_NOT_ALLOWED)
+        await update.message.reply_text(texts[ADMIN_NOT_ALLOWED])
         return
     
     # Get the data summary
-    summary = get_admin_data_summary()
+    summary = get_admin_data_summary(texts)
     
     # Send the summary to the admin
     await update.message.reply_text(
@@ -175,10 +263,73 @@ async def admin_data_command(update: Update, context: ContextTypes.DEFAULT_TYPE)
         parse_mode='Markdown'
     )
 
+async def open_requests_command(update: Update, city: str) -> None:
+    """Show a translator the newest open client requests in a city."""
+    requests = get_open_requests(city, MATCH_RESULTS)
+    texts = catalog.for_user(update.effective_user)
+    if not requests:
+        await update.message.reply_text(texts.render(OPEN_REQUESTS_NONE, city))
+        return
+    
+    lines = [texts.render(OPEN_REQUESTS_HEADER, city)]
+    for number, request in enumerate(requests, 1):
+        line = texts[OPEN_REQUESTS_LINE].format(number, request.get('text', ''))
+        if request.get('link'):
+            line += texts[OPEN_REQUESTS_LINK].format(request['link'])
+        lines.append(line)
+    await update.message.reply_text("\n".join(lines))
+
+async def match_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    """
+    Suggest the best translators for the city given as argument or the
+    client's own city; translators get the open client requests of their city.
+    """
+    city = " ".join(context.args) if context.args else None
+    texts = catalog.for_user(update.effective_user)
+    if get_user_type(update.effective_user.id) == "translator":
+        translator_data = get_translator_data(update.effective_user.id) or {}
+        city = city or translator_data.get('city')
+        if not city:
+            await update.message.reply_text(texts[MATCH_USAGE])
+            return
+        await open_requests_command(update, city)
+        return
+    
+    if not city:
+        client_data = get_client_data(update.effective_user.id)
+        city = client_data.get('city') if client_data else None
+    
+    if not city:
+        await update.message.reply_text(texts[MATCH_USAGE])
+        return
+    
+    matches = match_translators(city, MATCH_RESULTS)
+    if not matches:
+        await update.message.reply_text(texts.render(MATCH_NONE, city))
+        return
+    
+    lines = [texts.render(MATCH_HEADER, city)]
+    for number, translator in enumerate(matches, 1):
+        line = texts.render(
+            MATCH_LINE,
+            number,
+            translator.get('name', ''),
+            translator.get('city', ''),
+            translator.get('language_level', ''),
+            format_price(translator.get('price')),
+            translator.get('contact', '')
+        )
+        if translator['distance_km']:
+            line += texts.render(MATCH_NEARBY, round(translator['distance_km']))
+        lines.append(line)
+    
+    # Plain text: names and contacts may contain Markdown characters
+    await update.message.reply_text("\n".join(lines))
+
 async def error_handler(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Handle errors in the dispatcher."""
-    logger.error(f"Exception while handling an update: {context.error}")
+    logger.error("Exception while handling an update: %s", context.error)
     
     # Send a message to the user
     if update:
-        await update.effective_message.reply_text(ERROR_MESSAGE)
+        await update.effective_message.reply_text(catalog.for_user(update.effective_user)[ERROR_MESSAGE])
@@ -0,0 +1,159 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Leader election between the processes of one deployment, e.g. gunicorn
+workers: only the process holding the leader lock runs the bot.
+"""
+
+import fcntl
+import logging
+import os
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+# Key of the PostgreSQL advisory lock; any constant shared by all processes works
+ADVISORY_LOCK_KEY = 0x7472616E736C  # "transl"
+
+
+class FileLeaderLock:
+    """
+    An exclusive flock() on a file next to the data. The kernel releases it
+    when the holding process exits, however it exits, so a crashed leader
+    never blocks the next one.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._fd: Optional[int] = None
+
+    @property
+    def held(self) -> bool:
+        return self._fd is not None
+
+    def acquire(self) -> bool:
+        """Take the lock if no other process holds it; True if this process holds it."""
+        if self._fd is not None:
+            return True
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            os.close(fd)
+            return False
+        # The holder's PID, for holder() and for people looking at the file
+        os.ftruncate(fd, 0)
+        os.write(fd, str(os.getpid()).encode())
+        self._fd = fd
+        return True
+
+    def release(self) -> None:
+        if self._fd is not None:
+            # An empty file tells held_elsewhere() nobody holds the lock
+            os.ftruncate(self._fd, 0)
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+            os.close(self._fd)
+            self._fd = None
+
+    def _holder_pid(self) -> Optional[int]:
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                pid = f.read().strip()
+        except OSError:
+            return None
+        return int(pid) if pid.isdigit() else None
+
+    def held_elsewhere(self) -> bool:
+        """
+        Whether another process holds the lock. Reads the holder's PID from
+        the file instead of taking the lock, which would make a concurrent
+        acquire() fail; a PID left behind by a crashed holder is ignored.
+        """
+        if self._fd is not None:
+            return False
+        pid = self._holder_pid()
+        if pid is None or pid == os.getpid():
+            return False
+        try:
+            os.kill(pid, 0)
+        except ProcessLookupError:
+            return False
+        except PermissionError:
+            # Alive, owned by another user
+            return True
+        return True
+
+    def holder(self) -> Optional[str]:
+        """Description of the process holding the lock, if known."""
+        pid = self._holder_pid()
+        return f"pid {pid}" if pid is not None else None
+
+
+class AdvisoryLeaderLock:
+    """
+    A session-level PostgreSQL advisory lock, for processes on different
+    hosts sharing one database. Held on its own connection; the server
+    releases it when that connection ends. Requires psycopg2.
+    """
+
+    def __init__(self, database_url: str, key: int = ADVISORY_LOCK_KEY):
+        self.database_url = database_url
+        self.key = key
+        self._connection = None
+
+    @property
+    def held(self) -> bool:
+        return self._connection is not None
+
+    def acquire(self) -> bool:
+        """Take the lock if no other session holds it; True if this process holds it."""
+        if self._connection is not None:
+            return True
+        import psycopg2
+        connection = psycopg2.connect(self.database_url)
+        connection.autocommit = True
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT pg_try_advisory_lock(%s)", (self.key,))
+            acquired = cursor.fetchone()[0]
+        if not acquired:
+            connection.close()
+            return False
+        self._connection = connection
+        return True
+
+    def release(self) -> None:
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+    def held_elsewhere(self) -> bool:
+        """Whether another session holds the lock."""
+        if self._connection is not None:
+            return False
+        import psycopg2
+        connection = psycopg2.connect(self.database_url)
+        try:
+            with connection.cursor() as cursor:
+                # A bigint advisory key is split into classid (high) and objid (low 32 bits)
+                cursor.execute(
+                    "SELECT EXISTS (SELECT 1 FROM pg_locks WHERE locktype = 'advisory' "
+                    "AND classid = %s AND objid = %s AND objsubid = 1 AND granted)",
+                    (self.key >> 32, self.key & 0xFFFFFFFF)
+                )
+                return cursor.fetchone()[0]
+        finally:
+            connection.close()
+
+    def holder(self) -> Optional[str]:
+        return None
+
+
+def create_leader_lock(backend: str, data_dir: str, database_url: Optional[str] = None):
+    """The leader lock matching the storage backend: advisory lock on PostgreSQL, else a lock file."""
+    if backend.lower() == "postgres" and database_url:
+        return AdvisoryLeaderLock(database_url)
+    return FileLeaderLock(os.path.join(data_dir, "bot.lock"))
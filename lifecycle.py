@@ -0,0 +1,174 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Lifecycle of the bot inside the admin web app process.
+"""
+
+import asyncio
+import atexit
+import concurrent.futures
+import logging
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from bot import create_bot, get_update_stats, start_application, stop_application
+from config import BOT_MODE, BOT_START_TIMEOUT, BOT_STOP_TIMEOUT
+
+logger = logging.getLogger(__name__)
+
+# Bot states
+STOPPED = "stopped"
+STARTING = "starting"
+RUNNING = "running"
+STOPPING = "stopping"
+FAILED = "failed"
+
+
+class BotLifecycle:
+    """
+    Owns the bot's Application and the one event loop thread it runs on.
+
+    start(), stop(), restart() and status() may be called from any thread,
+    e.g. Flask request threads: the coroutines are handed to the loop with
+    run_coroutine_threadsafe and the caller waits for their result. Calls
+    are serialized, so two concurrent restarts can't start two bots. The
+    loop thread is created once and reused by every start.
+    """
+
+    def __init__(self):
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._application = None
+        self._state = STOPPED
+        self._error: Optional[str] = None
+        self._started_at: Optional[float] = None
+        self._lock = threading.RLock()
+
+    # Event loop thread
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        if self._loop is None:
+            loop = asyncio.new_event_loop()
+            thread = threading.Thread(target=self._run_loop, args=(loop,), name="TelegramBotThread", daemon=True)
+            thread.start()
+            self._loop, self._thread = loop, thread
+        return self._loop
+
+    @staticmethod
+    def _run_loop(loop: asyncio.AbstractEventLoop) -> None:
+        asyncio.set_event_loop(loop)
+        loop.run_forever()
+
+    def _call(self, coroutine, timeout: float) -> Any:
+        """
+        Run `coroutine` on the bot loop and wait for its result. On a timeout
+        the coroutine is cancelled and given BOT_STOP_TIMEOUT to unwind
+        before the TimeoutError is raised, so a stop that follows doesn't
+        run alongside a half-finished start.
+        """
+        settled = threading.Event()
+
+        async def run():
+            try:
+                return await coroutine
+            finally:
+                settled.set()
+
+        future = asyncio.run_coroutine_threadsafe(run(), self._ensure_loop())
+        try:
+            return future.result(timeout)
+        except concurrent.futures.TimeoutError:
+            future.cancel()
+            if not settled.wait(BOT_STOP_TIMEOUT):
+                logger.warning("Bot coroutine still running %s s after it was cancelled", BOT_STOP_TIMEOUT)
+            raise
+
+    # Control
+    def start(self, token: str, timeout: float = BOT_START_TIMEOUT) -> Dict[str, Any]:
+        """Start the bot unless it is running; returns the status."""
+        with self._lock:
+            if self._state == RUNNING:
+                return self.status()
+            self._state, self._error = STARTING, None
+            application = None
+            try:
+                application = create_bot(token)
+                self._call(start_application(application), timeout)
+            except Exception as e:
+                logger.exception("Failed to start the bot")
+                self._state, self._error = FAILED, str(e) or type(e).__name__
+                if application is not None:
+                    self._stop_quietly(application)
+                return self.status()
+            self._application = application
+            self._state, self._started_at = RUNNING, time.time()
+            logger.info("Bot is running")
+            return self.status()
+
+    def stop(self, timeout: float = BOT_STOP_TIMEOUT) -> Dict[str, Any]:
+        """
+        Stop the bot: no new updates are taken, the received ones are
+        processed and persistence is flushed before this returns.
+        """
+        with self._lock:
+            application = self._application
+            if application is None:
+                return self.status()
+            self._state = STOPPING
+            try:
+                self._call(stop_application(application), timeout)
+                self._state, self._error = STOPPED, None
+            except Exception as e:
+                logger.exception("Failed to stop the bot cleanly")
+                self._state, self._error = FAILED, str(e) or type(e).__name__
+            self._application = None
+            self._started_at = None
+            return self.status()
+
+    def restart(self, token: str) -> Dict[str, Any]:
+        with self._lock:
+            self.stop()
+            return self.start(token)
+
+    def _stop_quietly(self, application) -> None:
+        """Undo a partly completed start."""
+        try:
+            self._call(stop_application(application), BOT_STOP_TIMEOUT)
+        except Exception as e:
+            logger.warning("Error cleaning up after a failed start: %s", e)
+
+    def shutdown(self) -> None:
+        """Stop the bot, write all queued saves and end the loop thread."""
+        from data_manager import flush_saves
+
+        self.stop()
+        loop, self._loop = self._loop, None
+        if loop is not None:
+            loop.call_soon_threadsafe(loop.stop)
+            self._thread.join(BOT_STOP_TIMEOUT)
+            if not self._thread.is_alive():
+                loop.close()
+        flush_saves()
+
+    # State
+    @property
+    def running(self) -> bool:
+        return self._state == RUNNING
+
+    def status(self) -> Dict[str, Any]:
+        """Current state, for the dashboard and /api/bot."""
+        return {
+            "state": self._state,
+            "mode": BOT_MODE,
+            "started_at": self._started_at,
+            "uptime": time.time() - self._started_at if self._started_at else None,
+            "error": self._error,
+            "updates": get_update_stats(),
+        }
+
+
+# The bot of this process
+bot_lifecycle = BotLifecycle()
+# Stop the bot and write all pending data when the process exits normally
+atexit.register(bot_lifecycle.shutdown)
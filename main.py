@@ -5,126 +5,446 @@
 Main entry point for the Translation Service Telegram Bot and Admin Web Interface.
 """
 
+import csv
+import hashlib
+import hmac
+import io
+import json
 import logging
 import os
+import sys
 import threading
 import time
-from flask import Flask, render_template, jsonify, request, redirect, url_for
-from bot import create_bot, run_bot, get_group_info
-from data_manager import get_translator_list, get_client_list, get_translators_by_city, get_clients_by_city
-from config import ADMIN_USER_IDS, GROUP_USERNAME
+from datetime import datetime, timezone
+from flask import Flask, Response, abort, render_template, jsonify, request, redirect, stream_with_context, url_for
+from data_manager import (
+    DATA_DIR,
+    get_translator_page,
+    get_client_page,
+    iter_records,
+    get_admin_stats,
+    get_data_generation,
+    get_client_data,
+    match_translators,
+    get_open_requests,
+    get_open_request_counts
+)
+from leader import create_leader_lock
+from metrics import Gauge, render_metrics
+from records import format_price, parse_price
+from config import (
+    ADMIN_USER_IDS,
+    BOT_MODE,
+    GROUP_USERNAME,
+    LANGUAGE_LEVELS,
+    WEBHOOK_PATH,
+    WEBHOOK_SECRET,
+    LOG_LEVEL,
+    ADMIN_PAGE_SIZE,
+    ADMIN_MAX_PAGE_SIZE,
+    MATCH_RESULTS,
+    MAX_MATCH_RESULTS,
+    STORAGE_BACKEND,
+    DATABASE_URL,
+    PORT
+)
+
+# Columns of the CSV exports
+EXPORT_FIELDS = {
+    'translators': ['user_id', 'name', 'city', 'language_level', 'price', 'contact'],
+    'clients': ['user_id', 'city', 'service_needed', 'registration_complete'],
+}
 
 # Configure logging
 logging.basicConfig(
     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    level=logging.DEBUG
+    level=LOG_LEVEL
 )
+# httpx logs every Bot API request at INFO
+if LOG_LEVEL != "DEBUG":
+    logging.getLogger("httpx").setLevel(logging.WARNING)
 
 logger = logging.getLogger(__name__)
 
 # Create Flask app
 app = Flask(__name__)
 app.secret_key = os.environ.get("SESSION_SECRET", "dev_secret_key")
+app.add_template_filter(format_price, 'price')
 
-# Store bot instance
-bot_instance = None
+# Only the process holding this lock runs the bot; other workers serve the admin pages
+leader_lock = create_leader_lock(STORAGE_BACKEND, DATA_DIR, DATABASE_URL)
 
-def start_bot_thread():
-    """Start the bot in a separate thread."""
-    global bot_instance
-    
-    logger.info("Starting the Translation Service Bot")
-    token = os.getenv("TELEGRAM_BOT_TOKEN","7880135656:AAGzSy3FKl_AZd28Bvq1kC0pa9yeZWRxGu4")
-    
+def _bot_stats(module, get_stats):
+    """
+    Counters of a bot component, or None while its module is not loaded.
+
+    The bot modules, and python-telegram-bot with them, are only imported
+    when the bot is started, so a web-only worker never pays for them.
+    """
+    loaded = sys.modules.get(module)
+    return get_stats(loaded) if loaded is not None else None
+
+def get_update_stats():
+    return _bot_stats('bot', lambda bot: bot.get_update_stats())
+
+def get_broadcast_stats():
+    return _bot_stats('broadcast', lambda broadcast: broadcast.broadcast_queue.get_stats())
+
+def get_rate_limiter_stats():
+    return _bot_stats('rate_limiter', lambda rate_limiter: rate_limiter.group_rate_limiter.get_stats())
+
+def _stats_gauge(name, documentation, get_stats):
+    """A gauge with one series per counter of a component's get_stats() dict."""
+    gauge = Gauge(name, documentation, ("stat",))
+    gauge.set_function(lambda: {(stat,): value for stat, value in (get_stats() or {}).items()})
+    return gauge
+
+_stats_gauge("bot_updates", "Update processor counters.", get_update_stats)
+_stats_gauge("bot_broadcasts", "Broadcast queue counters.", get_broadcast_stats)
+_stats_gauge("bot_rate_limiter", "Group rate limiter counters.", get_rate_limiter_stats)
+
+# Rendered bodies of cacheable responses: name -> (version, body, etag, last_modified)
+_response_cache = {}
+_response_cache_lock = threading.Lock()
+
+def _bot_token():
+    return os.getenv("TELEGRAM_BOT_TOKEN","7880135656:AAGzSy3FKl_AZd28Bvq1kC0pa9yeZWRxGu4")
+
+def get_bot_status():
+    """State of the bot as seen from this process, for the dashboard and /api/bot."""
+    lifecycle = sys.modules.get('lifecycle')
+    if lifecycle is not None:
+        status = lifecycle.bot_lifecycle.status()
+        if status['state'] != 'stopped':
+            return status
+    if leader_lock.held_elsewhere():
+        return {'state': 'other_process', 'holder': leader_lock.holder()}
+    return {'state': 'stopped'}
+
+def _bot_action(action):
+    """
+    Run a lifecycle action on the bot of this process.
+
+    Returns (status, None), or (None, reason) when the bot can't run here:
+    no token, or another process holds the leader lock.
+    """
+    token = _bot_token()
     if not token:
         logger.error("No bot token provided. Set the TELEGRAM_BOT_TOKEN environment variable.")
-        return
-        
-    try:
-        if bot_instance:
-            logger.info("Stopping existing bot instance")
-            asyncio.run(bot_instance.stop())
-            bot_instance = None
-            
-        bot_instance = create_bot(token)
-        logger.info("Bot instance created successfully")
-    except Exception as e:
-        logger.error(f"Failed to start bot: {e}")
-        return None
-    
-    # Start bot in a separate thread with proper thread name
-    bot_thread = threading.Thread(
-        target=run_bot, 
-        args=(bot_instance,), 
-        name="TelegramBotThread",
-        daemon=True
-    )
-    bot_thread.start()
+        return None, "No bot token provided"
     
-    # Give the bot some time to initialize
-    time.sleep(1)
+    # Another process may already run the bot; two pollers would take each other's updates
+    if not leader_lock.acquire():
+        holder = leader_lock.holder()
+        logger.info("The bot is running in another process (%s)", holder or "unknown")
+        return None, f"The bot is running in another process ({holder})" if holder else "The bot is running in another process"
     
-    return bot_instance
+    from lifecycle import bot_lifecycle
+    status = getattr(bot_lifecycle, action)(token)
+    if status['state'] != 'running':
+        # The bot failed to start; let another process try
+        leader_lock.release()
+    return status, None
+
+def start_bot():
+    """Start the bot in this process unless it is running; returns its status or None."""
+    status, _ = _bot_action('start')
+    return status
+
+def _cached_response(name, version, build, mimetype):
+    """
+    Serve a body that only changes when `version` changes.
+
+    The body is built once per version and served with an ETag and
+    Last-Modified, so a client polling unchanged data gets a 304 and
+    the data is not touched at all.
+    """
+    with _response_cache_lock:
+        entry = _response_cache.get(name)
+    
+    if entry is None or entry[0] != version:
+        body = build()
+        if isinstance(body, str):
+            body = body.encode('utf-8')
+        # The body hash stays valid across restarts, unlike the version counters
+        etag = hashlib.sha1(body).hexdigest()
+        last_modified = entry[3] if entry is not None and entry[2] == etag else \
+            datetime.now(timezone.utc).replace(microsecond=0)
+        entry = (version, body, etag, last_modified)
+        with _response_cache_lock:
+            _response_cache[name] = entry
+    
+    _, body, etag, last_modified = entry
+    response = Response(body, mimetype=mimetype)
+    response.set_etag(etag)
+    response.last_modified = last_modified
+    # Let browsers keep the body but revalidate it on every request
+    response.cache_control.no_cache = True
+    return response.make_conditional(request)
 
 # Routes for the web interface
 @app.route('/')
 def index():
     """Admin dashboard homepage."""
-    return render_template('index.html', 
-                          translator_count=len(get_translator_list()), 
-                          client_count=len(get_client_list()),
-                          group_name=GROUP_USERNAME)
+    bot_status = get_bot_status()
+    
+    def build():
+        stats = get_admin_stats()
+        return render_template('index.html', 
+                              translator_count=stats.translator_count, 
+                              client_count=stats.client_count,
+                              group_name=GROUP_USERNAME,
+                              bot_status=bot_status)
+    
+    version = (get_data_generation(), bot_status['state'], bot_status.get('error'))
+    return _cached_response('index', version, build, 'text/html')
+
+def _page_args():
+    """Read the sort order, cursor and page size of a listing request."""
+    try:
+        page_size = int(request.args.get('page_size', ADMIN_PAGE_SIZE))
+    except ValueError:
+        page_size = ADMIN_PAGE_SIZE
+    page_size = max(1, min(page_size, ADMIN_MAX_PAGE_SIZE))
+    return request.args.get('sort', 'user_id'), request.args.get('cursor') or None, page_size
+
+def _page_url(endpoint, cursor):
+    """URL of the same listing with the same filters at another cursor."""
+    args = request.args.to_dict()
+    args.pop('cursor', None)
+    if cursor:
+        args['cursor'] = cursor
+    return url_for(endpoint, **args)
 
 @app.route('/translators')
 def translators():
-    """View all translators."""
+    """View translators, one page at a time."""
     city_filter = request.args.get('city')
+    level_filter = request.args.get('min_level')
+    price_filter = request.args.get('max_price')
+    max_price = parse_price(price_filter) if price_filter else None
+    sort, cursor, page_size = _page_args()
     
-    if city_filter:
-        translators_list = get_translators_by_city(city_filter)
-    else:
-        translators_list = get_translator_list()
+    try:
+        translators_list, next_cursor = get_translator_page(
+            sort, cursor, page_size,
+            city=city_filter or None,
+            min_level=level_filter or None,
+            max_price=max_price
+        )
+    except ValueError as e:
+        abort(400, str(e))
         
     return render_template('translators.html', 
                           translators=translators_list,
-                          city_filter=city_filter)
+                          next_url=_page_url('translators', next_cursor) if next_cursor else None,
+                          first_url=_page_url('translators', None) if cursor else None,
+                          total_count=get_admin_stats().translator_count,
+                          sort=sort,
+                          page_size=page_size,
+                          city_filter=city_filter,
+                          level_filter=level_filter,
+                          price_filter=price_filter,
+                          levels=LANGUAGE_LEVELS)
 
 @app.route('/clients')
 def clients():
-    """View all clients."""
+    """View clients, one page at a time."""
     city_filter = request.args.get('city')
+    sort, cursor, page_size = _page_args()
     
-    if city_filter:
-        clients_list = get_clients_by_city(city_filter)
-    else:
-        clients_list = get_client_list()
+    try:
+        clients_list, next_cursor = get_client_page(sort, cursor, page_size, city=city_filter or None)
+    except ValueError as e:
+        abort(400, str(e))
         
     return render_template('clients.html', 
                           clients=clients_list,
+                          next_url=_page_url('clients', next_cursor) if next_cursor else None,
+                          first_url=_page_url('clients', None) if cursor else None,
+                          total_count=get_admin_stats().client_count,
+                          sort=sort,
+                          page_size=page_size,
                           city_filter=city_filter)
 
+def _request_rows(city, limit):
+    """Open client requests for display, with a readable creation time."""
+    rows = get_open_requests(city or None, limit)
+    for row in rows:
+        row['created_at'] = datetime.fromtimestamp(row.get('created', 0), timezone.utc).strftime('%Y-%m-%d %H:%M UTC')
+    return rows
+
+@app.route('/requests')
+def requests_page():
+    """View open client requests, newest first."""
+    city_filter = request.args.get('city')
+    counts = get_open_request_counts()
+    
+    return render_template('requests.html',
+                          requests=_request_rows(city_filter, ADMIN_MAX_PAGE_SIZE),
+                          city_counts=sorted(counts.items(), key=lambda item: -item[1]),
+                          total_count=sum(counts.values()),
+                          city_filter=city_filter)
+
+@app.route('/export/<kind>.<fmt>')
+def export(kind, fmt):
+    """Stream all translators or clients as CSV or NDJSON."""
+    if kind not in EXPORT_FIELDS or fmt not in ('csv', 'ndjson'):
+        abort(404)
+    
+    def generate_csv():
+        buffer = io.StringIO()
+        writer = csv.DictWriter(buffer, fieldnames=EXPORT_FIELDS[kind], extrasaction='ignore')
+        writer.writeheader()
+        for record in iter_records(kind):
+            writer.writerow(record)
+            if buffer.tell() >= 64 * 1024:
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+        yield buffer.getvalue()
+    
+    def generate_ndjson():
+        for record in iter_records(kind):
+            # Records are slotted objects; their stored form lacks the user_id key
+            yield json.dumps({'user_id': record.user_id, **record.to_dict()}, ensure_ascii=False) + "\n"
+    
+    if fmt == 'csv':
+        body, mimetype = generate_csv(), 'text/csv'
+    else:
+        body, mimetype = generate_ndjson(), 'application/x-ndjson'
+    
+    return Response(
+        stream_with_context(body),
+        mimetype=mimetype,
+        headers={'Content-Disposition': f'attachment; filename={kind}.{fmt}'}
+    )
+
 @app.route('/api/stats')
 def api_stats():
     """Return statistics as JSON for API consumers."""
+    rate_limiter_stats = get_rate_limiter_stats() or {}
+    broadcast_stats = get_broadcast_stats() or {}
+    update_stats = get_update_stats()
+    version = (
+        get_data_generation(),
+        tuple(rate_limiter_stats.values()),
+        tuple(broadcast_stats.values()),
+        tuple(update_stats.values()) if update_stats else None
+    )
+    
+    def build():
+        return json.dumps({
+            **get_admin_stats().as_dict(),
+            'rate_limiter': rate_limiter_stats,
+            'broadcasts': broadcast_stats,
+            'updates': update_stats
+        }, ensure_ascii=False)
+    
+    return _cached_response('api_stats', version, build, 'application/json')
+
+@app.route('/api/match')
+def api_match():
+    """Return the best translators for a client (client_id) or a city (city)."""
+    city = request.args.get('city')
+    client_id = request.args.get('client_id')
+    if not city and client_id:
+        try:
+            client_data = get_client_data(int(client_id))
+        except ValueError:
+            return jsonify({'status': 'error', 'message': 'Invalid client_id'}), 400
+        if client_data is None:
+            return jsonify({'status': 'error', 'message': 'Unknown client'}), 404
+        city = client_data.get('city')
+    if not city:
+        return jsonify({'status': 'error', 'message': 'Pass city or client_id'}), 400
+    
+    try:
+        k = max(1, min(int(request.args.get('k', MATCH_RESULTS)), MAX_MATCH_RESULTS))
+    except ValueError:
+        return jsonify({'status': 'error', 'message': 'Invalid k'}), 400
+    price_filter = request.args.get('max_price')
+    
+    try:
+        matches = match_translators(
+            city, k,
+            min_level=request.args.get('min_level') or None,
+            max_price=parse_price(price_filter) if price_filter else None
+        )
+    except ValueError as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 400
+    return jsonify({'city': city, 'matches': matches})
+
+@app.route('/api/requests')
+def api_requests():
+    """Return open client requests, newest first, optionally for one city."""
+    try:
+        limit = max(1, min(int(request.args.get('limit', ADMIN_PAGE_SIZE)), ADMIN_MAX_PAGE_SIZE))
+    except ValueError:
+        return jsonify({'status': 'error', 'message': 'Invalid limit'}), 400
+    
     return jsonify({
-        'translator_count': len(get_translator_list()),
-        'client_count': len(get_client_list()),
-        'cities': {
-            'translators': list(set(t.get('city', '') for t in get_translator_list())),
-            'clients': list(set(c.get('city', '') for c in get_client_list()))
-        }
+        'counts': get_open_request_counts(),
+        'requests': get_open_requests(request.args.get('city') or None, limit)
     })
 
+@app.route('/metrics')
+def metrics():
+    """Latency histograms and counters in the Prometheus text format."""
+    return Response(render_metrics(), mimetype='text/plain; version=0.0.4; charset=utf-8')
+
+@app.route(WEBHOOK_PATH, methods=['POST'])
+def telegram_webhook():
+    """Receive updates from Telegram when the bot runs in webhook mode."""
+    # Without a secret anyone could post forged updates, so no secret accepts nothing
+    received = request.headers.get('X-Telegram-Bot-Api-Secret-Token', '')
+    if not WEBHOOK_SECRET or not hmac.compare_digest(received.encode(), WEBHOOK_SECRET.encode()):
+        return jsonify({'status': 'error', 'message': 'Invalid secret token'}), 403
+    
+    payload = request.get_json(silent=True)
+    if not payload:
+        return jsonify({'status': 'error', 'message': 'Invalid update'}), 400
+    
+    # 503 makes Telegram keep the update and retry once the bot is up;
+    # the bot module is only loaded once the bot was started in this process
+    bot = sys.modules.get('bot')
+    if bot is None or not bot.submit_webhook_update(payload):
+        return jsonify({'status': 'error', 'message': 'Bot is not running'}), 503
+    
+    return jsonify({'status': 'ok'})
+
 @app.route('/start-bot', methods=['POST'])
 def start_bot_route():
     """Start the bot from the web interface."""
-    global bot_instance
-    
     # Always restart the bot even if it's already running
     # This ensures we get a clean start
-    start_bot_thread()
+    status, reason = _bot_action('restart')
+    if status is None:
+        return jsonify({'status': 'error', 'message': reason}), 409
+    if status['state'] != 'running':
+        return jsonify({'status': 'error', 'message': status['error'], 'bot': status}), 500
+    
+    return jsonify({'status': 'success', 'message': 'Bot started successfully', 'bot': status})
+
+@app.route('/stop-bot', methods=['POST'])
+def stop_bot_route():
+    """Stop the bot of this process after it finished the updates in flight."""
+    lifecycle = sys.modules.get('lifecycle')
+    if lifecycle is None:
+        return jsonify({'status': 'success', 'message': 'Bot is not running', 'bot': get_bot_status()})
+    
+    status = lifecycle.bot_lifecycle.stop()
+    if status['state'] != 'stopped':
+        # Keep the lock: the bot may still be polling after a failed stop
+        return jsonify({'status': 'error', 'message': status['error'], 'bot': status}), 500
+    leader_lock.release()
     
-    return jsonify({'status': 'success', 'message': 'Bot started successfully'})
+    return jsonify({'status': 'success', 'message': 'Bot stopped', 'bot': status})
+
+@app.route('/api/bot')
+def api_bot():
+    """Return the state of the bot."""
+    return jsonify(get_bot_status())
 
 def main():
     """Initialize and run the bot."""
@@ -134,14 +454,24 @@ def main():
         # The bot will be started by the '/start-bot' endpoint
         pass
     else:
-        # Running as script directly, just start the bot without Flask
-        start_bot_thread()
+        # Running as script directly, start the bot
+        status = start_bot()
+        if status is None or status['state'] != 'running':
+            return
+        
+        if BOT_MODE == "webhook":
+            # Updates arrive over HTTP at the webhook route, so this process serves the app too
+            logger.info("Serving the admin app and the webhook on port %s", PORT)
+            app.run(host="0.0.0.0", port=PORT, threaded=True)
+            return
         
+        # In polling mode the bot needs no web server
         try:
             # Keep the script running
             while True:
                 time.sleep(10)
         except KeyboardInterrupt:
+            # The lifecycle's exit handler stops the bot and writes pending data
             logger.info("Bot stopped by user")
 
 if __name__ == "__main__":
@@ -0,0 +1,144 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Ranked matching of translators to clients.
+"""
+
+import bisect
+import heapq
+import threading
+from typing import Any, Dict, Hashable, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+from cities import NEARBY_RADIUS_KM, city_key, city_name, nearby_cities, record_city_key
+from config import LANGUAGE_LEVELS
+from storage import MISSING_PRICE, parse_price
+
+# Higher is better; unknown levels rank below A1
+LEVEL_RANK = {level: rank for rank, level in enumerate(LANGUAGE_LEVELS)}
+
+
+class Match(NamedTuple):
+    """One ranked translator for a query."""
+    user_id: int
+    city: str  # Canonical name (or normalized text) of the translator's city
+    distance_km: float  # 0 in the client's own city
+    language_level: str
+    price: Optional[float]
+
+
+def _entry(user_id: Hashable, data: Dict[str, Any]) -> tuple:
+    """Sort key of a translator within its city: best level first, then cheapest."""
+    level = str(data.get('language_level', '')).upper()
+    price = parse_price(data.get('price'))
+    return (-LEVEL_RANK.get(level, -1), price if price is not None else MISSING_PRICE, user_id, level)
+
+
+class MatchEngine:
+    """
+    Translators grouped by city, each city's list kept sorted by level (best
+    first) and price (cheapest first).
+
+    A query takes the client's own city first and then the nearby cities,
+    merged by level and price. Level and price limits are applied with
+    bisect on each city's list, so a query only touches the translators it
+    returns, independent of how many are registered.
+    """
+
+    def __init__(self, nearby_radius_km: float = NEARBY_RADIUS_KM):
+        self.nearby_radius_km = nearby_radius_km
+        self._by_city: Dict[Hashable, List[tuple]] = {}  # City key (see cities.city_key) -> entries
+        self._placed: Dict[Hashable, Tuple[Hashable, tuple]] = {}  # User ID -> city key and entry
+        self._lock = threading.Lock()
+
+    # Updates
+    def _remove(self, user_id: Hashable) -> None:
+        placed = self._placed.pop(user_id, None)
+        if placed is None:
+            return
+        city, entry = placed
+        entries = self._by_city[city]
+        del entries[bisect.bisect_left(entries, entry)]
+        if not entries:
+            del self._by_city[city]
+
+    def translator_saved(self, user_id: Hashable, data: Optional[Dict[str, Any]]) -> None:
+        """Move a translator to the place of its record `data` (None if deleted)."""
+        with self._lock:
+            self._remove(user_id)
+            if data is not None:
+                city = record_city_key(data)
+                entry = _entry(user_id, data)
+                bisect.insort(self._by_city.setdefault(city, []), entry)
+                self._placed[user_id] = (city, entry)
+
+    def rebuild(self, translators: Iterable[Tuple[Hashable, Dict[str, Any]]]) -> None:
+        """Regroup all translators from (user_id, data) pairs, e.g. after loading."""
+        by_city: Dict[Hashable, List[tuple]] = {}
+        placed: Dict[Hashable, Tuple[Hashable, tuple]] = {}
+        for user_id, data in translators:
+            city = record_city_key(data)
+            entry = _entry(user_id, data)
+            by_city.setdefault(city, []).append(entry)
+            placed[user_id] = (city, entry)
+        for entries in by_city.values():
+            entries.sort()
+        with self._lock:
+            self._by_city = by_city
+            self._placed = placed
+
+    # Queries
+    @staticmethod
+    def _candidates(entries: List[tuple], city: Hashable, distance: float,
+                    min_rank: int, max_price: Optional[float]) -> Iterator[tuple]:
+        """(entry, city key, distance) for the entries of one city passing the limits, in rank order."""
+        if max_price is None:
+            for position in range(bisect.bisect_left(entries, (-min_rank + 1,))):
+                yield entries[position], city, distance
+            return
+        # The price limit cuts every level's block separately
+        start = 0
+        while start < len(entries):
+            neg_rank = entries[start][0]
+            if -neg_rank < min_rank:
+                return
+            block_end = bisect.bisect_left(entries, (neg_rank + 1,), start)
+            price_end = bisect.bisect_right(entries, (neg_rank, max_price, float('inf')), start, block_end)
+            for position in range(start, price_end):
+                yield entries[position], city, distance
+            start = block_end
+
+    def match(self, city: str, k: int = 5, min_level: Optional[str] = None,
+              max_price: Optional[float] = None) -> List[Match]:
+        """
+        The `k` best translators for a client in `city`: same city first,
+        then cities within the nearby radius, each by level and then price.
+        ValueError for a `min_level` not in LANGUAGE_LEVELS.
+        """
+        key = city_key(city)
+        if min_level and min_level.upper() not in LEVEL_RANK:
+            raise ValueError(f"Unknown language level: {min_level}")
+        min_rank = LEVEL_RANK[min_level.upper()] if min_level else -1
+        results: List[Match] = []
+
+        with self._lock:
+            tiers = [[(key, 0.0)], nearby_cities(key, self.nearby_radius_km)]
+            for tier in tiers:
+                streams = [
+                    self._candidates(self._by_city[other], other, distance, min_rank, max_price)
+                    for other, distance in tier if other in self._by_city
+                ]
+                if not streams:
+                    continue
+                merged = streams[0] if len(streams) == 1 else heapq.merge(*streams, key=lambda item: item[0])
+                for (_, price, user_id, level), other, distance in merged:
+                    results.append(Match(
+                        user_id=user_id,
+                        city=city_name(other),
+                        distance_km=round(distance, 1),
+                        language_level=level,
+                        price=price if price != MISSING_PRICE else None
+                    ))
+                    if len(results) >= k:
+                        return results
+        return results
@@ -0,0 +1,193 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Single-pass classification of group messages.
+
+Trigger phrases ("translator found", "need replacement"), spam keywords
+(English and Russian), links, mentions and phone numbers are all found
+by one precompiled regular expression over the casefolded text.
+The keywords are compiled into a prefix tree, so each position is checked
+against every keyword at once instead of one keyword after another.
+Uppercase letters are counted by a separate compiled character class,
+which stays in C instead of looping over characters in Python.
+"""
+
+import re
+import time
+from functools import lru_cache
+from typing import Dict, Iterable, NamedTuple, Optional
+
+from config import TRANSLATOR_FOUND_PHRASES, NEED_REPLACEMENT_PHRASES
+from metrics import SPAM_CHECK_SECONDS
+
+# Spam keywords, matched anywhere in the casefolded text
+SPAM_KEYWORDS = [
+    # English
+    "viagra", "cialis", "casino", "lottery", "lotteries", "winner", "prize", "money",
+    "bitcoin", "crypto", "get rich", "investment opportunity", "you've won",
+
+    # Russian
+    "казино", "лотерея", "лотереи", "лотерею", "выигрыш", "выиграл", "выиграть", "приз",
+    "деньги", "биткоин", "крипто", "крипта", "крипту", "крипте", "обогащение", "доход",
+    "разбогатей", "разбогатеть", "быстрый заработок", "заработок быстро", "заработать быстро",
+    "заработок онлайн", "заработай деньги", "заработаешь деньги", "заработать деньги",
+    "зарабатывай", "зарабатывать", "инвестици", "вложения", "выплата каждый день", "выплаты каждый день", "работа из дома", "удаленная работа",
+]
+
+# Thresholds
+MAX_UPPERCASE_RATIO = 0.7  # Share of uppercase characters above which a message is shouting
+MIN_UPPERCASE_LETTERS = 10  # Letters a message needs before it counts as shouting; "OK", "ДА", "B2" don't
+MAX_URLS = 3  # More Telegram links than this in one message is spam
+MAX_MENTIONS = 5  # More @mentions than this in one message is spam
+
+# Links to Telegram itself are allowed; any other link is spam
+ALLOWED_LINK_PREFIXES = ("http://t.me/", "https://t.me/")
+
+
+def keyword_pattern(words: Iterable[str]) -> str:
+    """Build a regex alternation of the words factored into a prefix tree."""
+    trie: Dict[str, dict] = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[""] = {}
+
+    def build(node: Dict[str, dict]) -> str:
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ""
+        pattern = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        # A word ends here too: the longer continuations are optional
+        return f"(?:{pattern})?" if "" in node else pattern
+
+    # No words: a pattern that never matches, rather than one matching everywhere
+    return build(trie) or "(?!)"
+
+
+def _first_chars(words: Iterable[str]) -> str:
+    return "".join(sorted({word[0] for word in words if word}))
+
+
+_UPPERCASE = re.compile("[A-ZÄÖÜА-ЯЁІЇЄҐ]")
+_LETTER = re.compile(r"[^\W\d_]")
+
+
+class MessageReport(NamedTuple):
+    """What the scan found in a message."""
+    found: bool  # Contains a "translator found" phrase
+    replacement: bool  # Contains a "need replacement" phrase
+    is_spam: bool
+    reason: Optional[str]  # keyword, link, phone, uppercase, urls or mentions
+    has_link: bool
+    url_count: int
+    mention_count: int
+    uppercase_ratio: float
+
+
+class MessageClassifier:
+    """One compiled scanner for the trigger phrases and all spam markers."""
+
+    def __init__(self, found_phrases: Iterable[str], replacement_phrases: Iterable[str],
+                 spam_keywords: Iterable[str] = SPAM_KEYWORDS):
+        found_phrases = [phrase.casefold() for phrase in found_phrases]
+        replacement_phrases = [phrase.casefold() for phrase in replacement_phrases]
+        spam_keywords = list(spam_keywords)
+        first_chars = _first_chars(found_phrases + replacement_phrases + spam_keywords) + "h@+"
+
+        self._keywords = re.compile(keyword_pattern(spam_keywords))
+        # The lookahead lets the regex engine skip positions that cannot start any match
+        self._scanner = re.compile(
+            "(?=[" + re.escape(first_chars) + "])"
+            "(?:(?P<found>" + keyword_pattern(found_phrases) + ")"
+            "|(?P<replacement>" + keyword_pattern(replacement_phrases) + ")"
+            "|(?P<keyword>" + keyword_pattern(spam_keywords) + ")"
+            r"|(?P<url>https?://\S+)"
+            r"|(?P<mention>@\w+)"
+            r"|(?P<phone>\+\d{9,}))"
+        )
+
+    def classify(self, text: str, stop_early: bool = False) -> MessageReport:
+        """
+        Scan a message once and report its trigger phrases and whether it is spam.
+        With `stop_early` the scan ends at the first spam match, so only
+        `is_spam` and `reason` are reliable.
+        """
+        length = max(1, len(text))
+        uppercase_ratio = len(_UPPERCASE.findall(text)) / length
+        # Letters are only counted for the few messages that are mostly uppercase
+        shouting = uppercase_ratio > MAX_UPPERCASE_RATIO and len(_LETTER.findall(text)) >= MIN_UPPERCASE_LETTERS
+        reason = "uppercase" if shouting else None
+        found = replacement = False
+        url_count = mention_count = 0
+
+        if reason is None or not stop_early:
+            for match in self._scanner.finditer(text.casefold()):
+                kind = match.lastgroup
+                if kind == "found":
+                    found = True
+                elif kind == "replacement":
+                    replacement = True
+                elif kind == "keyword":
+                    reason = reason or "keyword"
+                elif kind == "url":
+                    url_count += 1
+                    url = match.group()
+                    if not url.startswith(ALLOWED_LINK_PREFIXES):
+                        reason = reason or "link"
+                    elif self._keywords.search(url):
+                        reason = reason or "keyword"
+                    elif url_count > MAX_URLS:
+                        reason = reason or "urls"
+                elif kind == "mention":
+                    mention_count += 1
+                    if self._keywords.search(match.group()):
+                        reason = reason or "keyword"
+                    elif mention_count > MAX_MENTIONS:
+                        reason = reason or "mentions"
+                else:  # phone
+                    reason = reason or "phone"
+
+                if reason is not None and stop_early:
+                    break
+
+        return MessageReport(
+            found=found,
+            replacement=replacement,
+            is_spam=reason is not None,
+            reason=reason,
+            has_link=url_count > 0,
+            url_count=url_count,
+            mention_count=mention_count,
+            uppercase_ratio=uppercase_ratio
+        )
+
+
+# Built once from the configured phrases, shared by the handlers and the filters
+classifier = MessageClassifier(TRANSLATOR_FOUND_PHRASES, NEED_REPLACEMENT_PHRASES)
+
+
+@lru_cache(maxsize=256)
+def classify_message(text: str) -> MessageReport:
+    """
+    Full report for a message. Cached, so a spam filter and the text
+    handler looking at the same message scan it only once.
+    """
+    start = time.perf_counter()
+    report = classifier.classify(text)
+    SPAM_CHECK_SECONDS.observe(time.perf_counter() - start)
+    return report
+
+
+def scan_message(text: str, stop_early: bool = True) -> MessageReport:
+    """
+    Scan a message for spam.
+    With `stop_early` the scan ends at the first decisive match.
+    """
+    return classifier.classify(text, stop_early)
+
+
+def is_spam(text: str) -> bool:
+    """Return True if the message appears to be spam."""
+    return scan_message(text).is_spam
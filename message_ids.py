@@ -0,0 +1,81 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Message ids: the position of each message in a locale's message table.
+
+Every locale module (russian_messages, english_messages, ...) defines a
+template under each of these names; messages.py compiles them into tables
+ordered by id, so handlers look a message up with one index, e.g.
+`texts[SPAM_WARNING]`. New messages are appended with the next number.
+"""
+
+# Start
+START_MESSAGE = 0
+
+# Role selection
+TRANSLATOR_SELECTED = 1
+CLIENT_SELECTED = 2
+
+# Translator registration
+TRANSLATOR_CITY_PROMPT = 3
+TRANSLATOR_LEVEL_PROMPT = 4
+TRANSLATOR_LEVEL_INVALID = 5
+TRANSLATOR_PRICE_PROMPT = 6
+TRANSLATOR_PRICE_INVALID = 7
+TRANSLATOR_CONTACT_PROMPT = 8
+TRANSLATOR_REGISTRATION_COMPLETE = 9
+
+# Client registration
+CLIENT_VERIFICATION_PROMPT = 10
+CLIENT_SUSPICIOUS = 11
+CLIENT_REGISTRATION_COMPLETE = 12
+
+# Instructions
+TRANSLATOR_INSTRUCTIONS = 13
+CLIENT_INSTRUCTIONS = 14
+
+# General
+HELP_MESSAGE = 15
+HELP_ADMIN_COMMAND = 16
+CANCEL_MESSAGE = 17
+
+# Group interactions
+TRANSLATOR_FOUND_MESSAGE = 18
+SPAM_WARNING = 19
+TRANSLATOR_GROUP_RESTRICTION = 20
+REGISTRATION_REQUIRED = 21
+CLIENT_VERIFICATION_REQUIRED = 22
+ERROR_MESSAGE = 23
+ADMIN_NOT_ALLOWED = 24
+
+# Translator matching
+MATCH_USAGE = 25
+MATCH_HEADER = 26
+MATCH_LINE = 27
+MATCH_NEARBY = 28
+MATCH_NONE = 29
+
+# Open client requests
+OPEN_REQUESTS_HEADER = 30
+OPEN_REQUESTS_LINE = 31
+OPEN_REQUESTS_LINK = 32
+OPEN_REQUESTS_NONE = 33
+
+# Translator notifications
+NEW_REQUEST_NOTIFICATION = 34
+NEW_REQUEST_LINK = 35
+
+# Buttons
+TRANSLATOR_BUTTON = 36
+CLIENT_BUTTON = 37
+
+# Admin data summary
+ADMIN_SUMMARY = 38
+ADMIN_SUMMARY_PRICES = 39
+ADMIN_SUMMARY_TRANSLATOR_CITIES = 40
+ADMIN_SUMMARY_CLIENT_CITIES = 41
+ADMIN_SUMMARY_LEVELS = 42
+ADMIN_SUMMARY_SUSPICIOUS = 43
+ADMIN_SUMMARY_SUSPICIOUS_LINE = 44
+ADMIN_SUMMARY_MORE = 45
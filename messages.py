@@ -0,0 +1,156 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Message catalog: the bot's reply templates compiled into one table per locale.
+
+A table is a tuple of the locale's messages ordered by the ids in
+message_ids, so a lookup is a single index: `texts[SPAM_WARNING]`.
+Locale modules are imported and compiled on first use, so a locale
+nobody writes in costs nothing at startup.
+"""
+
+import importlib
+import logging
+import threading
+from functools import lru_cache
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from telegram import InlineKeyboardButton, InlineKeyboardMarkup
+
+import config
+import message_ids
+from message_ids import CLIENT_BUTTON, HELP_ADMIN_COMMAND, HELP_MESSAGE, TRANSLATOR_BUTTON
+
+logger = logging.getLogger(__name__)
+
+# Locale code (the language part of Telegram's language_code) and the module holding its templates
+LOCALE_MODULES = {
+    "ru": "russian_messages",
+    "uk": "ukrainian_messages",
+    "de": "german_messages",
+    "en": "english_messages",
+}
+# Locale whose text stands in for a message another locale module lacks
+FALLBACK_LOCALE = "en"
+
+# Message names in id order
+MESSAGE_NAMES = tuple(sorted(
+    (name for name in vars(message_ids) if name.isupper()),
+    key=lambda name: getattr(message_ids, name)
+))
+assert [getattr(message_ids, name) for name in MESSAGE_NAMES] == list(range(len(MESSAGE_NAMES))), \
+    "message ids must be numbered 0, 1, 2, ... without gaps"
+
+
+def default_locale() -> str:
+    """The locale of users whose language has no catalog; follows config.USE_RUSSIAN at call time."""
+    return "ru" if config.USE_RUSSIAN else "en"
+
+
+class MessageTable(tuple):
+    """
+    The compiled messages of one locale, indexed by message id. Also
+    carries the replies that never change, built once: the help texts
+    (`help[is_admin]`) and the /start keyboard.
+    """
+
+    def __new__(cls, code: str, texts: Tuple[str, ...], render: Callable[[str, int, Tuple], str]):
+        table = super().__new__(cls, texts)
+        table.code = code
+        table.help = (texts[HELP_MESSAGE].format(""), texts[HELP_MESSAGE].format(texts[HELP_ADMIN_COMMAND]))
+        # Keyboards are immutable once built, so one object serves every /start
+        table.start_keyboard = InlineKeyboardMarkup([[
+            InlineKeyboardButton(texts[TRANSLATOR_BUTTON], callback_data='translator'),
+            InlineKeyboardButton(texts[CLIENT_BUTTON], callback_data='client')
+        ]])
+        table._render = render
+        return table
+
+    def render(self, message_id: int, *args: Any) -> str:
+        """Template `message_id` formatted with `args` through the catalog's render cache."""
+        return self._render(self.code, message_id, args)
+
+
+class MessageCatalog:
+    """
+    The message tables of all locales and the locale of each user.
+
+    A user's locale comes from the language_code Telegram sends with
+    every update; codes without a catalog get the default locale. Tables
+    render templates through one LRU cache keyed by locale, message id and
+    arguments, so replies sent with the same arguments again and again
+    (a city name, a first name) are formatted once. Replies built from
+    free text such as a client's post should use texts[id].format(...)
+    instead, so they don't push useful entries out.
+    """
+
+    def __init__(self, locale_modules: Dict[str, str] = LOCALE_MODULES,
+                 cache_size: int = config.MESSAGE_CACHE_SIZE):
+        self._locale_modules = locale_modules
+        self._tables: Dict[str, MessageTable] = {}
+        self._languages: Dict[Optional[str], Optional[str]] = {}
+        self._lock = threading.RLock()
+        self._render = lru_cache(maxsize=cache_size)(self._format)
+
+    def table(self, code: Optional[str] = None) -> MessageTable:
+        """The table of locale `code`; the default locale's for None or a locale without a catalog."""
+        if code not in self._locale_modules:
+            code = default_locale()
+        table = self._tables.get(code)
+        if table is None:
+            table = self._load(code)
+        return table
+
+    def locale_for(self, language_code: Optional[str]) -> Optional[str]:
+        """The locale of a Telegram language_code such as "uk" or "de-AT"; None if it has no catalog."""
+        try:
+            return self._languages[language_code]
+        except KeyError:
+            pass
+        code = language_code.split("-")[0].lower() if language_code else None
+        locale = code if code in self._locale_modules else None
+        # Telegram sends a small set of IETF tags, so this stays small
+        self._languages[language_code] = locale
+        return locale
+
+    def for_user(self, user: Any) -> MessageTable:
+        """The table of a Telegram user's language."""
+        return self.table(self.locale_for(user.language_code) if user is not None else None)
+
+    def _load(self, code: str) -> MessageTable:
+        with self._lock:
+            table = self._tables.get(code)
+            if table is not None:
+                return table
+            module = importlib.import_module(self._locale_modules[code])
+            texts = []
+            missing = []
+            for message_id, name in enumerate(MESSAGE_NAMES):
+                text = getattr(module, name, None)
+                if text is None and code != FALLBACK_LOCALE:
+                    missing.append(name)
+                    text = self.table(FALLBACK_LOCALE)[message_id]
+                elif text is None:
+                    raise ValueError(f"Fallback locale {code} lacks message {name}")
+                texts.append(text)
+            if missing:
+                logger.warning("Locale %s lacks %s messages, using %s: %s",
+                               code, len(missing), FALLBACK_LOCALE, ", ".join(missing))
+            table = MessageTable(code, tuple(texts), self._render)
+            self._tables[code] = table
+            logger.debug("Compiled %s messages for locale %s", len(table), code)
+            return table
+
+    def _format(self, code: str, message_id: int, args: Tuple) -> str:
+        return self.table(code)[message_id].format(*args)
+
+    def cache_info(self):
+        return self._render.cache_info()
+
+    def clear_cache(self) -> None:
+        self._render.cache_clear()
+
+
+# The catalog used by the handlers
+catalog = MessageCatalog()
@@ -0,0 +1,164 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Latency histograms and gauges, exposed in the Prometheus text format.
+"""
+
+import bisect
+import functools
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+# Upper bounds in seconds, from a dict lookup to a slow Telegram API call
+DEFAULT_BUCKETS = (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# For in-process work that takes microseconds
+FAST_BUCKETS = (0.000005, 0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.005, 0.01)
+
+# Every metric, in registration order
+_registry: List[Any] = []
+
+
+def _escape(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names: Tuple[str, ...], values: Tuple[str, ...], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Histogram:
+    """
+    Observations counted into cumulative buckets, per combination of label
+    values. observe() is a bisect and three additions under a lock, cheap
+    enough for every update and store call.
+    """
+
+    def __init__(self, name: str, documentation: str, labels: Iterable[str] = (),
+                 buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        self.buckets = tuple(buckets)
+        # Label values -> [bucket counts..., sum, count]; buckets are stored non-cumulative
+        self._series: Dict[Tuple[str, ...], List[float]] = {}
+        self._lock = threading.Lock()
+        _registry.append(self)
+
+    def observe(self, value: float, *label_values: str) -> None:
+        position = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = [0] * (len(self.buckets) + 1) + [0.0, 0]
+            series[position] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def time(self, *label_values: str) -> "_Timer":
+        """Context manager observing the duration of its block."""
+        return _Timer(self, label_values)
+
+    def render(self) -> Iterable[str]:
+        yield f"# HELP {self.name} {self.documentation}"
+        yield f"# TYPE {self.name} histogram"
+        with self._lock:
+            series = {labels: list(values) for labels, values in self._series.items()}
+        for label_values, values in sorted(series.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), values):
+                cumulative += count
+                le = 'le="' + _format_value(bound) + '"'
+                yield f"{self.name}_bucket{_format_labels(self.labels, label_values, le)} {cumulative}"
+            labels = _format_labels(self.labels, label_values)
+            yield f"{self.name}_sum{labels} {_format_value(values[-2])}"
+            yield f"{self.name}_count{labels} {values[-1]}"
+
+
+class _Timer:
+    __slots__ = ("histogram", "label_values", "start")
+
+    def __init__(self, histogram: Histogram, label_values: Tuple[str, ...]):
+        self.histogram = histogram
+        self.label_values = label_values
+
+    def __enter__(self) -> "_Timer":
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.histogram.observe(time.perf_counter() - self.start, *self.label_values)
+
+
+class Gauge:
+    """A value read when the metrics are rendered, from set() or from a callback."""
+
+    def __init__(self, name: str, documentation: str, labels: Iterable[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._function: Optional[Callable[[], Dict[Tuple[str, ...], float]]] = None
+        _registry.append(self)
+
+    def set(self, value: float, *label_values: str) -> None:
+        self._values[label_values] = value
+
+    def set_function(self, function: Optional[Callable[[], Dict[Tuple[str, ...], float]]]) -> None:
+        """Read the values from `function` (label values -> value) at render time instead."""
+        self._function = function
+
+    def render(self) -> Iterable[str]:
+        values = self._function() if self._function is not None else dict(self._values)
+        yield f"# HELP {self.name} {self.documentation}"
+        yield f"# TYPE {self.name} gauge"
+        for label_values, value in sorted(values.items()):
+            yield f"{self.name}{_format_labels(self.labels, label_values)} {_format_value(value)}"
+
+
+def render_metrics() -> str:
+    """All registered metrics in the Prometheus text exposition format."""
+    lines = []
+    for metric in _registry:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+def timed_handler(callback: Callable) -> Callable:
+    """Wrap an async bot handler so each call is observed in HANDLER_SECONDS."""
+    name = callback.__name__
+
+    @functools.wraps(callback)
+    async def wrapper(*args: Any, **kwargs: Any) -> Any:
+        start = time.perf_counter()
+        try:
+            return await callback(*args, **kwargs)
+        finally:
+            HANDLER_SECONDS.observe(time.perf_counter() - start, name)
+
+    return wrapper
+
+
+# Bot metrics
+HANDLER_SECONDS = Histogram("bot_handler_seconds", "Time spent in each update handler.", ("handler",))
+UPDATE_SECONDS = Histogram("bot_update_seconds", "Time from taking an update to finishing all its handlers.")
+STORE_SECONDS = Histogram(
+    "bot_store_seconds", "Time spent in storage backend calls.", ("operation", "kind"), FAST_BUCKETS
+)
+SPAM_CHECK_SECONDS = Histogram(
+    "bot_spam_check_seconds", "Time spent classifying a group message.", (), FAST_BUCKETS
+)
+TELEGRAM_API_SECONDS = Histogram(
+    "bot_telegram_api_seconds", "Latency of Telegram Bot API requests.", ("method", "status")
+)
+UPDATE_QUEUE_DEPTH = Gauge("bot_update_queue_depth", "Updates received but not yet taken for processing.")
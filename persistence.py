@@ -0,0 +1,146 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Background writer that takes journal I/O off the bot's event loop.
+"""
+
+import asyncio
+import logging
+import queue
+import threading
+from concurrent.futures import Future
+from typing import Callable, Hashable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Queue markers
+_STOP = object()
+
+
+class _Barrier:
+    """Queue marker resolved once every record submitted before it is written."""
+
+    __slots__ = ("future",)
+
+    def __init__(self):
+        self.future = Future()
+
+
+class JournalWriter:
+    """
+    A dedicated thread that drains a bounded queue of journal records.
+
+    Records queued back to back for the same key are coalesced so only the
+    latest one is written, and every drained batch is written in one call.
+    """
+
+    def __init__(self, write_batch: Callable[[List[str]], None], max_queue: int = 10000, max_batch: int = 1000):
+        self._write_batch = write_batch
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._max_batch = max_batch
+        self._thread = None
+        self._start_lock = threading.Lock()
+        self.written = 0
+        self.coalesced = 0
+
+    def _ensure_started(self) -> None:
+        """Start the writer thread on first use."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._start_lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(
+                    target=self._run,
+                    name="JournalWriterThread",
+                    daemon=True
+                )
+                self._thread.start()
+
+    def submit(self, key: Hashable, line: str) -> None:
+        """
+        Queue a record for writing.
+        Blocks only when the queue is full, which applies backpressure to writers.
+        """
+        self._ensure_started()
+        self._queue.put((key, line))
+
+    def barrier(self) -> Future:
+        """Return a future that resolves once everything queued so far is written."""
+        self._ensure_started()
+        marker = _Barrier()
+        self._queue.put(marker)
+        return marker.future
+
+    async def wait(self) -> None:
+        """Await from the event loop until everything queued so far is written."""
+        await asyncio.wrap_future(self.barrier())
+
+    def flush(self, timeout: Optional[float] = None) -> None:
+        """Block until everything queued so far is written."""
+        if self._thread is None or not self._thread.is_alive():
+            return
+        self.barrier().result(timeout)
+
+    def close(self, timeout: Optional[float] = None) -> None:
+        """Write everything still queued and stop the writer thread."""
+        if self._thread is None or not self._thread.is_alive():
+            return
+        self._queue.put(_STOP)
+        self._thread.join(timeout)
+
+    def pending(self) -> int:
+        """Approximate number of queued records."""
+        return self._queue.qsize()
+
+    def _run(self) -> None:
+        """
+        Writer loop: drain, coalesce, write, resolve barriers. Records of a
+        failed write are retried with the next batch, and the barriers
+        queued with them fail, so no barrier resolves while an earlier
+        record is unwritten.
+        """
+        unwritten = {}
+        while True:
+            batch = [self._queue.get()]
+            while len(batch) < self._max_batch:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            records, unwritten = unwritten, {}
+            barriers = []
+            stop = False
+            for item in batch:
+                if item is _STOP:
+                    stop = True
+                elif isinstance(item, _Barrier):
+                    barriers.append(item)
+                else:
+                    key, line = item
+                    if key in records:
+                        self.coalesced += 1
+                    records[key] = line
+
+            error = None
+            if records:
+                try:
+                    self._write_batch(list(records.values()))
+                    self.written += len(records)
+                except Exception as e:
+                    logger.error("Error writing journal batch of %s records, retrying with the next: %s",
+                                 len(records), e)
+                    error = e
+                    unwritten = records
+
+            for marker in barriers:
+                if error is None:
+                    marker.future.set_result(None)
+                else:
+                    marker.future.set_exception(error)
+
+            if stop:
+                if unwritten:
+                    logger.error("Stopping with %s journal records unwritten", len(unwritten))
+                return
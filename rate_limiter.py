@@ -0,0 +1,149 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Token bucket rate limiting: per-user limits on group messages
+(config.MAX_MESSAGES_PER_MINUTE) and the send limits of the broadcast queue.
+"""
+
+import logging
+import threading
+import time
+from typing import Callable, Dict, Hashable, List, Set
+
+from telegram import Update
+from telegram.ext import ApplicationHandlerStop, ContextTypes
+
+from config import MAX_MESSAGES_PER_MINUTE
+
+logger = logging.getLogger(__name__)
+
+
+class _Bucket:
+    """Token bucket state for one (chat_id, user_id)."""
+
+    __slots__ = ("tokens", "updated")
+
+    def __init__(self, tokens: float, updated: float):
+        self.tokens = tokens
+        self.updated = updated
+
+
+class RateLimiter:
+    """
+    Token bucket limiter keyed by (chat_id, user_id).
+
+    A bucket holds up to `capacity` tokens and refills at `capacity` per
+    `period` seconds. Once a bucket is full again it carries no state, so
+    it is evicted. Eviction uses a timing wheel with one-second slots: each
+    bucket sits in the slot of the time it refills completely, and every
+    advance only visits the slots that have come due. Memory stays
+    proportional to the number of senders active in the last `period`.
+    """
+
+    def __init__(self, capacity: int, period: float = 60.0, clock: Callable[[], float] = time.monotonic):
+        self.capacity = capacity
+        self.rate = capacity / period
+        self.clock = clock
+
+        self._buckets: Dict[Hashable, _Bucket] = {}
+        # One slot per second of the refill period, plus one so a slot is never reused early
+        self._wheel: List[Set[Hashable]] = [set() for _ in range(int(period) + 2)]
+        self._wheel_position = int(clock())
+        self._lock = threading.Lock()
+
+        # Counters
+        self.allowed = 0
+        self.throttled = 0
+        self.evicted = 0
+
+    def _schedule(self, key: Hashable, bucket: _Bucket) -> None:
+        """Put the key in the wheel slot of the second its bucket is full again."""
+        refill_at = bucket.updated + (self.capacity - bucket.tokens) / self.rate
+        slot = max(int(refill_at) + 1, self._wheel_position + 1)
+        self._wheel[slot % len(self._wheel)].add(key)
+
+    def _advance(self, now: float) -> None:
+        """Evict buckets whose slots have come due."""
+        target = int(now)
+        if target - self._wheel_position >= len(self._wheel):
+            # Idle for longer than a whole turn: every slot is due
+            self._wheel_position = target - len(self._wheel) + 1
+
+        while self._wheel_position < target:
+            self._wheel_position += 1
+            slot = self._wheel[self._wheel_position % len(self._wheel)]
+            if not slot:
+                continue
+            due = list(slot)
+            slot.clear()
+            for key in due:
+                bucket = self._buckets.get(key)
+                if bucket is None:
+                    continue
+                tokens = bucket.tokens + (now - bucket.updated) * self.rate
+                if tokens >= self.capacity:
+                    del self._buckets[key]
+                    self.evicted += 1
+                else:
+                    # Used again since it was scheduled; move it to its new slot
+                    self._schedule(key, bucket)
+
+    def allow(self, key: Hashable) -> bool:
+        """Take a token for `key`; return False if the sender is over the limit."""
+        with self._lock:
+            now = self.clock()
+            self._advance(now)
+
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = self._buckets[key] = _Bucket(self.capacity, now)
+                self._schedule(key, bucket)
+            else:
+                bucket.tokens = min(self.capacity, bucket.tokens + (now - bucket.updated) * self.rate)
+                bucket.updated = now
+
+            if bucket.tokens >= 1:
+                bucket.tokens -= 1
+                self.allowed += 1
+                return True
+
+            self.throttled += 1
+            return False
+
+    def wait_time(self, key: Hashable) -> float:
+        """Seconds until `key` has a token again (0 if it has one now); takes nothing."""
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                return 0.0
+            tokens = bucket.tokens + (self.clock() - bucket.updated) * self.rate
+            return 0.0 if tokens >= 1 else (1 - tokens) / self.rate
+
+    def get_stats(self) -> Dict[str, int]:
+        """Counters for monitoring."""
+        with self._lock:
+            return {
+                "allowed": self.allowed,
+                "throttled": self.throttled,
+                "evicted": self.evicted,
+                "active_senders": len(self._buckets),
+            }
+
+
+# Shared limiter for all group chats
+group_rate_limiter = RateLimiter(MAX_MESSAGES_PER_MINUTE)
+
+
+async def rate_limit_check(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    """
+    Runs before all other handlers; stops further processing of the update
+    when its sender is over the limit in this chat.
+    """
+    if not update.effective_user or not update.effective_chat:
+        return
+
+    key = (update.effective_chat.id, update.effective_user.id)
+    if not group_rate_limiter.allow(key):
+        logger.debug("Throttled message from user %s in chat %s", key[1], key[0])
+        raise ApplicationHandlerStop
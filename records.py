@@ -0,0 +1,182 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Compact in-memory record types for translators, clients and users.
+"""
+
+import sys
+from collections.abc import Mapping
+from typing import Any, Dict, Hashable, Iterator, Optional
+
+from config import LANGUAGE_LEVELS
+
+# Canonical level and user type strings; records refer to these objects instead of own copies
+LEVELS = {level: level for level in LANGUAGE_LEVELS}
+USER_TYPES = {user_type: user_type for user_type in ("translator", "client")}
+
+
+def intern_level(level: Any) -> str:
+    """The shared string object for a language level."""
+    return LEVELS.get(level) or LEVELS.get(str(level).upper()) or sys.intern(str(level).upper())
+
+
+def intern_user_type(user_type: Any) -> Any:
+    """The shared string object for a user type."""
+    if not isinstance(user_type, str):
+        return user_type
+    return USER_TYPES.get(user_type) or sys.intern(user_type)
+
+
+def intern_locale(locale: Optional[str]) -> Optional[str]:
+    """The shared string object for a message locale code such as "uk"."""
+    return None if locale is None else sys.intern(str(locale))
+
+
+def parse_price(price: Any) -> Optional[float]:
+    """Parse a price such as "25", "25,5" or "25€" into a number."""
+    if price is None or isinstance(price, float):
+        return price
+    if isinstance(price, int):
+        return float(price)
+    try:
+        return float(str(price).replace('€', '').replace(',', '.').strip())
+    except ValueError:
+        return None
+
+
+def format_price(price: Any) -> str:
+    """Display form of a price: 25.0 -> "25", 25.5 -> "25.5"."""
+    if isinstance(price, float):
+        return f"{price:g}"
+    return '' if price is None else str(price)
+
+
+class Record(Mapping):
+    """
+    Base of the slotted record types.
+
+    A record is a read-only mapping of its fields that are set, so
+    `record.get('city')`, `record['user_id']` and `{**record}` work as with
+    the plain dicts records used to be. Fields not known to the type are
+    kept in `extra`, which stays None for almost every record. Records are
+    replaced on save, never changed in place.
+    """
+
+    __slots__ = ("user_id", "extra")
+    FIELDS = ()
+
+    @classmethod
+    def from_dict(cls, user_id: Hashable, data: Any) -> "Record":
+        """A record from its stored or submitted dict form; records are returned as is."""
+        if type(data) is not dict:
+            if isinstance(data, cls):
+                return data
+            data = dict(data)
+        if 'user_id' in data:
+            data = dict(data)
+            del data['user_id']
+        return cls(user_id, **data)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """The stored form, without user_id (it is the record's key)."""
+        data = {name: getattr(self, name) for name in self.FIELDS if getattr(self, name) is not None}
+        if self.extra:
+            data.update(self.extra)
+        return data
+
+    # Mapping interface
+    def __getitem__(self, key: str) -> Any:
+        if key == 'user_id' or key in self.FIELDS:
+            value = getattr(self, key)
+            if value is not None:
+                return value
+        elif self.extra and key in self.extra:
+            return self.extra[key]
+        raise KeyError(key)
+
+    # Mapping.get and __contains__ go through __getitem__ and a KeyError for
+    # every missing field; loading and indexing call them for each record
+    def get(self, key: str, default: Any = None) -> Any:
+        if key == 'user_id' or key in self.FIELDS:
+            value = getattr(self, key)
+            return default if value is None else value
+        if self.extra:
+            return self.extra.get(key, default)
+        return default
+
+    def __contains__(self, key: Any) -> bool:
+        return self.get(key) is not None or bool(self.extra) and key in self.extra
+
+    def __iter__(self) -> Iterator[str]:
+        yield 'user_id'
+        for name in self.FIELDS:
+            if getattr(self, name) is not None:
+                yield name
+        if self.extra:
+            yield from self.extra
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.user_id!r}, {self.to_dict()!r})"
+
+
+class Translator(Record):
+    """A registered translator; the price is a number (None if it couldn't be parsed)."""
+
+    __slots__ = ("name", "city", "city_id", "language_level", "price", "contact", "locale")
+    FIELDS = __slots__
+
+    def __init__(self, user_id: Hashable, name: Optional[str] = None, city: Optional[str] = None,
+                 city_id: Optional[int] = None, language_level: Optional[str] = None,
+                 price: Any = None, contact: Optional[str] = None, locale: Optional[str] = None,
+                 **extra: Any):
+        self.user_id = user_id
+        self.name = name
+        self.city = None if city is None else sys.intern(str(city))
+        self.city_id = city_id
+        self.language_level = None if language_level is None else intern_level(language_level)
+        self.price = parse_price(price)
+        self.contact = contact
+        self.locale = intern_locale(locale)
+        self.extra = extra or None
+
+
+class Client(Record):
+    """A registered client."""
+
+    __slots__ = ("city", "city_id", "service_needed", "registration_complete", "locale")
+    FIELDS = __slots__
+
+    def __init__(self, user_id: Hashable, city: Optional[str] = None, city_id: Optional[int] = None,
+                 service_needed: Optional[str] = None, registration_complete: Optional[bool] = None,
+                 locale: Optional[str] = None, **extra: Any):
+        self.user_id = user_id
+        self.city = None if city is None else sys.intern(str(city))
+        self.city_id = city_id
+        self.service_needed = service_needed
+        self.registration_complete = registration_complete
+        self.locale = intern_locale(locale)
+        self.extra = extra or None
+
+
+RECORD_TYPES = {"translators": Translator, "clients": Client}
+
+
+def from_stored(kind: str, key: Hashable, value: Any) -> Any:
+    """The in-memory form of a stored value of `kind`."""
+    record_type = RECORD_TYPES.get(kind)
+    if record_type is not None and value is not None:
+        return record_type.from_dict(key, value)
+    if kind == "users":
+        return intern_user_type(value)
+    return value
+
+
+def to_stored(value: Any) -> Any:
+    """JSON encoder hook: the stored form of a record."""
+    if isinstance(value, Record):
+        return value.to_dict()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
@@ -0,0 +1,124 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Index of the client requests posted in the group that are still open.
+"""
+
+import itertools
+import threading
+from typing import Any, Dict, Hashable, Iterable, List, Optional, Tuple
+
+from cities import city_key, record_city_key, record_city_name
+
+# Request states
+OPEN = "open"
+FULFILLED = "fulfilled"  # The client marked it found
+CLOSED = "closed"  # Closed as stale
+
+
+def request_key(chat_id: int, message_id: int) -> str:
+    """Store key of the request posted as message `message_id` in chat `chat_id`."""
+    return f"{chat_id}:{message_id}"
+
+
+class RequestTracker:
+    """
+    Open requests in posting order, indexed by city key and by user.
+
+    Request records themselves live in the data store and are never
+    removed; a finished request is saved again with its new status and
+    dropped from this index. Every lookup touches only the requests it
+    returns: the newest ones of a city, one user's open requests, or the
+    oldest open requests when closing stale ones.
+    """
+
+    def __init__(self):
+        self._open: Dict[str, Dict[str, Any]] = {}  # Key -> record, oldest first
+        self._by_city: Dict[Hashable, Dict[str, None]] = {}  # City key -> keys, oldest first
+        self._by_user: Dict[int, Dict[str, None]] = {}  # User ID -> keys, oldest first
+        self._lock = threading.Lock()
+
+    # Updates
+    @staticmethod
+    def _add_to(index: Dict[Hashable, Dict[str, None]], group: Hashable, key: str) -> None:
+        index.setdefault(group, {})[key] = None
+
+    @staticmethod
+    def _remove_from(index: Dict[Hashable, Dict[str, None]], group: Hashable, key: str) -> None:
+        keys = index.get(group)
+        if keys is not None:
+            keys.pop(key, None)
+            if not keys:
+                del index[group]
+
+    def _discard(self, key: str) -> None:
+        record = self._open.pop(key, None)
+        if record is not None:
+            self._remove_from(self._by_city, record_city_key(record), key)
+            self._remove_from(self._by_user, record.get('user_id'), key)
+
+    def request_saved(self, key: str, record: Optional[Dict[str, Any]]) -> None:
+        """Index a new request or drop one that is no longer open (None if deleted)."""
+        with self._lock:
+            self._discard(key)
+            if record is not None and record.get('status') == OPEN:
+                self._open[key] = record
+                self._add_to(self._by_city, record_city_key(record), key)
+                self._add_to(self._by_user, record.get('user_id'), key)
+
+    def rebuild(self, requests: Iterable[Tuple[str, Dict[str, Any]]]) -> None:
+        """Index the open requests among (key, record) pairs, e.g. after loading."""
+        open_requests = sorted(
+            ((key, record) for key, record in requests if record.get('status') == OPEN),
+            key=lambda item: item[1].get('created', 0)
+        )
+        with self._lock:
+            self._open, self._by_city, self._by_user = {}, {}, {}
+            for key, record in open_requests:
+                self._open[key] = record
+                self._add_to(self._by_city, record_city_key(record), key)
+                self._add_to(self._by_user, record.get('user_id'), key)
+
+    # Queries
+    def open_requests(self, city: Optional[str] = None, limit: Optional[int] = None) -> List[Tuple[str, Dict[str, Any]]]:
+        """Open requests, newest first, optionally only those of one city."""
+        with self._lock:
+            keys = self._open if city is None else self._by_city.get(city_key(city), {})
+            return [(key, self._open[key]) for key in itertools.islice(reversed(keys), limit)]
+
+    def user_requests(self, user_id: int, chat_id: Optional[int] = None) -> List[str]:
+        """Keys of a user's open requests, optionally only those posted in one chat."""
+        with self._lock:
+            return [
+                key for key in self._by_user.get(user_id, ())
+                if chat_id is None or self._open[key].get('chat_id') == chat_id
+            ]
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """The record of an open request."""
+        with self._lock:
+            return self._open.get(key)
+
+    def stale(self, created_before: float, limit: int) -> List[str]:
+        """Keys of up to `limit` oldest open requests posted before `created_before`."""
+        with self._lock:
+            stale = []
+            for key, record in self._open.items():
+                if record.get('created', 0) >= created_before or len(stale) >= limit:
+                    break
+                stale.append(key)
+            return stale
+
+    def city_counts(self) -> Dict[str, int]:
+        """Number of open requests per city, by canonical city name."""
+        with self._lock:
+            counts: Dict[str, int] = {}
+            for keys in self._by_city.values():
+                name = record_city_name(self._open[next(iter(keys))])
+                counts[name] = counts.get(name, 0) + len(keys)
+            return counts
+
+    def open_count(self) -> int:
+        with self._lock:
+            return len(self._open)
@@ -148,6 +148,7 @@ HELP_MESSAGE = """
 /start - Зарегистрироваться как переводчик или клиент
 /help - Показать это сообщение помощи
 /found - Отметить, что вы нашли переводчика
+/match - Подобрать переводчиков в вашем городе (или: /match Берлин); переводчикам — открытые запросы клиентов
 /cancel - Отменить текущую операцию
 
 {}
@@ -206,6 +207,67 @@ ADMIN_NOT_ALLOWED = """
 Извините, эта команда доступна только администраторам.
 """
 
+# Подбор переводчиков
+MATCH_USAGE = """
+Укажите город, например: /match Берлин
+Зарегистрированные клиенты могут просто отправить /match, чтобы искать в своём городе.
+"""
+
+MATCH_HEADER = "🔎 Подходящие переводчики для города {}:"
+
+MATCH_LINE = "{}. {} — {}, уровень {}, {}€/час, контакт: {}"
+
+MATCH_NEARBY = " ({} км от вас)"
+
+MATCH_NONE = "К сожалению, в городе {} и поблизости пока нет подходящих переводчиков."
+
+# Открытые запросы клиентов
+OPEN_REQUESTS_HEADER = "📋 Открытые запросы клиентов в городе {}:"
+
+OPEN_REQUESTS_LINE = "{}. {}"
+
+OPEN_REQUESTS_LINK = " — {}"
+
+OPEN_REQUESTS_NONE = "Сейчас в городе {} нет открытых запросов клиентов."
+
+# Уведомления переводчиков
+NEW_REQUEST_NOTIFICATION = "📢 Новый запрос клиента в городе {}:\n\n{}"
+
+NEW_REQUEST_LINK = "\n\nСообщение в группе: {}"
+
+# Сводка данных для администратора
+ADMIN_SUMMARY = """📊 *Сводка данных администратора*
+
+Всего переводчиков: {}
+Всего клиентов: {}
+Соотношение переводчиков/клиентов: {:.2f}
+
+*Верификация клиентов:*
+• Подтверждённых клиентов: {}
+• Неподтверждённых клиентов: {}
+• Подозрительных верификаций: {}
+
+"""
+
+ADMIN_SUMMARY_PRICES = """*Информация о ценах:*
+• Средняя цена: {:.2f}€
+• Минимальная цена: {:.2f}€
+• Максимальная цена: {:.2f}€
+
+"""
+
+ADMIN_SUMMARY_TRANSLATOR_CITIES = "*Переводчики по городам:*\n"
+
+ADMIN_SUMMARY_CLIENT_CITIES = "\n*Клиенты по городам:*\n"
+
+ADMIN_SUMMARY_LEVELS = "\n*Уровни немецкого у переводчиков:*\n"
+
+ADMIN_SUMMARY_SUSPICIOUS = "\n*Подозрительные верификации клиентов:*\n"
+
+ADMIN_SUMMARY_SUSPICIOUS_LINE = "• Пользователь {} из {} - \"{}\"\n"
+
+ADMIN_SUMMARY_MORE = "... и ещё {}\n"
+
 # Кнопки
 TRANSLATOR_BUTTON = "Переводчик 🗣️"
 CLIENT_BUTTON = "Клиент 👤"
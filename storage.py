@@ -0,0 +1,1081 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Storage backends behind the data_manager API.
+
+Every backend stores records as (kind, key) -> value. The "users",
+"translators" and "clients" kinds are the bot's core data; any other kind
+is stored generically. Translators and clients are held as the slotted
+record types of records.py and converted to dicts only when written.
+"""
+
+import bisect
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Hashable, Iterable, Iterator, List, Optional, Tuple
+
+from cities import city_key, city_name, normalize_city, record_city_key
+from config import LANGUAGE_LEVELS
+from metrics import STORE_SECONDS
+from persistence import JournalWriter
+from records import from_stored, parse_price, to_stored
+
+logger = logging.getLogger(__name__)
+
+CORE_KINDS = ("users", "translators", "clients")
+
+# Bump when cities.py changes how names resolve, so SQL backends recompute city_norm
+# and data_manager rechecks stored city ids. 2: stricter fuzzy matching
+CITY_KEY_VERSION = 2
+
+
+def levels_from(min_level: Optional[str]) -> List[str]:
+    """Return the language levels at or above `min_level`; ValueError for an unknown level."""
+    if not min_level:
+        return list(LANGUAGE_LEVELS)
+    min_level = min_level.upper()
+    if min_level not in LANGUAGE_LEVELS:
+        raise ValueError(f"Unknown language level: {min_level}")
+    return LANGUAGE_LEVELS[LANGUAGE_LEVELS.index(min_level):]
+
+
+# Sort value of translators without a valid price, so they come last
+MISSING_PRICE = 1e308
+
+# Sort orders for paginated listings; level names sort alphabetically in level order
+SORT_FIELDS = {
+    "translators": ("user_id", "city", "level", "price"),
+    "clients": ("user_id", "city"),
+}
+
+
+def city_text(key: Hashable) -> str:
+    """Text form of a city key: the normalized canonical name of a known city."""
+    return normalize_city(city_name(key))
+
+
+def sort_value(sort: str, data: Dict[str, Any]) -> Any:
+    """The value a record is ordered by for a listing sort order."""
+    if sort == "city":
+        return city_text(record_city_key(data))
+    if sort == "level":
+        return str(data.get('language_level', '')).upper()
+    if sort == "price":
+        price = parse_price(data.get('price'))
+        return price if price is not None else MISSING_PRICE
+    return 0  # user_id: the tie-breaker alone decides
+
+
+def _parse_key(key: str) -> Hashable:
+    """Restore a key from a JSON object key; user IDs are stored as integers."""
+    try:
+        return int(key)
+    except ValueError:
+        return key
+
+
+class RecordIndex:
+    """
+    Secondary indexes over one kind of records: city key -> user IDs,
+    language level -> user IDs and a sorted (price, user_id) list.
+    """
+
+    def __init__(self, with_level: bool = False, with_price: bool = False):
+        self.by_city = {}
+        self.by_level = {} if with_level else None
+        self.prices = [] if with_price else None
+        # Sort order -> sorted (sort_value, user_id) list, built on first use
+        self.sorted_views: Dict[str, List[tuple]] = {}
+
+    @staticmethod
+    def _add_to(index: Dict[str, set], key: str, user_id: Hashable) -> None:
+        ids = index.get(key)
+        if ids is None:
+            ids = index[key] = set()
+        ids.add(user_id)
+
+    @staticmethod
+    def _remove_from(index: Dict[str, set], key: str, user_id: Hashable) -> None:
+        ids = index.get(key)
+        if ids is not None:
+            ids.discard(user_id)
+            if not ids:
+                del index[key]
+
+    def add(self, user_id: Hashable, data: Dict[str, Any]) -> None:
+        self._add_to(self.by_city, record_city_key(data), user_id)
+        if self.by_level is not None:
+            self._add_to(self.by_level, str(data.get('language_level', '')).upper(), user_id)
+        if self.prices is not None:
+            price = parse_price(data.get('price'))
+            if price is not None:
+                bisect.insort(self.prices, (price, user_id))
+        for sort, view in self.sorted_views.items():
+            bisect.insort(view, (sort_value(sort, data), user_id))
+
+    def remove(self, user_id: Hashable, data: Dict[str, Any]) -> None:
+        self._remove_from(self.by_city, record_city_key(data), user_id)
+        if self.by_level is not None:
+            self._remove_from(self.by_level, str(data.get('language_level', '')).upper(), user_id)
+        if self.prices is not None:
+            price = parse_price(data.get('price'))
+            if price is not None:
+                position = bisect.bisect_left(self.prices, (price, user_id))
+                if position < len(self.prices) and self.prices[position] == (price, user_id):
+                    del self.prices[position]
+        for sort, view in self.sorted_views.items():
+            entry = (sort_value(sort, data), user_id)
+            position = bisect.bisect_left(view, entry)
+            if position < len(view) and view[position] == entry:
+                del view[position]
+
+    def rebuild(self, records: Dict[Hashable, Dict[str, Any]]) -> None:
+        """Rebuild all indexes from scratch, sorting the price list once."""
+        prices = self.prices
+        self.prices = None
+        self.sorted_views = {}
+        self.by_city = {}
+        if self.by_level is not None:
+            self.by_level = {}
+        for user_id, data in records.items():
+            self.add(user_id, data)
+        if prices is not None:
+            self.prices = sorted(
+                (price, user_id)
+                for user_id, price in ((uid, parse_price(d.get('price'))) for uid, d in records.items())
+                if price is not None
+            )
+
+    def city_ids(self, city: str) -> set:
+        return self.by_city.get(city_key(city), set())
+
+    def level_ids(self, min_level: Optional[str]) -> List[set]:
+        return [self.by_level[level] for level in levels_from(min_level) if level in self.by_level]
+
+    def price_count(self, max_price: float) -> int:
+        """Number of records with a price <= max_price."""
+        return bisect.bisect_right(self.prices, (max_price, float('inf')))
+
+    def sorted_view(self, sort: str, records: Dict[Hashable, Dict[str, Any]]) -> List[tuple]:
+        """All records as a sorted (sort_value, user_id) list, kept up to date once built."""
+        view = self.sorted_views.get(sort)
+        if view is None:
+            view = self.sorted_views[sort] = sorted(
+                (sort_value(sort, data), user_id) for user_id, data in records.items()
+            )
+        return view
+
+
+class ChangeTracker:
+    """
+    Per-kind generation counters, incremented by every put and delete.
+
+    A reader that remembers the generation of the kinds it depends on can
+    tell in O(1) whether anything changed since, e.g. to revalidate an
+    HTTP cache.
+    """
+
+    def __init__(self):
+        self._generations: Dict[str, int] = {}
+        self._generation_lock = threading.Lock()
+
+    def _changed(self, kind: str) -> int:
+        with self._generation_lock:
+            generation = self._generations[kind] = self._generations.get(kind, 0) + 1
+            return generation
+
+    def generation(self, *kinds: str) -> int:
+        """Number of changes to the given kinds (all kinds if none given)."""
+        with self._generation_lock:
+            if not kinds:
+                return sum(self._generations.values())
+            return sum(self._generations.get(kind, 0) for kind in kinds)
+
+    def changes(self, kind: str, since: int) -> Optional[Tuple[int, List[Tuple[Hashable, Any]], List[Hashable]]]:
+        """
+        The records of `kind` saved and the keys deleted after generation
+        `since`, with the generation they bring a reader up to; None if the
+        backend does not track changes per record.
+        """
+        return None
+
+
+class JsonStore(ChangeTracker):
+    """
+    In-memory dicts persisted as JSON snapshot files plus an append-only journal.
+
+    Each mutation is appended to the journal as a single line by a background
+    writer thread. Once the journal passes `compact_bytes` it is rotated and
+    the snapshot files are rewritten in a background thread.
+    """
+
+    def __init__(self, data_dir: str, compact_bytes: int = 4 * 1024 * 1024, queue_size: int = 10000):
+        super().__init__()
+        self.data_dir = data_dir
+        # While a compaction is running the previous journal is kept as journal_file + ".1"
+        self.journal_file = os.path.join(data_dir, "journal.log")
+        self.compact_bytes = compact_bytes
+
+        self._data = {kind: {} for kind in CORE_KINDS}
+        self._indexes = {
+            "translators": RecordIndex(with_level=True, with_price=True),
+            "clients": RecordIndex(),
+        }
+        # Guards the indexes, which the bot and the admin web app use from different threads
+        self._index_lock = threading.Lock()
+        self._journal = None
+        self._journal_lock = threading.Lock()
+        self._compaction_thread = None
+        self._writer = JournalWriter(self._write_journal_lines, max_queue=queue_size)
+
+        os.makedirs(data_dir, exist_ok=True)
+
+    def _snapshot_file(self, kind: str) -> str:
+        return os.path.join(self.data_dir, f"{kind}.json")
+
+    def _collection(self, kind: str) -> Dict[Hashable, Any]:
+        collection = self._data.get(kind)
+        if collection is None:
+            collection = self._data.setdefault(kind, {})
+        return collection
+
+    # Loading
+    def load(self) -> None:
+        """Load the snapshot files and replay the journal on top of them."""
+        for name in os.listdir(self.data_dir):
+            if not name.endswith(".json"):
+                continue
+            kind = name[:-len(".json")]
+            try:
+                with open(os.path.join(self.data_dir, name), 'r', encoding='utf-8') as f:
+                    self._data[kind] = {
+                        key: from_stored(kind, key, value)
+                        for key, value in ((_parse_key(k), v) for k, v in json.load(f).items())
+                    }
+            except (json.JSONDecodeError, IOError) as e:
+                logger.error("Error loading data: %s", e)
+
+        try:
+            # An interrupted compaction leaves the older journal behind; replay it first
+            replayed = self._replay_journal(self.journal_file + ".1")
+            replayed += self._replay_journal(self.journal_file)
+            if replayed:
+                logger.info("Replayed %s journal records", replayed)
+        except IOError as e:
+            logger.error("Error replaying journal: %s", e)
+
+        with self._index_lock:
+            for kind, index in self._indexes.items():
+                index.rebuild(self._collection(kind))
+
+    def _replay_journal(self, path: str) -> int:
+        """Apply all records of a journal file to the in-memory dicts."""
+        if not os.path.exists(path):
+            return 0
+
+        applied = 0
+        with open(path, 'r', encoding='utf-8') as f:
+            for line_number, line in enumerate(f, 1):
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    record = json.loads(line)
+                    kind = record["t"]
+                    collection = self._collection(kind)
+                    key = record["k"]
+                    if isinstance(key, list):
+                        key = tuple(key)
+                    if record.get("d"):
+                        collection.pop(key, None)
+                    else:
+                        collection[key] = from_stored(kind, key, record["v"])
+                    applied += 1
+                except (json.JSONDecodeError, KeyError, TypeError, ValueError) as e:
+                    # A torn last line after a crash is expected; skip it and keep going
+                    logger.warning("Skipping bad journal record %s:%s: %s", path, line_number, e)
+        return applied
+
+    # Journal
+    def _write_journal_lines(self, lines: List[str]) -> None:
+        """Append a batch of journal lines; runs on the journal writer thread."""
+        with self._journal_lock:
+            if self._journal is None:
+                self._journal = open(self.journal_file, 'a', encoding='utf-8')
+            self._journal.write("".join(lines))
+            self._journal.flush()
+
+            if self._journal.tell() >= self.compact_bytes:
+                self._start_compaction()
+
+    def _append_journal(self, kind: str, key: Hashable, value: Any, deleted: bool = False) -> None:
+        """Queue a single mutation for the journal writer thread."""
+        record = {"t": kind, "k": key, "v": value}
+        if deleted:
+            record["d"] = True
+        line = json.dumps(record, ensure_ascii=False, default=to_stored) + "\n"
+        self._writer.submit((kind, key), line)
+
+    # Compaction
+    def _write_snapshot(self, data: Dict[Hashable, Any], path: str) -> None:
+        """Atomically replace a snapshot file with the given data."""
+        tmp_path = path + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({str(k): v for k, v in data.items()}, f, ensure_ascii=False, indent=4, default=to_stored)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+
+    def _rotate_journal(self) -> Optional[List[Tuple[Dict, str]]]:
+        """
+        Move the current journal aside and copy the dicts for a snapshot.
+        Must be called with the journal lock held.
+        Returns the (data, path) pairs to write, or None if a compaction is pending.
+        """
+        old_journal = self.journal_file + ".1"
+        if os.path.exists(old_journal):
+            return None
+
+        if self._journal is not None:
+            self._journal.close()
+            self._journal = None
+        if os.path.exists(self.journal_file):
+            os.replace(self.journal_file, old_journal)
+
+        # Shallow copies are enough: records are replaced, never mutated in place
+        return [(dict(data), self._snapshot_file(kind)) for kind, data in list(self._data.items())]
+
+    def _finish_compaction(self, snapshots: List[Tuple[Dict, str]]) -> None:
+        """Write the snapshots and drop the journal they cover."""
+        try:
+            for data, path in snapshots:
+                self._write_snapshot(data, path)
+            old_journal = self.journal_file + ".1"
+            if os.path.exists(old_journal):
+                os.remove(old_journal)
+            logger.debug("Journal compacted into snapshot files")
+        except IOError as e:
+            logger.error("Error compacting journal: %s", e)
+
+    def _start_compaction(self) -> None:
+        """Rotate the journal and write the snapshot in a background thread."""
+        if self._compaction_thread is not None and self._compaction_thread.is_alive():
+            return
+
+        snapshots = self._rotate_journal()
+        if snapshots is None:
+            return
+
+        self._compaction_thread = threading.Thread(
+            target=self._finish_compaction,
+            args=(snapshots,),
+            name="JournalCompactionThread",
+            daemon=True
+        )
+        self._compaction_thread.start()
+
+    def checkpoint(self) -> None:
+        """Write full snapshots of all data and truncate the journal."""
+        self._writer.flush()
+        try:
+            with self._journal_lock:
+                if self._compaction_thread is not None:
+                    self._compaction_thread.join()
+                    self._compaction_thread = None
+                snapshots = self._rotate_journal()
+                if snapshots is None:
+                    # Leftover from an interrupted compaction; it is already replayed in memory
+                    os.remove(self.journal_file + ".1")
+                    snapshots = self._rotate_journal()
+                self._finish_compaction(snapshots)
+        except IOError as e:
+            logger.error("Error saving data: %s", e)
+
+    async def wait(self) -> None:
+        """Wait, without blocking the event loop, until all queued saves are on disk."""
+        await self._writer.wait()
+
+    def close(self, timeout: Optional[float] = None) -> None:
+        """Block until all queued saves are on disk and stop the writer thread."""
+        self._writer.close(timeout)
+        if self._compaction_thread is not None:
+            self._compaction_thread.join(timeout)
+
+    # Records
+    def put(self, kind: str, key: Hashable, value: Any) -> int:
+        """Store a record; returns the new generation of `kind`."""
+        value = from_stored(kind, key, value)
+        collection = self._collection(kind)
+        index = self._indexes.get(kind)
+        if index is not None:
+            with self._index_lock:
+                old_value = collection.get(key)
+                if old_value is not None:
+                    index.remove(key, old_value)
+                index.add(key, value)
+                collection[key] = value
+        else:
+            collection[key] = value
+        generation = self._changed(kind)
+        self._append_journal(kind, key, value)
+        return generation
+
+    def delete(self, kind: str, key: Hashable) -> Optional[int]:
+        collection = self._collection(kind)
+        index = self._indexes.get(kind)
+        with self._index_lock:
+            old_value = collection.pop(key, None)
+            if old_value is not None and index is not None:
+                index.remove(key, old_value)
+        if old_value is not None:
+            generation = self._changed(kind)
+            self._append_journal(kind, key, None, deleted=True)
+            return generation
+        return None
+
+    def write_many(self, changes: List[Tuple[str, Hashable, Any]]) -> None:
+        """Save (kind, key, value) changes; a value of None deletes the record."""
+        for kind, key, value in changes:
+            if value is None:
+                self.delete(kind, key)
+            else:
+                self.put(kind, key, value)
+
+    def get(self, kind: str, key: Hashable) -> Any:
+        return self._collection(kind).get(key)
+
+    def items(self, kind: str) -> Iterator[Tuple[Hashable, Any]]:
+        return iter(list(self._collection(kind).items()))
+
+    def count(self, kind: str) -> int:
+        return len(self._collection(kind))
+
+    def by_city(self, kind: str, city: str) -> Iterator[Tuple[Hashable, Dict[str, Any]]]:
+        collection = self._collection(kind)
+        with self._index_lock:
+            ids = sorted(self._indexes[kind].city_ids(city))
+        return ((user_id, collection[user_id]) for user_id in ids if user_id in collection)
+
+    def find_translators(self, city: Optional[str] = None, min_level: Optional[str] = None,
+                         max_price: Optional[float] = None) -> List[Tuple[Hashable, Dict[str, Any]]]:
+        """
+        Translators matching all given filters, cheapest first.
+        Scans only the most selective index, so the cost follows the result size.
+        """
+        translators = self._collection("translators")
+        index = self._indexes["translators"]
+        wanted_levels = set(levels_from(min_level))
+
+        with self._index_lock:
+            # (size, ids) for each filter in use; only the smallest is materialized
+            candidates = []
+            if city is not None:
+                city_ids = index.city_ids(city)
+                candidates.append((len(city_ids), lambda: list(city_ids)))
+            if min_level is not None:
+                level_sets = index.level_ids(min_level)
+                candidates.append((
+                    sum(len(ids) for ids in level_sets),
+                    lambda: [user_id for ids in level_sets for user_id in ids]
+                ))
+            if max_price is not None:
+                count = index.price_count(max_price)
+                candidates.append((count, lambda: [user_id for _, user_id in index.prices[:count]]))
+
+            if candidates:
+                ids = min(candidates, key=lambda candidate: candidate[0])[1]()
+            else:
+                ids = list(translators)
+
+        wanted_city = city_key(city) if city is not None else None
+        results = []
+        for user_id in ids:
+            data = translators.get(user_id)
+            if data is None:
+                continue
+            price = parse_price(data.get('price'))
+            if wanted_city is not None and record_city_key(data) != wanted_city:
+                continue
+            if min_level is not None and str(data.get('language_level', '')).upper() not in wanted_levels:
+                continue
+            if max_price is not None and (price is None or price > max_price):
+                continue
+            results.append((price if price is not None else float('inf'), user_id, data))
+
+        results.sort(key=lambda result: (result[0], result[1]))
+        return [(user_id, data) for _, user_id, data in results]
+
+    def page(self, kind: str, sort: str = "user_id", after: Optional[tuple] = None, limit: int = 50,
+             city: Optional[str] = None, min_level: Optional[str] = None,
+             max_price: Optional[float] = None) -> List[Tuple[Hashable, Dict[str, Any]]]:
+        """
+        One page of records ordered by (sort value, user_id), starting after
+        the `after` position of the previous page (keyset pagination).
+        """
+        collection = self._collection(kind)
+        index = self._indexes[kind]
+        wanted_levels = set(levels_from(min_level)) if min_level else None
+
+        results = []
+        with self._index_lock:
+            if city is not None:
+                entries = sorted(
+                    (sort_value(sort, collection[user_id]), user_id)
+                    for user_id in index.city_ids(city) if user_id in collection
+                )
+            else:
+                entries = index.sorted_view(sort, collection)
+
+            position = bisect.bisect_right(entries, tuple(after)) if after else 0
+            while position < len(entries) and len(results) < limit:
+                _, user_id = entries[position]
+                position += 1
+                data = collection.get(user_id)
+                if data is None:
+                    continue
+                if wanted_levels is not None and str(data.get('language_level', '')).upper() not in wanted_levels:
+                    continue
+                if max_price is not None:
+                    price = parse_price(data.get('price'))
+                    if price is None or price > max_price:
+                        continue
+                results.append((user_id, data))
+        return results
+
+
+class SQLiteStore(ChangeTracker):
+    """
+    SQLite database in WAL mode, so the admin web app and the bot thread can
+    read while the other one writes.
+
+    Each thread gets its own connection. Writes commit immediately; with
+    synchronous=NORMAL a WAL commit is an append without an fsync.
+
+    The generation counters live in the database and are bumped in the
+    transaction of each write, so every process sharing the database sees
+    the changes of the others. Each row carries the generation of its last
+    write and deleted keys are kept in deletions, so a process can read
+    just the records the others changed (see changes()).
+    """
+
+    placeholder = "?"
+
+    SCHEMA = (
+        """CREATE TABLE IF NOT EXISTS users (
+            user_id BIGINT PRIMARY KEY,
+            user_type TEXT NOT NULL
+        )""",
+        """CREATE TABLE IF NOT EXISTS translators (
+            user_id BIGINT PRIMARY KEY,
+            city_norm TEXT NOT NULL,
+            language_level TEXT NOT NULL,
+            price REAL,
+            data TEXT NOT NULL,
+            generation BIGINT NOT NULL DEFAULT 0
+        )""",
+        "CREATE INDEX IF NOT EXISTS translators_city ON translators (city_norm, user_id)",
+        "CREATE INDEX IF NOT EXISTS translators_level ON translators (language_level, user_id)",
+        "CREATE INDEX IF NOT EXISTS translators_price ON translators (price, user_id)",
+        """CREATE TABLE IF NOT EXISTS clients (
+            user_id BIGINT PRIMARY KEY,
+            city_norm TEXT NOT NULL,
+            data TEXT NOT NULL,
+            generation BIGINT NOT NULL DEFAULT 0
+        )""",
+        "CREATE INDEX IF NOT EXISTS clients_city ON clients (city_norm, user_id)",
+        """CREATE TABLE IF NOT EXISTS records (
+            kind TEXT NOT NULL,
+            key TEXT NOT NULL,
+            value TEXT NOT NULL,
+            generation BIGINT NOT NULL DEFAULT 0,
+            PRIMARY KEY (kind, key)
+        )""",
+        """CREATE TABLE IF NOT EXISTS generations (
+            kind TEXT PRIMARY KEY,
+            generation BIGINT NOT NULL
+        )""",
+        """CREATE TABLE IF NOT EXISTS deletions (
+            kind TEXT NOT NULL,
+            key TEXT NOT NULL,
+            generation BIGINT NOT NULL,
+            PRIMARY KEY (kind, key)
+        )""",
+        "CREATE INDEX IF NOT EXISTS deletions_generation ON deletions (kind, generation)",
+    )
+
+    # Tables whose rows carry the generation of their last write, added to databases
+    # created before; the indexes are created once the column exists
+    CHANGE_TRACKED = ("translators", "clients", "records")
+    CHANGE_INDEXES = (
+        "CREATE INDEX IF NOT EXISTS translators_generation ON translators (generation)",
+        "CREATE INDEX IF NOT EXISTS clients_generation ON clients (generation)",
+        "CREATE INDEX IF NOT EXISTS records_generation ON records (kind, generation)",
+    )
+
+    def __init__(self, database: str):
+        super().__init__()
+        self.database = database
+        self._local = threading.local()
+
+    def _connect(self):
+        directory = os.path.dirname(self.database)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        connection = sqlite3.connect(self.database, timeout=30)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        return connection
+
+    @property
+    def _connection(self):
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = self._connect()
+            self._local.connection = connection
+        return connection
+
+    def _sql(self, statement: str) -> str:
+        if self.placeholder == "?":
+            return statement
+        return statement.replace("?", self.placeholder)
+
+    def _execute(self, statement: str, params: tuple = ()):
+        cursor = self._connection.cursor()
+        cursor.execute(self._sql(statement), params)
+        return cursor
+
+    @contextmanager
+    def _transaction(self):
+        """A cursor whose statements commit together on leaving the block, or roll back on an error."""
+        connection = self._connection
+        cursor = connection.cursor()
+        try:
+            yield cursor
+        except BaseException:
+            connection.rollback()
+            raise
+        connection.commit()
+
+    def _bump(self, cursor, kind: str) -> int:
+        """Increment the generation of `kind` in the current transaction; returns the new value."""
+        cursor.execute(self._sql(
+            "INSERT INTO generations (kind, generation) VALUES (?, 1) "
+            "ON CONFLICT (kind) DO UPDATE SET generation = generations.generation + 1 "
+            "RETURNING generation"
+        ), (kind,))
+        return cursor.fetchone()[0]
+
+    def _write(self, kind: str, statements: Callable[[int], Iterable[Tuple[str, tuple]]]) -> int:
+        """
+        Bump the generation of `kind` and execute `statements(generation)` in
+        the same transaction; returns the new generation.
+        """
+        with self._transaction() as cursor:
+            generation = self._bump(cursor, kind)
+            for statement, params in statements(generation):
+                cursor.execute(self._sql(statement), params)
+        return generation
+
+    def generation(self, *kinds: str) -> int:
+        """Number of changes to the given kinds (all kinds if none given), by any process."""
+        if not kinds:
+            row = self._execute("SELECT SUM(generation) FROM generations").fetchone()
+        else:
+            row = self._execute(
+                f"SELECT SUM(generation) FROM generations WHERE kind IN ({', '.join('?' for _ in kinds)})",
+                kinds
+            ).fetchone()
+        return row[0] or 0
+
+    def changes(self, kind: str, since: int) -> Optional[Tuple[int, List[Tuple[Hashable, Any]], List[Hashable]]]:
+        """
+        The records of `kind` saved and the keys deleted after generation
+        `since`, up to the generation returned; None for users, whose rows
+        carry no generation, and if the generation went back (a restored
+        database).
+
+        A generation is read only once its transaction committed, and the
+        generation row lock orders the commits, so every write up to it is
+        visible. A record saved again since is returned by the next call.
+        """
+        if kind == "users":
+            return None
+        generation = self.generation(kind)
+        if generation < since:
+            return None
+        if generation == since:
+            return generation, [], []
+        deleted = [
+            self._decode_key(key) for (key,) in self._execute(
+                "SELECT key FROM deletions WHERE kind = ? AND generation > ? AND generation <= ?",
+                (kind, since, generation)
+            )
+        ]
+        if kind in CORE_KINDS:
+            cursor = self._execute(
+                f"SELECT user_id, data FROM {kind} WHERE generation > ? AND generation <= ? ORDER BY generation",
+                (since, generation)
+            )
+            changed = [(user_id, self._decode(kind, user_id, data)) for user_id, data in cursor]
+        else:
+            cursor = self._execute(
+                "SELECT key, value FROM records WHERE kind = ? AND generation > ? AND generation <= ? "
+                "ORDER BY generation",
+                (kind, since, generation)
+            )
+            changed = [(self._decode_key(key), json.loads(value)) for key, value in cursor]
+        return generation, changed, deleted
+
+    # Lifecycle
+    def load(self) -> None:
+        """Create the schema if needed and bring the city keys up to date."""
+        with self._transaction() as cursor:
+            for statement in self.SCHEMA:
+                cursor.execute(statement)
+            for table in self.CHANGE_TRACKED:
+                if "generation" not in self._columns(table):
+                    cursor.execute(f"ALTER TABLE {table} ADD COLUMN generation BIGINT NOT NULL DEFAULT 0")
+                    logger.info("Added the generation column to %s", table)
+            for statement in self.CHANGE_INDEXES:
+                cursor.execute(statement)
+
+        if self.get("meta", "city_key_version") != CITY_KEY_VERSION:
+            self._rekey_cities()
+            self.put("meta", "city_key_version", CITY_KEY_VERSION)
+
+    def _columns(self, table: str) -> set:
+        return {row[1] for row in self._execute(f"PRAGMA table_info({table})")}
+
+    def _rekey_cities(self) -> None:
+        """Recompute city_norm for every row, e.g. after the city aliases changed."""
+        with self._transaction() as cursor:
+            for kind in ("translators", "clients"):
+                rows = self._execute(f"SELECT user_id, data FROM {kind}").fetchall()
+                cursor.executemany(
+                    self._sql(f"UPDATE {kind} SET city_norm = ? WHERE user_id = ?"),
+                    [(city_text(record_city_key(self._decode(kind, user_id, data))), user_id) for user_id, data in rows]
+                )
+                logger.info("Recomputed city keys of %s %s", len(rows), kind)
+
+    def checkpoint(self) -> None:
+        """Fold the WAL back into the main database file."""
+        self._execute("PRAGMA wal_checkpoint(TRUNCATE)")
+
+    async def wait(self) -> None:
+        """Writes are committed synchronously; nothing is ever pending."""
+
+    def close(self, timeout: Optional[float] = None) -> None:
+        connection = getattr(self._local, "connection", None)
+        if connection is not None:
+            connection.close()
+            self._local.connection = None
+
+    # Row mapping
+    def _row_params(self, kind: str, key: Hashable, value: Any, generation: int) -> Tuple[str, tuple]:
+        """Return the upsert statement and its parameters for a record written in `generation`."""
+        if kind == "users":
+            return (
+                "INSERT INTO users (user_id, user_type) VALUES (?, ?) "
+                "ON CONFLICT (user_id) DO UPDATE SET user_type = excluded.user_type",
+                (key, value)
+            )
+        if kind == "translators":
+            return (
+                "INSERT INTO translators (user_id, city_norm, language_level, price, data, generation) "
+                "VALUES (?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT (user_id) DO UPDATE SET city_norm = excluded.city_norm, "
+                "language_level = excluded.language_level, price = excluded.price, data = excluded.data, "
+                "generation = excluded.generation",
+                (
+                    key,
+                    city_text(record_city_key(value)),
+                    str(value.get('language_level', '')).upper(),
+                    parse_price(value.get('price')),
+                    json.dumps(value, ensure_ascii=False, default=to_stored),
+                    generation
+                )
+            )
+        if kind == "clients":
+            return (
+                "INSERT INTO clients (user_id, city_norm, data, generation) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT (user_id) DO UPDATE SET city_norm = excluded.city_norm, data = excluded.data, "
+                "generation = excluded.generation",
+                (
+                    key,
+                    city_text(record_city_key(value)),
+                    json.dumps(value, ensure_ascii=False, default=to_stored),
+                    generation
+                )
+            )
+        return (
+            "INSERT INTO records (kind, key, value, generation) VALUES (?, ?, ?, ?) "
+            "ON CONFLICT (kind, key) DO UPDATE SET value = excluded.value, generation = excluded.generation",
+            (kind, json.dumps(key), json.dumps(value, ensure_ascii=False), generation)
+        )
+
+    @staticmethod
+    def _decode(kind: str, key: Hashable, value: str) -> Any:
+        return from_stored(kind, key, json.loads(value))
+
+    @staticmethod
+    def _decode_key(key: str) -> Hashable:
+        key = json.loads(key)
+        return tuple(key) if isinstance(key, list) else key
+
+    # Records
+    def put(self, kind: str, key: Hashable, value: Any) -> int:
+        """Store a record; returns the new generation of `kind`."""
+        return self._write(kind, lambda generation: [self._row_params(kind, key, value, generation)])
+
+    def put_many(self, kind: str, records: List[Tuple[Hashable, Any]]) -> None:
+        """Insert many records in a single transaction."""
+        if not records:
+            return
+        with self._transaction() as cursor:
+            generation = self._bump(cursor, kind)
+            statement = self._row_params(kind, *records[0], generation)[0]
+            cursor.executemany(
+                self._sql(statement),
+                [self._row_params(kind, key, value, generation)[1] for key, value in records]
+            )
+
+    def delete(self, kind: str, key: Hashable) -> int:
+        """Delete a record; its key stays in deletions, for readers of changes()."""
+        return self._write(kind, lambda generation: self._delete_statements(kind, key, generation))
+
+    @staticmethod
+    def _delete_statements(kind: str, key: Hashable, generation: int) -> List[Tuple[str, tuple]]:
+        if kind in CORE_KINDS:
+            statement = (f"DELETE FROM {kind} WHERE user_id = ?", (key,))
+        else:
+            statement = ("DELETE FROM records WHERE kind = ? AND key = ?", (kind, json.dumps(key)))
+        return [statement, (
+            "INSERT INTO deletions (kind, key, generation) VALUES (?, ?, ?) "
+            "ON CONFLICT (kind, key) DO UPDATE SET generation = excluded.generation",
+            (kind, json.dumps(key), generation)
+        )]
+
+    def write_many(self, changes: List[Tuple[str, Hashable, Any]]) -> None:
+        """
+        Save (kind, key, value) changes in a single transaction; a value of
+        None deletes the record. Each kind's generation is bumped once.
+        """
+        if not changes:
+            return
+        with self._transaction() as cursor:
+            generations: Dict[str, int] = {}
+            for kind, key, value in changes:
+                if kind not in generations:
+                    generations[kind] = self._bump(cursor, kind)
+                if value is None:
+                    statements = self._delete_statements(kind, key, generations[kind])
+                else:
+                    statements = [self._row_params(kind, key, value, generations[kind])]
+                for statement, params in statements:
+                    cursor.execute(self._sql(statement), params)
+
+    def get(self, kind: str, key: Hashable) -> Any:
+        if kind == "users":
+            row = self._execute("SELECT user_type FROM users WHERE user_id = ?", (key,)).fetchone()
+            return from_stored(kind, key, row[0]) if row else None
+        if kind in CORE_KINDS:
+            row = self._execute(f"SELECT data FROM {kind} WHERE user_id = ?", (key,)).fetchone()
+        else:
+            row = self._execute(
+                "SELECT value FROM records WHERE kind = ? AND key = ?", (kind, json.dumps(key))
+            ).fetchone()
+        return self._decode(kind, key, row[0]) if row else None
+
+    def items(self, kind: str) -> Iterator[Tuple[Hashable, Any]]:
+        if kind == "users":
+            rows = self._execute("SELECT user_id, user_type FROM users").fetchall()
+            return ((user_id, from_stored(kind, user_id, user_type)) for user_id, user_type in rows)
+        if kind in CORE_KINDS:
+            cursor = self._execute(f"SELECT user_id, data FROM {kind} ORDER BY user_id")
+            return ((user_id, self._decode(kind, user_id, data)) for user_id, data in cursor)
+        cursor = self._execute("SELECT key, value FROM records WHERE kind = ?", (kind,))
+        return ((self._decode_key(key), json.loads(value)) for key, value in cursor)
+
+    def count(self, kind: str) -> int:
+        if kind in CORE_KINDS:
+            return self._execute(f"SELECT COUNT(*) FROM {kind}").fetchone()[0]
+        return self._execute("SELECT COUNT(*) FROM records WHERE kind = ?", (kind,)).fetchone()[0]
+
+    def by_city(self, kind: str, city: str) -> Iterator[Tuple[Hashable, Dict[str, Any]]]:
+        cursor = self._execute(
+            f"SELECT user_id, data FROM {kind} WHERE city_norm = ? ORDER BY user_id",
+            (city_text(city_key(city)),)
+        )
+        return ((user_id, self._decode(kind, user_id, data)) for user_id, data in cursor)
+
+    def find_translators(self, city: Optional[str] = None, min_level: Optional[str] = None,
+                         max_price: Optional[float] = None) -> List[Tuple[Hashable, Dict[str, Any]]]:
+        """Translators matching all given filters, cheapest first."""
+        conditions = []
+        params = []
+        if city is not None:
+            conditions.append("city_norm = ?")
+            params.append(city_text(city_key(city)))
+        if min_level is not None:
+            levels = levels_from(min_level)
+            conditions.append(f"language_level IN ({', '.join('?' for _ in levels)})")
+            params.extend(levels)
+        if max_price is not None:
+            conditions.append("price <= ?")
+            params.append(max_price)
+
+        where = f" WHERE {' AND '.join(conditions)}" if conditions else ""
+        cursor = self._execute(
+            f"SELECT user_id, data FROM translators{where} ORDER BY price IS NULL, price, user_id",
+            tuple(params)
+        )
+        return [(user_id, self._decode("translators", user_id, data)) for user_id, data in cursor]
+
+
+    SORT_EXPRESSIONS = {
+        "user_id": "0",
+        "city": "city_norm",
+        "level": "language_level",
+        "price": f"COALESCE(price, {MISSING_PRICE!r})",
+    }
+
+    def page(self, kind: str, sort: str = "user_id", after: Optional[tuple] = None, limit: int = 50,
+             city: Optional[str] = None, min_level: Optional[str] = None,
+             max_price: Optional[float] = None) -> List[Tuple[Hashable, Dict[str, Any]]]:
+        """
+        One page of records ordered by (sort value, user_id), starting after
+        the `after` position of the previous page (keyset pagination).
+        """
+        expression = self.SORT_EXPRESSIONS[sort]
+        conditions = []
+        params = []
+        if after:
+            if sort == "user_id":
+                conditions.append("user_id > ?")
+                params.append(after[1])
+            else:
+                conditions.append(f"({expression}, user_id) > (?, ?)")
+                params.extend(after)
+        if city is not None:
+            conditions.append("city_norm = ?")
+            params.append(city_text(city_key(city)))
+        if min_level is not None:
+            levels = levels_from(min_level)
+            conditions.append(f"language_level IN ({', '.join('?' for _ in levels)})")
+            params.extend(levels)
+        if max_price is not None:
+            conditions.append("price <= ?")
+            params.append(max_price)
+
+        where = f" WHERE {' AND '.join(conditions)}" if conditions else ""
+        order = "user_id" if sort == "user_id" else f"{expression}, user_id"
+        cursor = self._execute(
+            f"SELECT user_id, data FROM {kind}{where} ORDER BY {order} LIMIT ?",
+            tuple(params) + (limit,)
+        )
+        return [(user_id, self._decode(kind, user_id, data)) for user_id, data in cursor]
+
+
+class PostgresStore(SQLiteStore):
+    """
+    The SQLite schema and queries on PostgreSQL, for deployments that
+    already run a database server. Requires psycopg2.
+    """
+
+    placeholder = "%s"
+
+    SCHEMA = tuple(
+        statement.replace("price REAL", "price DOUBLE PRECISION")
+        for statement in SQLiteStore.SCHEMA
+    )
+
+    def _connect(self):
+        import psycopg2
+        connection = psycopg2.connect(self.database)
+        # Plain SELECTs would otherwise leave the connection idle in a transaction
+        connection.autocommit = True
+        return connection
+
+    @contextmanager
+    def _transaction(self):
+        """
+        Writes turn autocommit off: otherwise the generation bump would
+        commit on its own, and another process could read the new generation
+        before the row written with it.
+        """
+        connection = self._connection
+        connection.autocommit = False
+        try:
+            with super()._transaction() as cursor:
+                yield cursor
+        finally:
+            connection.autocommit = True
+
+    def _columns(self, table: str) -> set:
+        return {
+            row[0] for row in self._execute(
+                "SELECT column_name FROM information_schema.columns WHERE table_name = ?", (table,)
+            )
+        }
+
+    def checkpoint(self) -> None:
+        """PostgreSQL manages its own write-ahead log."""
+
+
+class TimedStore:
+    """
+    Forwards to a storage backend and observes the duration of every read
+    and write in STORE_SECONDS, by operation and kind. Calls returning a
+    lazy iterator are timed until the iterator is returned, not consumed.
+    """
+
+    TIMED = ("get", "items", "count", "by_city", "page", "changes", "put", "put_many", "delete")
+    # Operations not taking a kind first, and the kind label they are observed under
+    FIXED_KIND = {"find_translators": "translators", "write_many": "mixed"}
+
+    def __init__(self, store):
+        self.store = store
+
+    def __getattr__(self, name: str) -> Any:
+        method = getattr(self.store, name)
+        if name in self.TIMED:
+            def timed(kind, *args, **kwargs):
+                start = time.perf_counter()
+                try:
+                    return method(kind, *args, **kwargs)
+                finally:
+                    STORE_SECONDS.observe(time.perf_counter() - start, name, kind)
+        elif name in self.FIXED_KIND:
+            kind = self.FIXED_KIND[name]
+
+            def timed(*args, **kwargs):
+                start = time.perf_counter()
+                try:
+                    return method(*args, **kwargs)
+                finally:
+                    STORE_SECONDS.observe(time.perf_counter() - start, name, kind)
+        else:
+            return method
+        # Cache the wrapper, so later lookups skip __getattr__
+        setattr(self, name, timed)
+        return timed
+
+
+def create_store(backend: str, data_dir: str, database_url: Optional[str] = None):
+    """Create the storage backend selected in the configuration."""
+    backend = backend.lower()
+    if backend == "sqlite":
+        return SQLiteStore(database_url or os.path.join(data_dir, "bot.db"))
+    if backend == "postgres":
+        if not database_url:
+            raise ValueError("DATABASE_URL must be set for the postgres storage backend")
+        return PostgresStore(database_url)
+    if backend != "json":
+        raise ValueError(f"Unknown storage backend: {backend}")
+    return JsonStore(data_dir)
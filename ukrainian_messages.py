@@ -0,0 +1,276 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Текстові повідомлення бота українською мовою.
+"""
+
+# Початкові повідомлення
+START_MESSAGE = """
+Привіт, {}! 👋
+
+Ласкаво просимо до бота сервісу перекладачів.
+
+Будь ласка, оберіть вашу роль:
+"""
+
+# Повідомлення при виборі ролі
+TRANSLATOR_SELECTED = """
+Ви обрали реєстрацію як *Перекладач* 🗣️
+
+Будь ласка, надайте таку інформацію:
+
+Спочатку, як вас звати повністю?
+"""
+
+CLIENT_SELECTED = """
+Ви обрали реєстрацію як *Клієнт* 👤
+
+Будь ласка, вкажіть, у якому місті ви перебуваєте:
+"""
+
+# Повідомлення реєстрації перекладача
+TRANSLATOR_CITY_PROMPT = "Дякуємо, {}! Тепер, будь ласка, вкажіть, у якому місті Німеччини ви перебуваєте:"
+
+TRANSLATOR_LEVEL_PROMPT = """
+Чудово! Який ваш рівень німецької мови?
+
+Будь ласка, оберіть один із таких: A1, A2, B1, B2, C1, C2 або Native (Рідна)
+"""
+
+TRANSLATOR_LEVEL_INVALID = "Будь ласка, вкажіть коректний рівень мови (A1, A2, B1, B2, C1, C2 або Native):"
+
+TRANSLATOR_PRICE_PROMPT = "Дякуємо! Будь ласка, вкажіть вашу ціну за годину в євро (наприклад, 25):"
+
+TRANSLATOR_PRICE_INVALID = "Будь ласка, вкажіть коректну ціну (число, наприклад, 25):"
+
+TRANSLATOR_CONTACT_PROMPT = """
+Майже готово! Будь ласка, надайте вашу контактну інформацію:
+Це може бути ваше ім'я користувача в Telegram (наприклад, @username) або номер телефону.
+"""
+
+TRANSLATOR_REGISTRATION_COMPLETE = """
+✅ Дякуємо! Ваш профіль перекладача створено.
+
+*Ім'я:* {}
+*Місто:* {}
+*Рівень німецької:* {}
+*Ціна за годину:* {}€
+*Контакт:* {}
+
+Ви зареєстровані як перекладач!
+"""
+
+# Повідомлення реєстрації клієнта
+CLIENT_VERIFICATION_PROMPT = """
+Дякуємо! Щоб підтвердити, що ви клієнт, будь ласка, коротко опишіть, який вид послуг перекладу вам потрібен:
+
+Наприклад: 'Візит до лікаря', 'Переклад юридичних документів' тощо.
+"""
+
+CLIENT_SUSPICIOUS = """
+⚠️ Схоже, ви можете бути перекладачем, а не клієнтом, який шукає послуги перекладу.
+
+Якщо ви перекладач, будь ласка, почніть реєстрацію знову командою /start і оберіть 'Перекладач'.
+
+Це допомагає підтримувати порядок у групі та гарантує, що ви отримаєте правильний доступ до всіх функцій для перекладачів.
+"""
+
+CLIENT_REGISTRATION_COMPLETE = """
+✅ Дякуємо! Ви зареєстровані як клієнт у місті {}.
+
+Тепер ви можете розміщувати запити на переклад у груповому чаті.
+"""
+
+# Інструкції для користувачів
+TRANSLATOR_INSTRUCTIONS = """
+🔹 *Інструкції для перекладача* 🔹
+
+Дякуємо за реєстрацію як перекладач! Ось як почати роботу:
+
+1️⃣ *Пошук клієнтів:*
+• Стежте за груповим чатом щодо запитів на переклад у вашому місті
+• Зв'язуйтеся з клієнтами напряму через особисті повідомлення
+• Представляйтеся професійно та вказуйте ваші розцінки
+
+2️⃣ *Правила групового чату (ВАЖЛИВО):*
+• Як перекладач, ви НЕ МОЖЕТЕ публікувати звичайні повідомлення в групі
+• Ви можете писати, лише якщо вам потрібна заміна (додайте фразу "потрібна заміна" у ваше повідомлення)
+• Увесь контакт із клієнтами має відбуватися через особисті повідомлення
+• ⚠️ Перекладачі, які реєструються як клієнти, щоб обійти ці правила, ризикують бути виключеними
+
+3️⃣ *Заробіток на перекладах:*
+• Чітко домовляйтеся про вашу погодинну ставку перед зустрічами
+• Будьте пунктуальними та професійними під час перекладу
+• Просіть відгуки в задоволених клієнтів
+
+4️⃣ *Майбутні функції:*
+• У майбутньому профілі перекладачів можуть вимагати абонентську плату
+• Зареєстровані перекладачі отримають пріоритетний доступ до клієнтів
+• Додаткові професійні інструменти для зареєстрованих перекладачів
+
+Пам'ятайте, що правильна реєстрація гарантує вам повний доступ до всіх функцій для перекладачів!
+"""
+
+CLIENT_INSTRUCTIONS = """
+🔹 *Інструкції для клієнта* 🔹
+
+Дякуємо за реєстрацію! Ось як знайти перекладача:
+
+1️⃣ *Розміщення запитів:*
+• Чітко опишіть, для чого вам потрібен переклад
+• Завжди вказуйте ваше місто та бажану дату/час
+• Надавайте всі важливі деталі (тривалість, тема тощо)
+
+2️⃣ *Переваги групи для клієнтів:*
+• Як підтверджений клієнт, ви можете вільно публікувати запити на переклад у групі
+• Перекладачі зв'яжуться з вами особисто, щоб запропонувати свої послуги
+• Це підтримує групу впорядкованою та зручною
+
+3️⃣ *Важливі правила:*
+• Коли ви знайдете перекладача, будь ласка, напишіть "перекладача знайдено" в групі
+• Це допомагає уникнути численних звернень від перекладачів
+• Чітко формулюйте ваші очікування та бюджет
+
+4️⃣ *Поради щодо безпеки:*
+• Для перших зустрічей обирайте громадські місця
+• Обговоріть розцінки до зустрічі
+• Для довготривалих потреб бронюйте заздалегідь
+
+Сподіваємося, ви знайдете ідеального перекладача для ваших потреб!
+"""
+
+# Повідомлення загальних функцій
+HELP_MESSAGE = """
+🌟 *Довідка бота сервісу перекладачів* 🌟
+
+*Доступні команди:*
+/start - Зареєструватися як перекладач або клієнт
+/help - Показати цю довідку
+/found - Позначити, що ви знайшли перекладача
+/match - Підібрати перекладачів у вашому місті (або: /match Берлін); перекладачам — відкриті запити клієнтів
+/cancel - Скасувати поточну операцію
+
+{}
+
+*Для перекладачів:*
+• Заповніть свій профіль усією необхідною інформацією
+• Зв'язуйтеся з клієнтами напряму через особисті повідомлення
+• Будьте професійними та чіткими щодо ваших розцінок
+
+*Для клієнтів:*
+• Чітко публікуйте ваші потреби в перекладі
+• Завжди вказуйте ваше місто
+• Використовуйте команду /found, коли знайдете перекладача
+
+Якщо вам потрібна додаткова допомога, будь ласка, зверніться до адміністратора групи.
+"""
+
+HELP_ADMIN_COMMAND = "/admin - Переглянути статистику реєстрацій і зведення даних\n"
+
+CANCEL_MESSAGE = "Операцію скасовано. Ви можете почати знову командою /start."
+
+# Повідомлення для групових взаємодій
+TRANSLATOR_FOUND_MESSAGE = """
+✅ Дякуємо, що повідомили, що ви знайшли перекладача!
+Це допомагає іншим перекладачам знати, що ваш запит виконано.
+"""
+
+SPAM_WARNING = """
+⚠️ Ваше повідомлення позначено як потенційний спам.
+Будь ласка, переконайтеся, що ваші повідомлення стосуються послуг перекладу.
+"""
+
+TRANSLATOR_GROUP_RESTRICTION = """
+⚠️ Як перекладач, ви не можете публікувати звичайні повідомлення в груповому чаті.
+Ви можете публікувати лише тоді, коли вам потрібна заміна.
+
+Щоб зв'язатися з клієнтами, будь ласка, надсилайте їм особисті повідомлення.
+"""
+
+REGISTRATION_REQUIRED = """
+⚠️ Вам потрібно спочатку зареєструватися, перш ніж публікувати повідомлення в групі.
+Будь ласка, почніть особистий чат зі мною та використайте команду /start, щоб зареєструватися
+як перекладач або як клієнт.
+"""
+
+CLIENT_VERIFICATION_REQUIRED = """
+⚠️ Будь ласка, завершіть реєстрацію клієнта перед публікацією в групі.
+Почніть особистий чат зі мною та використайте команду /start.
+"""
+
+ERROR_MESSAGE = """
+Вибачте, сталася помилка. Будь ласка, спробуйте пізніше або зверніться до адміністратора.
+"""
+
+ADMIN_NOT_ALLOWED = """
+Вибачте, ця команда доступна лише адміністраторам.
+"""
+
+# Підбір перекладачів
+MATCH_USAGE = """
+Вкажіть місто, наприклад: /match Берлін
+Зареєстровані клієнти можуть просто надіслати /match, щоб шукати у своєму місті.
+"""
+
+MATCH_HEADER = "🔎 Відповідні перекладачі для міста {}:"
+
+MATCH_LINE = "{}. {} — {}, рівень {}, {}€/год, контакт: {}"
+
+MATCH_NEARBY = " ({} км від вас)"
+
+MATCH_NONE = "На жаль, у місті {} і поблизу поки немає відповідних перекладачів."
+
+# Відкриті запити клієнтів
+OPEN_REQUESTS_HEADER = "📋 Відкриті запити клієнтів у місті {}:"
+
+OPEN_REQUESTS_LINE = "{}. {}"
+
+OPEN_REQUESTS_LINK = " — {}"
+
+OPEN_REQUESTS_NONE = "Зараз у місті {} немає відкритих запитів клієнтів."
+
+# Сповіщення перекладачів
+NEW_REQUEST_NOTIFICATION = "📢 Новий запит клієнта в місті {}:\n\n{}"
+
+NEW_REQUEST_LINK = "\n\nПовідомлення в групі: {}"
+
+# Зведення даних для адміністратора
+ADMIN_SUMMARY = """📊 *Зведення даних адміністратора*
+
+Усього перекладачів: {}
+Усього клієнтів: {}
+Співвідношення перекладачів/клієнтів: {:.2f}
+
+*Верифікація клієнтів:*
+• Підтверджених клієнтів: {}
+• Непідтверджених клієнтів: {}
+• Підозрілих верифікацій: {}
+
+"""
+
+ADMIN_SUMMARY_PRICES = """*Інформація про ціни:*
+• Середня ціна: {:.2f}€
+• Мінімальна ціна: {:.2f}€
+• Максимальна ціна: {:.2f}€
+
+"""
+
+ADMIN_SUMMARY_TRANSLATOR_CITIES = "*Перекладачі за містами:*\n"
+
+ADMIN_SUMMARY_CLIENT_CITIES = "\n*Клієнти за містами:*\n"
+
+ADMIN_SUMMARY_LEVELS = "\n*Рівні німецької в перекладачів:*\n"
+
+ADMIN_SUMMARY_SUSPICIOUS = "\n*Підозрілі верифікації клієнтів:*\n"
+
+ADMIN_SUMMARY_SUSPICIOUS_LINE = "• Користувач {} з міста {} - \"{}\"\n"
+
+ADMIN_SUMMARY_MORE = "... і ще {}\n"
+
+# Кнопки
+TRANSLATOR_BUTTON = "Перекладач 🗣️"
+CLIENT_BUTTON = "Клієнт 👤"
+
+# Команди для перекладачів у групі
+REPLACEMENT_KEYWORDS = ["потрібна заміна", "шукаю заміну"]
@@ -0,0 +1,119 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Concurrent update processing that keeps updates of one chat in order.
+"""
+
+import asyncio
+import logging
+import sys
+import time
+from typing import Any, Awaitable, Dict, Hashable, Optional
+
+from telegram import Update
+from telegram.ext import BaseUpdateProcessor
+
+from metrics import UPDATE_SECONDS
+
+logger = logging.getLogger(__name__)
+
+
+class _ChatSlot:
+    """Lock serializing one chat's updates, with the number of updates using it."""
+
+    __slots__ = ("lock", "users")
+
+    def __init__(self):
+        self.lock = asyncio.Lock()
+        self.users = 0
+
+
+class ChatOrderedUpdateProcessor(BaseUpdateProcessor):
+    """
+    Processes up to `max_concurrent_updates` updates at once, while updates
+    from the same chat (or the same user, for updates without a chat) run
+    one after another in the order they arrived.
+
+    The per-chat lock is taken before a concurrency slot, so updates queued
+    behind a slow chat never hold slots that other chats could use. PTB's
+    final process_update takes its own semaphore before do_process_update,
+    so that one admits every update and the limit is enforced here.
+    """
+
+    def __init__(self, max_concurrent_updates: int):
+        if max_concurrent_updates < 1:
+            raise ValueError("`max_concurrent_updates` must be a positive integer!")
+        super().__init__(sys.maxsize)
+        self.concurrency_limit = max_concurrent_updates
+        self._slots: Dict[Hashable, _ChatSlot] = {}
+        self._concurrency = asyncio.Semaphore(max_concurrent_updates)
+
+        # Metrics
+        self.in_flight = 0
+        self.waiting = 0
+        self.processed = 0
+
+    @staticmethod
+    def _ordering_key(update: object) -> Optional[Hashable]:
+        """Updates with the same key are processed in order."""
+        if not isinstance(update, Update):
+            return None
+        if update.effective_chat is not None:
+            return ("chat", update.effective_chat.id)
+        if update.effective_user is not None:
+            return ("user", update.effective_user.id)
+        return None
+
+    async def do_process_update(self, update: object, coroutine: Awaitable[Any]) -> None:
+        key = self._ordering_key(update)
+        if key is None:
+            await self._run(update, coroutine)
+            return
+
+        slot = self._slots.get(key)
+        if slot is None:
+            slot = self._slots[key] = _ChatSlot()
+        slot.users += 1
+        try:
+            self.waiting += 1
+            try:
+                # asyncio.Lock wakes waiters in FIFO order, which preserves arrival order
+                await slot.lock.acquire()
+            finally:
+                self.waiting -= 1
+            try:
+                await self._run(update, coroutine)
+            finally:
+                slot.lock.release()
+        finally:
+            slot.users -= 1
+            if slot.users == 0:
+                del self._slots[key]
+
+    async def _run(self, update: object, coroutine: Awaitable[Any]) -> None:
+        async with self._concurrency:
+            self.in_flight += 1
+            start = time.perf_counter()
+            try:
+                await coroutine
+            finally:
+                UPDATE_SECONDS.observe(time.perf_counter() - start)
+                self.in_flight -= 1
+                self.processed += 1
+
+    async def initialize(self) -> None:
+        pass
+
+    async def shutdown(self) -> None:
+        pass
+
+    def get_stats(self) -> Dict[str, int]:
+        """Counters for monitoring."""
+        return {
+            "max_concurrent_updates": self.concurrency_limit,
+            "in_flight": self.in_flight,
+            "waiting_for_chat": self.waiting,
+            "active_chats": len(self._slots),
+            "processed": self.processed,
+        }